@@ -1,17 +1,82 @@
 from django.contrib import admin
-from .models import User, Transaction
+from django.utils import timezone
+from .models import User, Transaction, TransactionEvent, ArchivedTransaction, WebhookEvent, IdempotencyKey
+from .routers import read_database
+
+
+class ReplicaChangeListAdmin(admin.ModelAdmin):
+    """
+    Changelist pages (GET) read from a replica and may lag the primary by the replication
+    delay; change forms, actions and deletes always use the primary.
+    """
+
+    def changelist_view(self, request, extra_context=None):
+        request.read_from_replica = request.method == 'GET'
+        return super().changelist_view(request, extra_context)
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if getattr(request, 'read_from_replica', False):
+            # Bound with using() rather than replica_reads(): the page is evaluated while rendering
+            queryset = queryset.using(read_database())
+        return queryset
+
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ReplicaChangeListAdmin):
     list_display = ('email', 'name', 'is_active', 'created_at')
     list_filter = ('is_active', 'created_at')
     search_fields = ('email', 'name', 'google_id')
     readonly_fields = ('created_at', 'updated_at')
 
+class TransactionEventInline(admin.TabularInline):
+    model = TransactionEvent
+    fields = ('kind', 'created_at', 'payload_data')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Payload')
+    def payload_data(self, obj):
+        return obj.data
+
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(ReplicaChangeListAdmin):
     list_display = ('reference', 'user', 'amount', 'status', 'created_at')
     list_filter = ('status', 'currency', 'created_at')
     search_fields = ('reference', 'user__email', 'paystack_reference')
     readonly_fields = ('created_at', 'updated_at')
-    raw_id_fields = ('user',)
\ No newline at end of file
+    raw_id_fields = ('user',)
+    inlines = [TransactionEventInline]
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(ReplicaChangeListAdmin):
+    list_display = ('event', 'reference', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('status', 'event')
+    search_fields = ('reference',)
+    readonly_fields = ('received_at', 'processed_at')
+    actions = ['requeue_events']
+
+    @admin.action(description="Requeue selected events")
+    def requeue_events(self, request, queryset):
+        updated = queryset.update(status='pending', attempts=0, last_error='', available_at=timezone.now())
+        self.message_user(request, f"{updated} events requeued")
+
+
+@admin.register(IdempotencyKey)
+class IdempotencyKeyAdmin(ReplicaChangeListAdmin):
+    list_display = ('key', 'user', 'status', 'response_status', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('key', 'user__email')
+    readonly_fields = ('created_at',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(ArchivedTransaction)
+class ArchivedTransactionAdmin(ReplicaChangeListAdmin):
+    list_display = ('reference', 'user_id', 'segment', 'archived_at')
+    search_fields = ('reference', 'segment')
+    readonly_fields = ('reference', 'user_id', 'segment', 'offset', 'length', 'archived_at')
@@ -0,0 +1,314 @@
+"""
+OpenAPI description of the API, for drf_yasg.
+
+Kept out of views.py so that drf_yasg and these schema definitions are only imported when a
+schema is generated: by ``manage.py generate_openapi`` at build time, or by the first docs
+request of a process when no generated schema file exists.
+"""
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.utils import swagger_auto_schema
+
+from . import views
+from .serializers import TransactionStatusBatchSerializer
+
+API_INFO = openapi.Info(
+    title="Google Auth & Paystack Payment API",
+    default_version='v1',
+    description="API documentation for Google OAuth authentication and Paystack payment processing",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@example.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+CODECS = {
+    'json': OpenAPICodecJson,
+    'yaml': OpenAPICodecYaml,
+}
+
+
+# Per-operation overrides; equivalent to decorating the view methods with @swagger_auto_schema
+
+swagger_auto_schema(
+    operation_description="Handle Google OAuth callback",
+    manual_parameters=[
+        openapi.Parameter(
+            'code',
+            openapi.IN_QUERY,
+            description="Authorization code from Google",
+            type=openapi.TYPE_STRING,
+            required=True,
+            example="4/0ATX87lM_6Ah8I3HEywy75v2j_GIHrKnrVzToIv1x1tOzLM4dxh1m9OO3lpZ-mBCLyPxSyQ"
+        ),
+        openapi.Parameter(
+            'error',
+            openapi.IN_QUERY,
+            description="Error from Google (if any)",
+            type=openapi.TYPE_STRING,
+            required=False,
+            example="access_denied"
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description='User authentication successful',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'data': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'user_id': openapi.Schema(type=openapi.TYPE_STRING),
+                            'email': openapi.Schema(type=openapi.TYPE_STRING),
+                            'name': openapi.Schema(type=openapi.TYPE_STRING),
+                            'access_token': openapi.Schema(type=openapi.TYPE_STRING),
+                            'refresh_token': openapi.Schema(type=openapi.TYPE_STRING),
+                            'token_type': openapi.Schema(type=openapi.TYPE_STRING, example='Bearer'),
+                            'expires_in': openapi.Schema(type=openapi.TYPE_INTEGER)
+                        }
+                    )
+                }
+            )
+        ),
+        400: openapi.Response(
+            description='Missing code or Google error',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
+                }
+            )
+        ),
+        401: openapi.Response(
+            description='Invalid or expired authorization code',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
+                }
+            )
+        ),
+        500: openapi.Response(
+            description='Provider error or internal server error',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
+                }
+            )
+        )
+    }
+)(views.GoogleAuthCallbackView.get)
+
+swagger_auto_schema(
+    operation_description="Initiate Paystack payment",
+    security=[{'Bearer': []}],
+    manual_parameters=[
+        openapi.Parameter(
+            'Idempotency-Key',
+            openapi.IN_HEADER,
+            description="Unique key for this payment attempt; retries with the same key replay the first response",
+            type=openapi.TYPE_STRING,
+            required=False
+        )
+    ],
+    request_body=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        required=['amount'],
+        properties={
+            'amount': openapi.Schema(
+                type=openapi.TYPE_INTEGER,
+                description='Amount in Kobo (minimum 100 Kobo = 1 NGN)',
+                minimum=100,
+                example=5000
+            )
+        }
+    ),
+    responses={
+        201: openapi.Response(
+            description='Payment initialized successfully',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'data': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'reference': openapi.Schema(type=openapi.TYPE_STRING),
+                            'authorization_url': openapi.Schema(type=openapi.TYPE_STRING),
+                        }
+                    )
+                }
+            )
+        ),
+        400: openapi.Response(description='Invalid input'),
+        401: openapi.Response(description='Missing, invalid or expired access token'),
+        402: openapi.Response(description='Payment initialization failed by Paystack'),
+        409: openapi.Response(description='A request with the same Idempotency-Key is still in progress'),
+        422: openapi.Response(description='Idempotency-Key reused with a different request body'),
+        429: openapi.Response(description='Rate limit reached for this user or IP, or Paystack is busy; see Retry-After'),
+        500: openapi.Response(description='Internal server error')
+    }
+)(views.PaystackInitiatePaymentView.post)
+
+swagger_auto_schema(
+    operation_description="Check transaction status",
+    security=[{'Bearer': []}],
+    manual_parameters=[
+        openapi.Parameter(
+            'reference',
+            openapi.IN_PATH,
+            description="Transaction reference",
+            type=openapi.TYPE_STRING,
+            required=True,
+            example="TXN_01JEP8WQ3S0001C8H0X7K2M9QD"
+        ),
+        openapi.Parameter(
+            'refresh',
+            openapi.IN_QUERY,
+            description="Force refresh from Paystack (true/false)",
+            type=openapi.TYPE_BOOLEAN,
+            required=False,
+            default=False
+        )
+    ],
+    responses={
+        200: openapi.Response(
+            description='Transaction status retrieved',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'data': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'reference': openapi.Schema(type=openapi.TYPE_STRING),
+                            'status': openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                enum=['pending', 'success', 'failed', 'abandoned']
+                            ),
+                            'amount': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'paid_at': openapi.Schema(
+                                type=openapi.TYPE_STRING,
+                                format='date-time',
+                                nullable=True
+                            )
+                        }
+                    )
+                }
+            )
+        ),
+        401: openapi.Response(description='Missing, invalid or expired access token'),
+        404: openapi.Response(description='Transaction not found'),
+        429: openapi.Response(description='refresh=true rate limit reached for this user or IP; see Retry-After'),
+        500: openapi.Response(description='Internal server error')
+    }
+)(views.TransactionStatusView.get)
+
+swagger_auto_schema(
+    operation_description=(
+        "Check the status of up to TRANSACTION_STATUS_BATCH_MAX_REFERENCES transactions. "
+        "Stale pending transactions are verified with Paystack; the rest are answered from the database."
+    ),
+    security=[{'Bearer': []}],
+    request_body=TransactionStatusBatchSerializer,
+    responses={
+        200: openapi.Response(
+            description='Transaction statuses retrieved',
+            schema=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                    'message': openapi.Schema(type=openapi.TYPE_STRING),
+                    'data': openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'statuses': openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                additional_properties=openapi.Schema(
+                                    type=openapi.TYPE_STRING,
+                                    enum=['pending', 'success', 'failed', 'abandoned']
+                                )
+                            ),
+                            'not_found': openapi.Schema(
+                                type=openapi.TYPE_ARRAY,
+                                items=openapi.Schema(type=openapi.TYPE_STRING)
+                            )
+                        }
+                    )
+                }
+            )
+        ),
+        400: openapi.Response(description='Invalid input or too many references'),
+        401: openapi.Response(description='Missing, invalid or expired access token'),
+        500: openapi.Response(description='Internal server error')
+    }
+)(views.TransactionStatusBatchView.post)
+
+swagger_auto_schema(
+    operation_description="List the authenticated user's transactions",
+    security=[{'Bearer': []}],
+    manual_parameters=[
+        openapi.Parameter(
+            'status',
+            openapi.IN_QUERY,
+            description="Only return transactions with this status",
+            type=openapi.TYPE_STRING,
+            enum=['pending', 'success', 'failed', 'abandoned'],
+            required=False
+        ),
+        openapi.Parameter(
+            'created_after',
+            openapi.IN_QUERY,
+            description="Only return transactions created at or after this ISO 8601 datetime",
+            type=openapi.TYPE_STRING,
+            format='date-time',
+            required=False
+        ),
+        openapi.Parameter(
+            'created_before',
+            openapi.IN_QUERY,
+            description="Only return transactions created before this ISO 8601 datetime",
+            type=openapi.TYPE_STRING,
+            format='date-time',
+            required=False
+        ),
+        openapi.Parameter(
+            'cursor',
+            openapi.IN_QUERY,
+            description="Value of next_cursor from the previous page",
+            type=openapi.TYPE_STRING,
+            required=False
+        ),
+        openapi.Parameter(
+            'page_size',
+            openapi.IN_QUERY,
+            description="Number of transactions per page",
+            type=openapi.TYPE_INTEGER,
+            required=False
+        )
+    ],
+    responses={
+        200: openapi.Response(description='Transactions retrieved successfully'),
+        400: openapi.Response(description='Invalid query parameters'),
+        401: openapi.Response(description='Missing, invalid or expired access token'),
+        500: openapi.Response(description='Internal server error')
+    }
+)(views.TransactionListView.get)
+
+
+def render_schema(fmt='json'):
+    """The API's OpenAPI (Swagger 2.0) document, encoded as fmt ('json' or 'yaml')"""
+    schema = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    return CODECS[fmt](validators=[]).encode(schema)
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class AuthPaymentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'auth_payment'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from .identity import invalidate_user
+        from .metrics import install_db_instrumentation
+        from . import checks  # noqa: F401  (registers the system checks)
+
+        connection_created.connect(install_db_instrumentation, dispatch_uid='auth_payment_db_metrics')
+        user = self.get_model('User')
+        post_save.connect(invalidate_user, sender=user, dispatch_uid='auth_payment_identity_save')
+        post_delete.connect(invalidate_user, sender=user, dispatch_uid='auth_payment_identity_delete')
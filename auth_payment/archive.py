@@ -0,0 +1,197 @@
+"""
+Archival of settled transactions to compressed cold storage.
+
+Each archive run moves terminal transactions older than ARCHIVE_AFTER_DAYS out of the hot
+``transactions`` table, batch by batch. A batch becomes one segment file under ARCHIVE_DIR.
+A segment holds NDJSON records (the transaction plus its events) written as a run of
+independent zstd frames of ARCHIVE_BLOCK_ROWS lines each. The frames concatenate into a valid
+zstd stream, so ``zstd -dc segment.ndjson.zst`` gives the full NDJSON. ArchivedTransaction
+records each reference's frame offset and length, so a lookup decompresses one block rather
+than the whole segment.
+"""
+import os
+import json
+import time
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import zstandard
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from .models import ArchivedTransaction, Transaction, TransactionEvent
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ('success', 'failed', 'abandoned')
+
+RECORD_FIELDS = (
+    'id', 'reference', 'user_id', 'amount', 'currency', 'status', 'paystack_reference',
+    'authorization_url', 'paid_at', 'created_at', 'updated_at',
+)
+
+
+@dataclass
+class ArchiveReport:
+    archived: int = 0
+    segments: int = 0
+    bytes_written: int = 0
+    elapsed: float = 0.0
+
+    def summary(self):
+        return (
+            f"Archived {self.archived} transactions into {self.segments} segments "
+            f"({self.bytes_written / 1024:.1f} KiB) in {self.elapsed:.1f}s"
+        )
+
+
+def archivable_transactions(older_than_days):
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    return Transaction.objects.filter(status__in=TERMINAL_STATUSES, created_at__lt=cutoff)
+
+
+def _plain(value):
+    """JSON value for a model field; datetimes keep isoformat() so the API output matches the hot table"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (Decimal, uuid.UUID)):
+        return str(value)
+    return value
+
+
+def _records(transactions):
+    events = {}
+    for event in TransactionEvent.objects.filter(transaction__in=transactions).order_by('id'):
+        events.setdefault(event.transaction_id, []).append(
+            {'kind': event.kind, 'created_at': _plain(event.created_at), 'data': event.data}
+        )
+    for txn in transactions:
+        record = {field: _plain(getattr(txn, field)) for field in RECORD_FIELDS}
+        record['events'] = events.get(txn.pk, [])
+        yield record
+
+
+def _write_segment(records, block_rows, level):
+    """Write records to a new segment; returns (segment name, index entries, bytes written)"""
+    archive_dir = Path(settings.ARCHIVE_DIR)
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    name = f"transactions-{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson.zst"
+    partial = archive_dir / f".{name}.partial"
+    compressor = zstandard.ZstdCompressor(level=level)
+
+    entries = []
+    offset = 0
+    with open(partial, 'wb') as f:
+        for start in range(0, len(records), block_rows):
+            block = records[start:start + block_rows]
+            lines = b''.join(
+                json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n'
+                for record in block
+            )
+            frame = compressor.compress(lines)
+            f.write(frame)
+            entries.extend((record['reference'], record['user_id'], offset, len(frame)) for record in block)
+            offset += len(frame)
+        f.flush()
+        os.fsync(f.fileno())
+    # Only complete segments get their final name; the index is written after this
+    os.replace(partial, archive_dir / name)
+    return name, entries, offset
+
+
+def archive_transactions(older_than_days=None, batch_size=None, limit=None):
+    """Move settled transactions older than older_than_days into archive segments"""
+    older_than_days = older_than_days or settings.ARCHIVE_AFTER_DAYS
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    report = ArchiveReport()
+    start = time.monotonic()
+
+    while limit is None or report.archived < limit:
+        size = batch_size if limit is None else min(batch_size, limit - report.archived)
+        # Archived rows are deleted, so every batch is simply the oldest remaining ones
+        batch = list(archivable_transactions(older_than_days).order_by('created_at', 'id')[:size])
+        if not batch:
+            break
+
+        name, entries, written = _write_segment(
+            list(_records(batch)), settings.ARCHIVE_BLOCK_ROWS, settings.ARCHIVE_COMPRESSION_LEVEL
+        )
+        ids = [txn.pk for txn in batch]
+        with db_transaction.atomic():
+            ArchivedTransaction.objects.bulk_create([
+                ArchivedTransaction(reference=reference, user_id=user_id, segment=name, offset=offset, length=length)
+                for reference, user_id, offset, length in entries
+            ])
+            TransactionEvent.objects.filter(transaction_id__in=ids).delete()
+            Transaction.objects.filter(pk__in=ids).delete()
+
+        report.archived += len(batch)
+        report.segments += 1
+        report.bytes_written += written
+        logger.info("Archived %s transactions to %s", len(batch), name)
+
+    report.elapsed = time.monotonic() - start
+    logger.info("Archival finished: %s", report.summary())
+    return report
+
+
+class ArchiveReadError(Exception):
+    """An archived transaction's segment is missing, unreadable or does not hold it"""
+
+
+def _read_block(segment, offset, length, decompressor=None):
+    """The records of one block of a segment"""
+    try:
+        with open(Path(settings.ARCHIVE_DIR) / segment, 'rb') as f:
+            f.seek(offset)
+            block = (decompressor or zstandard.ZstdDecompressor()).decompress(f.read(length))
+        return [json.loads(line) for line in block.splitlines()]
+    except (OSError, zstandard.ZstdError, ValueError) as e:
+        raise ArchiveReadError(f"Cannot read archive segment {segment} at offset {offset}: {e}") from e
+
+
+def read_archived(entry):
+    """The archived record for an ArchivedTransaction entry; raises ArchiveReadError"""
+    for record in _read_block(entry.segment, entry.offset, entry.length):
+        if record.get('reference') == entry.reference:
+            return record
+    raise ArchiveReadError(f"{entry.reference} missing from archive segment {entry.segment}")
+
+
+def find_archived(reference, user_id):
+    """
+    The archived record for a user's reference, or None if it was never archived.
+    Raises ArchiveReadError when it was archived but cannot be read back.
+    """
+    entry = ArchivedTransaction.objects.filter(reference=reference, user_id=user_id).first()
+    return read_archived(entry) if entry else None
+
+
+def find_archived_many(references, user_id):
+    """
+    {reference: archived record} for those of a user's references that were archived.
+    Raises ArchiveReadError when any of them cannot be read back.
+    """
+    blocks = {}
+    for entry in ArchivedTransaction.objects.filter(reference__in=references, user_id=user_id):
+        blocks.setdefault((entry.segment, entry.offset, entry.length), set()).add(entry.reference)
+    found = {}
+    decompressor = zstandard.ZstdDecompressor()
+    # Neighbouring references usually share a block, which is then decompressed once
+    for (segment, offset, length), wanted in blocks.items():
+        for record in _read_block(segment, offset, length, decompressor):
+            if record.get('reference') in wanted:
+                found[record['reference']] = record
+        missing = wanted.difference(found)
+        if missing:
+            raise ArchiveReadError(f"{', '.join(sorted(missing))} missing from archive segment {segment}")
+    return found
+
+
+def amount_in_kobo(record):
+    return int(Decimal(record['amount']) * 100)
@@ -0,0 +1,407 @@
+import json
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.db import DEFAULT_DB_ALIAS
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from .models import Transaction
+from .serializers import PaymentInitiateSerializer, payment_initiated_data, transaction_status_data
+from .utils import GoogleAuthHelper, PaystackHelper, ResponseHelper
+from . import archive, idempotency, metrics, notifications, services, throttling
+from .resilience import CircuitOpenError
+from .authentication import authenticate_token, issue_tokens, stream_token_user_id
+from .routers import read_database
+
+logger = logging.getLogger(__name__)
+
+
+def throttled_response(wait, message="Too many requests, please retry later"):
+    response = JsonResponse(
+        ResponseHelper.error_response(message=message, status_code=status.HTTP_429_TOO_MANY_REQUESTS),
+        status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
+    response['Retry-After'] = throttling.retry_after(wait)
+    return response
+
+
+def archive_unavailable_response():
+    return JsonResponse(
+        ResponseHelper.error_response(
+            message="Archived transaction data is temporarily unavailable",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
+class AsyncGoogleAuthCallbackView(View):
+    """Async counterpart of GoogleAuthCallbackView, served through the ASGI app"""
+
+    async def get(self, request):
+        code = request.GET.get('code')
+        error = request.GET.get('error')
+
+        if error:
+            logger.error("Google OAuth error: %s", error)
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message=f"Authentication failed: {error}"
+                ),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not code:
+            logger.error("No authorization code provided")
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Authorization code is required"
+                ),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            token_data = await GoogleAuthHelper.aexchange_code_for_token(code)
+            if not token_data:
+                logger.error("Failed to exchange code for token")
+                return JsonResponse(
+                    ResponseHelper.error_response(
+                        message="Invalid or expired authorization code"
+                    ),
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+
+            user_info = await GoogleAuthHelper.auser_info_from_tokens(token_data)
+            if not user_info:
+                logger.error("Failed to fetch user info from Google")
+                return JsonResponse(
+                    ResponseHelper.error_response(
+                        message="Failed to retrieve user information"
+                    ),
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+            user, created = await sync_to_async(services.upsert_google_user)(user_info)
+            if not user.is_active:
+                logger.warning("Rejected sign-in for inactive user %s", user.id)
+                return JsonResponse(
+                    ResponseHelper.error_response(
+                        message="This account has been deactivated",
+                        status_code=status.HTTP_403_FORBIDDEN
+                    ),
+                    status=status.HTTP_403_FORBIDDEN
+                )
+
+            action = "created" if created else "updated"
+            logger.info("User %s: %s", action, user.email)
+
+            return JsonResponse(
+                ResponseHelper.success_response(
+                    data={
+                        'user_id': str(user.id),
+                        'email': user.email,
+                        'name': user.name,
+                        **issue_tokens(user)
+                    },
+                    message="User authentication successful"
+                ),
+                status=status.HTTP_200_OK
+            )
+
+        except CircuitOpenError:
+            logger.warning("Google circuit open; rejecting callback")
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Google sign-in is temporarily unavailable, please try again shortly",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+                ),
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        except Exception as e:
+            logger.error("Google authentication error: %s", e)
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Authentication failed",
+                    errors={'detail': str(e)}
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncPaystackInitiatePaymentView(View):
+    """Async counterpart of PaystackInitiatePaymentView, served through the ASGI app"""
+
+    async def post(self, request):
+        try:
+            user = authenticate_token(request)
+        except AuthenticationFailed:
+            user = None
+        if user is None:
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Authentication required. Sign in via Google OAuth and send the access token as a Bearer token.",
+                    status_code=status.HTTP_401_UNAUTHORIZED
+                ),
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        wait = await sync_to_async(throttling.check)(request, 'initiate', user.id)
+        if wait:
+            return throttled_response(wait)
+
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Invalid input",
+                    errors={'detail': 'Request body must be valid JSON'}
+                ),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = PaymentInitiateSerializer(data=payload)
+
+        if not serializer.is_valid():
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Invalid input",
+                    errors=serializer.errors
+                ),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        amount = serializer.validated_data['amount']
+        idempotency_record = None
+
+        try:
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if idempotency_key:
+                if len(idempotency_key) > 255:
+                    return JsonResponse(
+                        ResponseHelper.error_response(message="Idempotency-Key must be at most 255 characters"),
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                idempotency_record, replay = await idempotency.abegin(
+                    user.id, idempotency_key, idempotency.request_fingerprint(serializer.validated_data)
+                )
+                if replay:
+                    logger.info("Replaying stored response for Idempotency-Key %s", idempotency_key)
+                    return JsonResponse(replay.response_body, status=replay.response_status)
+
+            payload, status_code = await self._initiate(user, amount)
+
+            if idempotency_record:
+                await sync_to_async(idempotency.finish)(idempotency_record, status_code, payload)
+
+            return JsonResponse(payload, status=status_code)
+
+        except idempotency.IdempotencyKeyMismatch:
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Idempotency-Key was already used with a different request"
+                ),
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+        except idempotency.IdempotencyKeyInProgress:
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="A request with this Idempotency-Key is still being processed"
+                ),
+                status=status.HTTP_409_CONFLICT
+            )
+        except throttling.BudgetExhausted as e:
+            if idempotency_record:
+                await sync_to_async(idempotency.release)(idempotency_record)
+            logger.warning("Paystack outbound budget exhausted; rejecting initiation")
+            return throttled_response(e.retry_after, "Payment provider is busy, please retry shortly")
+        except Exception as e:
+            if idempotency_record:
+                await sync_to_async(idempotency.release)(idempotency_record)
+            logger.error("Payment initiation error: %s", e)
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Payment initiation failed",
+                    errors={'detail': str(e)}
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    async def _initiate(self, user, amount):
+        reference = services.generate_reference()
+
+        existing_transaction = await services.recent_pending_duplicates(user, amount).afirst()
+
+        if existing_transaction:
+            logger.info("Duplicate transaction detected, returning existing: %s", existing_transaction.reference)
+            return ResponseHelper.success_response(
+                data=payment_initiated_data(existing_transaction),
+                message="Transaction already initiated"
+            ), status.HTTP_200_OK
+
+        paystack_response = await PaystackHelper.ainitialize_transaction(
+            amount=amount,
+            email=user.email,
+            reference=reference,
+            metadata=services.paystack_metadata(user)
+        )
+
+        if not paystack_response:
+            logger.error("Paystack initialization failed for user: %s", user.email)
+            return ResponseHelper.error_response(
+                message="Payment initialization failed"
+            ), status.HTTP_402_PAYMENT_REQUIRED
+
+        transaction = await sync_to_async(services.create_pending_transaction)(
+            user, amount, reference, paystack_response
+        )
+
+        logger.info("Payment initiated successfully: %s", reference)
+
+        return ResponseHelper.success_response(
+            data=payment_initiated_data(transaction),
+            message="Payment initialized successfully"
+        ), status.HTTP_201_CREATED
+
+
+def _status_event(data):
+    return f"event: status\ndata: {json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':'))}\n\n"
+
+
+class AsyncTransactionStatusStreamView(View):
+    """
+    Server-Sent Events stream of a transaction's status: the current status right away, then
+    the new one as soon as a webhook or reconciliation settles it. The stream closes once the
+    status is final or after STATUS_STREAM_TIMEOUT; EventSource clients reconnect on their own.
+
+    EventSource cannot send headers, so it authenticates with ?stream_token= from
+    TransactionStatusStreamTokenView instead of the access token, which must never be put in
+    a URL (proxies and access logs record query strings).
+
+    Only served through the ASGI application: the WSGI handler would buffer the whole stream
+    until it closes, so no event would reach the client before STATUS_STREAM_TIMEOUT.
+    """
+
+    async def get(self, request, reference):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Status streams are only available through the ASGI application; poll /status instead.",
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED
+                ),
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+
+        stream_token = request.GET.get('stream_token')
+        if stream_token:
+            user_id = stream_token_user_id(stream_token, reference)
+        else:
+            try:
+                user = authenticate_token(request)
+            except AuthenticationFailed:
+                user = None
+            user_id = user.id if user else None
+        if user_id is None:
+            return JsonResponse(
+                ResponseHelper.error_response(
+                    message="Authentication required. Sign in via Google OAuth and send the access token as a Bearer token.",
+                    status_code=status.HTTP_401_UNAUTHORIZED
+                ),
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+
+        # Subscribe before reading, so a change committed in between is not missed
+        hub = notifications.get_hub()
+        future = hub.subscribe(reference)
+        lookup = Transaction.objects.filter(reference=reference, user_id=user_id)
+        try:
+            # The read-your-writes pin lives in the cache, which is read off the event loop
+            alias = await sync_to_async(read_database)(user_id)
+            transaction = await lookup.using(alias).afirst()
+            if transaction is None and alias != DEFAULT_DB_ALIAS:
+                transaction = await lookup.using(DEFAULT_DB_ALIAS).afirst()
+        except Exception:
+            hub.unsubscribe(reference, future)
+            raise
+
+        if transaction is None:
+            hub.unsubscribe(reference, future)
+            try:
+                record = await sync_to_async(archive.find_archived)(reference, user_id)
+            except archive.ArchiveReadError as e:
+                logger.error("Archived transaction %s unreadable: %s", reference, e)
+                return archive_unavailable_response()
+            if record is None:
+                logger.warning("Transaction not found: %s", reference)
+                return JsonResponse(
+                    ResponseHelper.error_response(
+                        message="Transaction not found"
+                    ),
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            data = {
+                'reference': record['reference'],
+                'status': record['status'],
+                'amount': archive.amount_in_kobo(record),
+                'paid_at': record['paid_at']
+            }
+            return self._response(self._archived(data))
+
+        return self._response(self._events(hub, reference, future, lookup, transaction))
+
+    @staticmethod
+    def _response(events):
+        response = StreamingHttpResponse(events, content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep nginx from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    async def _archived(data):
+        yield _status_event(data)
+        metrics.record_status_stream('settled')
+
+    @staticmethod
+    async def _events(hub, reference, future, lookup, transaction):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.STATUS_STREAM_TIMEOUT
+        outcome = 'disconnected'
+        try:
+            yield f"retry: {int(settings.STATUS_STREAM_POLL_INTERVAL * 1000)}\n" + _status_event(transaction_status_data(transaction))
+            while transaction.status == 'pending':
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    outcome = 'timeout'
+                    return
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(future), min(settings.STATUS_STREAM_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                # The notification only says something changed; the row (from the primary) is the truth
+                hub.unsubscribe(reference, future)
+                future = hub.subscribe(reference)
+                transaction = await lookup.using(DEFAULT_DB_ALIAS).afirst()
+                if transaction is None:
+                    # Archived since; archives only hold settled transactions
+                    outcome = 'settled'
+                    return
+                if transaction.status != 'pending':
+                    yield _status_event(transaction_status_data(transaction))
+            outcome = 'settled'
+        finally:
+            hub.unsubscribe(reference, future)
+            metrics.record_status_stream(outcome)
@@ -0,0 +1,122 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser as SimpleJWTTokenUser
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import metrics
+from .models import User
+
+
+class TokenUser(SimpleJWTTokenUser):
+    """Stateless user backed by the access token's claims; never touches the database"""
+
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+
+    @cached_property
+    def name(self):
+        return self.token.get('name', '')
+
+
+def refresh_token_for(user):
+    """Refresh token carrying the claims the payment endpoints need (copied into access tokens)"""
+    refresh = RefreshToken.for_user(user)
+    refresh['email'] = user.email
+    refresh['name'] = user.name
+    return refresh
+
+
+def issue_tokens(user):
+    refresh = refresh_token_for(user)
+    return {
+        'access_token': str(refresh.access_token),
+        'refresh_token': str(refresh),
+        'token_type': 'Bearer',
+        'expires_in': int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()),
+    }
+
+
+STREAM_TOKEN_SALT = 'auth_payment.status_stream'
+
+
+def stream_token_for(user_id, reference):
+    """
+    Signed token that opens one reference's status stream for STATUS_STREAM_TOKEN_TTL seconds.
+    EventSource cannot send headers, so it goes in the URL, where it may be logged; unlike an
+    access token it is useless for anything else and expires quickly.
+    """
+    return signing.dumps({'user_id': str(user_id), 'reference': reference}, salt=STREAM_TOKEN_SALT)
+
+
+def stream_token_user_id(token, reference):
+    """The user a stream token was issued to, or None if it is invalid, expired or for another reference"""
+    try:
+        claims = signing.loads(token, salt=STREAM_TOKEN_SALT, max_age=settings.STATUS_STREAM_TOKEN_TTL)
+    except signing.BadSignature:
+        return None
+    if claims.get('reference') != reference:
+        return None
+    return claims.get('user_id')
+
+
+class MeteredJWTAuthentication(JWTStatelessUserAuthentication):
+    """Stateless JWT authentication that records validation time per route in /metrics"""
+
+    def authenticate(self, request):
+        start = time.perf_counter()
+        result = 'anonymous'
+        try:
+            authenticated = super().authenticate(request)
+            if authenticated is not None:
+                result = 'valid'
+            return authenticated
+        except AuthenticationFailed:
+            result = 'invalid'
+            raise
+        finally:
+            match = getattr(request, 'resolver_match', None)
+            metrics.record_token_validation(
+                match.route if match else 'unmatched', result, time.perf_counter() - start
+            )
+
+
+def authenticate_token(request):
+    """
+    Authenticate a plain Django request (used by the async views).
+
+    Returns the TokenUser, or None when no bearer token was sent; raises AuthenticationFailed
+    (InvalidToken) for a malformed, bad or expired token.
+    """
+    authenticated = MeteredJWTAuthentication().authenticate(request)
+    return authenticated[0] if authenticated else None
+
+
+class UserTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that re-reads the user once, so deactivated users cannot keep minting access
+    tokens and profile changes reach the claims.
+    """
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        user = User.objects.filter(
+            pk=refresh.get(api_settings.USER_ID_CLAIM), is_active=True
+        ).only('id', 'email', 'name').first()
+        if user is None:
+            raise serializers.ValidationError({'refresh': 'User not found or inactive'})
+
+        return {'access': str(refresh_token_for(user).access_token)}
@@ -0,0 +1,37 @@
+"""
+System checks, run by ``manage.py check`` and before Gunicorn forks its workers (gunicorn.conf.py).
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def shared_cache_users():
+    """Features enabled in this configuration that only work if every worker sees the same cache"""
+    users = ['Paystack verify single-flight and result cache (PAYSTACK_VERIFY_CACHE_TTL)']
+    if settings.DATABASE_REPLICAS and settings.READ_REPLICA_STICKY_SECONDS > 0:
+        users.append('read-your-writes pins to the primary database (READ_REPLICA_STICKY_SECONDS)')
+    if any(settings.THROTTLE_RATES.values()):
+        users.append('rate limits and the Paystack outbound budget (THROTTLE_RATES), which would each be '
+                     'multiplied by the number of workers')
+    return users
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Several workers must not each keep their own copy of the default cache"""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.WEB_CONCURRENCY <= 1 or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f"WEB_CONCURRENCY={settings.WEB_CONCURRENCY} but the default cache ({backend}) is private to each worker "
+        f"process, so these are not coordinated between workers: {'; '.join(shared_cache_users())}.",
+        hint="Set CACHE_BACKEND to a shared cache, e.g. django.core.cache.backends.redis.RedisCache with "
+             "CACHE_LOCATION=redis://host:6379/0, or django.core.cache.backends.db.DatabaseCache with "
+             "CACHE_LOCATION=cache_table after `python manage.py createcachetable`.",
+        id='auth_payment.E001',
+    )]
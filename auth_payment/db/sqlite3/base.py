@@ -0,0 +1,34 @@
+"""
+Django's SQLite backend with settings for serving concurrent requests from one file.
+
+Two extra OPTIONS are understood (and not passed to sqlite3.connect):
+
+- ``pragmas``: {name: value} applied to every new connection, e.g. journal_mode=WAL so
+  readers never block the writer, and busy_timeout so writers queue instead of failing
+  with "database is locked".
+- ``transaction_mode``: 'IMMEDIATE' makes atomic() take the write lock when the block starts.
+  With the default deferred BEGIN, a block that reads and then writes cannot wait for the lock
+  (SQLite fails it immediately to avoid deadlock), so busy_timeout would not help.
+"""
+from django.db.backends.sqlite3 import base
+
+EXTRA_OPTIONS = ('pragmas', 'transaction_mode')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in EXTRA_OPTIONS:
+            params.pop(option, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        self.cursor().execute(f"BEGIN {mode}" if mode else "BEGIN")
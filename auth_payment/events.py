@@ -0,0 +1,49 @@
+import json
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard is in requirements.txt
+    zstandard = None
+
+ENCODING_JSON = 'json'
+ENCODING_ZSTD = 'zstd'
+
+# zstd (de)compressor objects are not thread-safe, so keep one per thread
+_local = threading.local()
+
+
+def _compressor():
+    if not hasattr(_local, 'compressor'):
+        _local.compressor = zstandard.ZstdCompressor(level=settings.TRANSACTION_EVENT_COMPRESSION_LEVEL)
+    return _local.compressor
+
+
+def _decompressor():
+    if not hasattr(_local, 'decompressor'):
+        _local.decompressor = zstandard.ZstdDecompressor()
+    return _local.decompressor
+
+
+def encode_payload(payload):
+    """
+    Serialize a payload to JSON bytes; returns (bytes, encoding). Bodies of at least
+    TRANSACTION_EVENT_COMPRESS_MIN_BYTES are zstd-compressed; smaller ones gain too little.
+    """
+    raw = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+    threshold = settings.TRANSACTION_EVENT_COMPRESS_MIN_BYTES
+    if zstandard is None or threshold <= 0 or len(raw) < threshold:
+        return raw, ENCODING_JSON
+    return _compressor().compress(raw), ENCODING_ZSTD
+
+
+def decode_payload(data, encoding):
+    data = bytes(data)  # BinaryField comes back as memoryview on some backends
+    if encoding == ENCODING_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed transaction events")
+        data = _decompressor().decompress(data)
+    return json.loads(data)
@@ -0,0 +1,234 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+from . import metrics
+from .resilience import CallPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class HostStats:
+    """Thread-safe per-host request counters shared by the sync and async clients"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _record(self, host, elapsed, status_code=None, error=False, provider=None, operation=None):
+        metrics.record_outbound(provider or host, operation, 'error' if error else status_code, elapsed)
+        error = error or status_code >= 500
+        with self._lock:
+            stats = self._stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_seconds': 0.0})
+            stats['requests'] += 1
+            stats['total_seconds'] += elapsed
+            if error:
+                stats['errors'] += 1
+
+    def host_stats(self):
+        with self._lock:
+            stats = {host: dict(values) for host, values in self._stats.items()}
+        for entry in stats.values():
+            entry['avg_seconds'] = entry['total_seconds'] / entry['requests'] if entry['requests'] else 0.0
+        return stats
+
+
+class HTTPClient(HostStats):
+    """Keep-alive, connection-pooled HTTP client for outbound provider calls"""
+
+    def __init__(self, pool_connections=10, pool_maxsize=20, connect_timeout=3.05, read_timeout=10):
+        super().__init__()
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        # Provider APIs are stateless; never let one caller's cookies leak into another's request.
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def request(self, method, url, provider=None, operation=None, **kwargs):
+        """
+        provider/operation label the latency metrics (defaulting to the host and method) and
+        select the circuit breaker; calls with a provider may raise CircuitOpenError.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        operation = operation or method
+        policy = CallPolicy(provider, operation, method)
+        while True:
+            policy.before_attempt()
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record(host, time.perf_counter() - start, error=True, provider=provider, operation=operation)
+                delay = policy.after_attempt(error=True)
+                if delay is None:
+                    raise
+            else:
+                self._record(host, time.perf_counter() - start, status_code=response.status_code,
+                             provider=provider, operation=operation)
+                delay = policy.after_attempt(status_code=response.status_code)
+                if delay is None:
+                    return response
+                response.close()
+            logger.info("Retrying %s %s in %.2fs (attempt %s)", method, url, delay, policy.attempt)
+            time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def warm_up(self, urls):
+        """Open a TLS connection to each URL so the first real call skips the handshake"""
+        for url in urls:
+            try:
+                self.request('HEAD', url, operation='warm_up', allow_redirects=False)
+                logger.info("Warmed up connection to %s", url)
+            except requests.exceptions.RequestException as e:
+                logger.warning("Connection warm-up failed for %s: %s", url, e)
+
+    def pool_stats(self):
+        """Per-host request counters merged with the live urllib3 pool state"""
+        stats = self.host_stats()
+
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            host = pool.host if pool.port in (None, 80, 443) else f"{pool.host}:{pool.port}"
+            entry = stats.setdefault(host, {'requests': 0, 'errors': 0, 'total_seconds': 0.0, 'avg_seconds': 0.0})
+            entry['connections_opened'] = pool.num_connections
+            entry['pool_requests'] = pool.num_requests
+            entry['idle_connections'] = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+        return stats
+
+
+class AsyncHTTPClient(HostStats):
+    """httpx-based counterpart of HTTPClient for the async views"""
+
+    def __init__(self, max_connections=100, max_keepalive_connections=20, connect_timeout=3.05, read_timeout=10):
+        super().__init__()
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            cookies=httpx.Cookies(CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))),
+        )
+
+    async def request(self, method, url, provider=None, operation=None, **kwargs):
+        host = urlsplit(url).netloc
+        operation = operation or method
+        policy = CallPolicy(provider, operation, method)
+        while True:
+            policy.before_attempt()
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, url, **kwargs)
+            except httpx.HTTPError:
+                self._record(host, time.perf_counter() - start, error=True, provider=provider, operation=operation)
+                delay = policy.after_attempt(error=True)
+                if delay is None:
+                    raise
+            else:
+                self._record(host, time.perf_counter() - start, status_code=response.status_code,
+                             provider=provider, operation=operation)
+                delay = policy.after_attempt(status_code=response.status_code)
+                if delay is None:
+                    return response
+                await response.aclose()
+            logger.info("Retrying %s %s in %.2fs (attempt %s)", method, url, delay, policy.attempt)
+            await asyncio.sleep(delay)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    def pool_stats(self):
+        return self.host_stats()
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Return this process's shared client, rebuilding it after a fork"""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = HTTPClient(
+                    pool_connections=settings.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+                    connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+                    read_timeout=settings.HTTP_READ_TIMEOUT,
+                )
+                _client_pid = pid
+    return _client
+
+
+def _sample_pools(registry):
+    """Metrics collector: pool state of this worker's sync client, if it has been created"""
+    if _client is None or _client_pid != os.getpid():
+        return
+    for host, entry in _client.pool_stats().items():
+        if 'connections_opened' in entry:
+            registry.set('outbound_pool_connections_opened_total', {'host': host}, entry['connections_opened'])
+            registry.set('outbound_pool_idle_connections', {'host': host}, entry['idle_connections'])
+
+
+metrics.register_collector(_sample_pools)
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_http_client():
+    """Return the async client bound to the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncHTTPClient(
+            max_connections=settings.HTTP_ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAXSIZE,
+            connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+            read_timeout=settings.HTTP_READ_TIMEOUT,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def aclose_async_http_client():
+    """Close the running loop's async client (ASGI lifespan shutdown)"""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def warm_up_http_client():
+    """Pre-open provider connections; called once per worker at boot"""
+    urls = settings.HTTP_WARMUP_URLS
+    if urls:
+        get_http_client().warm_up(urls)
@@ -0,0 +1,164 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction as db_transaction
+from django.utils import timezone
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyKeyMismatch(Exception):
+    """The key was already used with a different request body"""
+
+
+class IdempotencyKeyInProgress(Exception):
+    """The first request with this key is still running"""
+
+
+def request_fingerprint(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def _lease_expiry():
+    return timezone.now() + timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT)
+
+
+def _key_expiry_cutoff():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def _claim(user_id, key, fingerprint):
+    """Insert the key as in-progress; returns the record, or None if it already exists"""
+    try:
+        with db_transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user_id=user_id,
+                key=key,
+                request_fingerprint=fingerprint,
+                locked_until=_lease_expiry(),
+            )
+    except IntegrityError:
+        return None
+
+
+def _inspect(user_id, key, fingerprint):
+    """
+    Decide what to do with an existing key.
+
+    Returns ('replay', record) for a completed key, ('owned', record) when an abandoned
+    lease was taken over, ('wait', None) while another request holds it, or
+    ('retry', None) when the key vanished and can be claimed again.
+    """
+    record = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+    if record is None:
+        return 'retry', None
+
+    if record.created_at < _key_expiry_cutoff():
+        record.delete()
+        return 'retry', None
+
+    if record.request_fingerprint != fingerprint:
+        raise IdempotencyKeyMismatch(key)
+
+    if record.status == 'completed':
+        return 'replay', record
+
+    if record.locked_until < timezone.now():
+        taken_over = IdempotencyKey.objects.filter(
+            pk=record.pk, status='in_progress', locked_until=record.locked_until
+        ).update(locked_until=_lease_expiry())
+        if taken_over:
+            logger.warning("Taking over abandoned idempotency key %s", key)
+            return 'owned', record
+
+    return 'wait', None
+
+
+def begin(user_id, key, fingerprint):
+    """
+    Claim an Idempotency-Key for this request.
+
+    Returns (record, None) when the caller owns the key and must finish with complete()
+    or release(), or (None, record) with the stored response to replay. Concurrent
+    retries block until the first request finishes, up to IDEMPOTENCY_WAIT_TIMEOUT.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        record = _claim(user_id, key, fingerprint)
+        if record is not None:
+            return record, None
+
+        action, record = _inspect(user_id, key, fingerprint)
+        if action == 'replay':
+            return None, record
+        if action == 'owned':
+            return record, None
+        if action == 'wait':
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress(key)
+            time.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+
+async def abegin(user_id, key, fingerprint):
+    """Async variant of begin() that waits without blocking the event loop"""
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+    while True:
+        try:
+            record = await IdempotencyKey.objects.acreate(
+                user_id=user_id,
+                key=key,
+                request_fingerprint=fingerprint,
+                locked_until=_lease_expiry(),
+            )
+            return record, None
+        except IntegrityError:
+            pass
+
+        action, record = await sync_to_async(_inspect)(user_id, key, fingerprint)
+        if action == 'replay':
+            return None, record
+        if action == 'owned':
+            return record, None
+        if action == 'wait':
+            if time.monotonic() >= deadline:
+                raise IdempotencyKeyInProgress(key)
+            await asyncio.sleep(settings.IDEMPOTENCY_POLL_INTERVAL)
+
+
+def complete(record, response_status, response_body):
+    """Store the response so later retries replay it"""
+    IdempotencyKey.objects.filter(pk=record.pk).update(
+        status='completed',
+        response_status=response_status,
+        response_body=response_body,
+    )
+
+
+def finish(record, response_status, response_body):
+    """
+    complete() for a definitive response: a success, or a 4xx rejecting the request itself.
+    A 5xx or the 402 answered when Paystack could not be reached (timeout, network error,
+    open circuit) releases the key instead, so a retry runs again rather than replaying it.
+    """
+    if response_status < 500 and response_status != 402:
+        complete(record, response_status, response_body)
+    else:
+        release(record)
+
+
+def release(record):
+    """Forget a key whose request failed unexpectedly so the client can retry it"""
+    IdempotencyKey.objects.filter(pk=record.pk, status='in_progress').delete()
+
+
+def purge_expired():
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=_key_expiry_cutoff()).delete()
+    return deleted
@@ -0,0 +1,57 @@
+import copy
+import threading
+
+from cachetools import TTLCache
+from django.conf import settings
+
+
+class IdentityCache:
+    """
+    Bounded per-process cache of google_id -> User for the login path.
+
+    Entries expire after ``ttl`` seconds and the least recently used are evicted beyond
+    ``maxsize``. Saving or deleting a User invalidates its entry in this process
+    (``invalidate_user`` signal receiver); other workers, and queryset ``update()`` calls,
+    are only seen once the entry expires. Until then a login on such a worker gets the old
+    row: profile fields are compared with Google's and rewritten, but a user deactivated
+    elsewhere can still sign in for up to ``ttl`` seconds. That is the same window an
+    already issued access token stays valid for (token refresh re-reads is_active), so keep
+    USER_IDENTITY_CACHE_TTL at or below ACCESS_TOKEN_LIFETIME, or 0 to disable the cache.
+    Callers get copies, so a request mutating its user cannot change the cached instance.
+    """
+
+    def __init__(self, maxsize=10000, ttl=300):
+        self.enabled = maxsize > 0 and ttl > 0
+        self._lock = threading.Lock()
+        self._users = TTLCache(maxsize=max(maxsize, 1), ttl=max(ttl, 1))
+
+    def get(self, google_id):
+        if not self.enabled or not google_id:
+            return None
+        with self._lock:
+            user = self._users.get(google_id)
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user):
+        if not self.enabled or not user.google_id:
+            return
+        with self._lock:
+            self._users[user.google_id] = copy.copy(user)
+
+    def invalidate(self, google_id):
+        if not google_id:
+            return
+        with self._lock:
+            self._users.pop(google_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_identity_cache = IdentityCache(settings.USER_IDENTITY_CACHE_SIZE, settings.USER_IDENTITY_CACHE_TTL)
+
+
+def invalidate_user(sender, instance, **kwargs):
+    """post_save/post_delete receiver for User"""
+    user_identity_cache.invalidate(instance.google_id)
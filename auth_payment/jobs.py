@@ -0,0 +1,46 @@
+"""
+Background jobs run by the ``runscheduler`` management command.
+
+Jobs are module-level functions so DjangoJobStore can persist references to them.
+"""
+import logging
+
+from django_apscheduler import util
+from django_apscheduler.models import DjangoJobExecution
+
+from .archive import archive_transactions
+from .idempotency import purge_expired
+from .reconciliation import reconcile_pending
+from .webhooks import drain_inbox
+
+logger = logging.getLogger(__name__)
+
+
+@util.close_old_connections
+def process_webhook_inbox():
+    handled = drain_inbox()
+    if handled:
+        logger.info("Webhook inbox job handled %s events", handled)
+
+
+@util.close_old_connections
+def reconcile_pending_transactions():
+    reconcile_pending()
+
+
+@util.close_old_connections
+def archive_settled_transactions():
+    archive_transactions()
+
+
+@util.close_old_connections
+def purge_expired_idempotency_keys():
+    deleted = purge_expired()
+    if deleted:
+        logger.info("Purged %s expired idempotency keys", deleted)
+
+
+@util.close_old_connections
+def delete_old_job_executions(max_age=604_800):
+    """Drop scheduler execution logs older than max_age seconds"""
+    DjangoJobExecution.objects.delete_old_job_executions(max_age)
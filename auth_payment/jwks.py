@@ -0,0 +1,68 @@
+import re
+import time
+import logging
+import threading
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def _max_age(cache_control, default):
+    match = _MAX_AGE.search(cache_control or '')
+    return int(match.group(1)) if match else default
+
+
+class JWKSCache:
+    """
+    In-process cache of a JSON Web Key Set, keyed by ``kid``.
+
+    Keys are kept for the ``max-age`` the endpoint advertises. An unknown ``kid`` triggers
+    an early refetch (to pick up rotated keys), but at most once per ``min_refresh_interval``
+    so tokens with bogus key ids cannot make us hammer the endpoint. Fetching is left to the
+    caller, so the same cache serves the sync and async login paths.
+    """
+
+    def __init__(self, default_ttl=3600, min_refresh_interval=30):
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+
+    def get(self, kid, allow_stale=False):
+        """
+        Return the cached key, or None if it is unknown or the set has expired. allow_stale
+        returns expired keys too, for when the key endpoint cannot be reached.
+        """
+        with self._lock:
+            if time.monotonic() >= self._expires_at and not allow_stale:
+                return None
+            return self._keys.get(kid)
+
+    def needs_fetch(self, kid):
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires_at:
+                return True
+            return kid not in self._keys and now - self._fetched_at >= self.min_refresh_interval
+
+    def store(self, jwks, cache_control=None):
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            try:
+                key = jwt.PyJWK(jwk)
+            except (jwt.PyJWKError, jwt.InvalidKeyError) as e:
+                logger.warning("Skipping unusable JWK %s: %s", jwk.get('kid'), e)
+                continue
+            keys[key.key_id] = key
+
+        now = time.monotonic()
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + _max_age(cache_control, self.default_ttl)
+        logger.info("Loaded %s signing keys", len(keys))
@@ -0,0 +1,155 @@
+"""
+Logging pipeline used by settings.LOGGING.
+
+Application threads only format the message and push the record onto a bounded queue;
+a single listener thread writes JSON lines to a log file and the console. This module
+is imported while settings are being configured, so it must not touch Django models.
+
+Size-based rotation is only safe with one writer: with several workers on the same file,
+each rotates it under the others. Workers therefore write one file per process
+(``per_process``), or append to a shared file rotated externally, e.g. by logrotate
+(``watched``).
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import weakref
+from pathlib import Path
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, WatchedFileHandler
+
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+FILE_MODES = ('rotate', 'per_process', 'watched')
+
+_handlers = weakref.WeakSet()
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including any ``extra=`` fields"""
+
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'process': record.process,
+            'thread': record.thread,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of sub-WARNING records for the configured loggers.
+
+    ``rates`` maps logger names to the fraction of records to keep; the most specific
+    matching name wins. Warnings and errors always pass.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = rates or {}
+
+    def _rate_for(self, name):
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition('.')[0]
+        return 1.0
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+def per_process_filename(filename, pid=None):
+    """app.log -> app.<pid>.log"""
+    path = Path(filename)
+    return str(path.with_name(f"{path.stem}.{pid or os.getpid()}{path.suffix}"))
+
+
+def file_handler(filename, mode='rotate', max_bytes=10 * 1024 * 1024, backup_count=5):
+    """
+    Handler for the JSON log file. ``rotate``: one process rotates ``filename`` by size;
+    ``per_process``: the same, on a file of this process's own; ``watched``: append to
+    ``filename`` and reopen it after an external rotation.
+    """
+    if mode not in FILE_MODES:
+        raise ValueError(f"Unknown log file mode {mode!r}; expected one of {', '.join(FILE_MODES)}")
+    if mode == 'watched':
+        return WatchedFileHandler(filename, encoding='utf-8', delay=True)
+    if mode == 'per_process':
+        filename = per_process_filename(filename)
+    return RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True)
+
+
+def dropped_records():
+    """Records this process dropped because its log queue was full"""
+    return sum(handler.dropped for handler in list(_handlers))
+
+
+class AsyncLogHandler(QueueHandler):
+    """
+    Queue-backed handler that writes to a JSON log file and the console
+    from a background listener thread.
+
+    When the queue is full, records below WARNING are dropped rather than blocking
+    the request thread; ``dropped`` counts them.
+    """
+
+    def __init__(self, filename=None, max_bytes=10 * 1024 * 1024, backup_count=5, file_mode='rotate',
+                 console=True, console_format='{levelname} {message}', queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        _handlers.add(self)
+
+        targets = []
+        if filename:
+            file_target = file_handler(filename, file_mode, max_bytes, backup_count)
+            file_target.setFormatter(JSONFormatter())
+            targets.append(file_target)
+        if console:
+            console_handler = logging.StreamHandler(sys.stderr)
+            console_handler.setFormatter(
+                JSONFormatter() if console_format == 'json' else logging.Formatter(console_format, style='{')
+            )
+            targets.append(console_handler)
+
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Merge args into the message on the calling thread (they may be mutated later),
+        # but leave everything else to the listener thread's formatters.
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                self.dropped += 1
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from auth_payment.archive import archive_transactions
+
+
+class Command(BaseCommand):
+    help = "Move settled transactions older than ARCHIVE_AFTER_DAYS into compressed archive segments"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=None,
+                            help="Archive success/failed/abandoned transactions created more than this many days ago")
+        parser.add_argument('--batch-size', type=int, default=None, help="Transactions per segment file")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many transactions")
+
+    def handle(self, *args, **options):
+        report = archive_transactions(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(report.summary()))
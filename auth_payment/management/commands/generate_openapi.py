@@ -0,0 +1,34 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from auth_payment.api_docs import CODECS, render_schema
+
+
+class Command(BaseCommand):
+    help = "Write the OpenAPI schema (openapi.json, openapi.yaml) served by the docs views to OPENAPI_SCHEMA_DIR"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', default=None, help="Directory to write to (default: OPENAPI_SCHEMA_DIR)")
+        parser.add_argument('--check', action='store_true',
+                            help="Write nothing; exit with an error if the files are missing or out of date")
+
+    def handle(self, *args, **options):
+        output_dir = Path(options['output_dir'] or settings.OPENAPI_SCHEMA_DIR)
+        stale = []
+        for fmt in CODECS:
+            path = output_dir / f'openapi.{fmt}'
+            schema = render_schema(fmt)
+            if options['check']:
+                if not path.exists() or path.read_bytes() != schema:
+                    stale.append(str(path))
+                continue
+            output_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(schema)
+            self.stdout.write(f"Wrote {path} ({len(schema)} bytes)")
+
+        if stale:
+            raise CommandError(f"OpenAPI schema out of date, run generate_openapi: {', '.join(stale)}")
+        if options['check']:
+            self.stdout.write(self.style.SUCCESS("OpenAPI schema is up to date"))
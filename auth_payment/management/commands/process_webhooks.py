@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from auth_payment.webhooks import drain_inbox
+
+
+class Command(BaseCommand):
+    help = "Drain the Paystack webhook inbox once and apply the queued status transitions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Events claimed per batch")
+        parser.add_argument('--max-batches', type=int, default=None, help="Stop after this many batches")
+
+    def handle(self, *args, **options):
+        handled = drain_inbox(batch_size=options['batch_size'], max_batches=options['max_batches'])
+        self.stdout.write(self.style.SUCCESS(f"Processed {handled} webhook events"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from auth_payment.reconciliation import reconcile_pending
+
+
+class Command(BaseCommand):
+    help = "Verify stale pending transactions against Paystack and bulk-update any status drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=None,
+                            help="Only reconcile pending transactions untouched for this many minutes")
+        parser.add_argument('--concurrency', type=int, default=None, help="Maximum Paystack calls in flight")
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows fetched and updated per batch")
+        parser.add_argument('--limit', type=int, default=None, help="Stop after this many transactions")
+
+    def handle(self, *args, **options):
+        report = reconcile_pending(
+            stale_minutes=options['stale_minutes'],
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+        )
+        self.stdout.write(self.style.SUCCESS(report.summary()))
@@ -0,0 +1,66 @@
+import logging
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django_apscheduler.jobstores import DjangoJobStore
+
+from auth_payment import jobs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Run the background job scheduler (webhook inbox, reconciliation, archival and housekeeping)"
+
+    def handle(self, *args, **options):
+        scheduler = BlockingScheduler(timezone=settings.TIME_ZONE)
+        scheduler.add_jobstore(DjangoJobStore(), "default")
+
+        scheduler.add_job(
+            jobs.process_webhook_inbox,
+            trigger=IntervalTrigger(seconds=settings.WEBHOOK_POLL_INTERVAL),
+            id="process_webhook_inbox",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            jobs.reconcile_pending_transactions,
+            trigger=IntervalTrigger(minutes=settings.RECONCILE_INTERVAL_MINUTES),
+            id="reconcile_pending_transactions",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            jobs.archive_settled_transactions,
+            trigger=IntervalTrigger(hours=settings.ARCHIVE_INTERVAL_HOURS),
+            id="archive_settled_transactions",
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            jobs.purge_expired_idempotency_keys,
+            trigger=IntervalTrigger(hours=1),
+            id="purge_expired_idempotency_keys",
+            max_instances=1,
+            replace_existing=True,
+        )
+        scheduler.add_job(
+            jobs.delete_old_job_executions,
+            trigger=CronTrigger(day_of_week="mon", hour="00", minute="00"),
+            id="delete_old_job_executions",
+            max_instances=1,
+            replace_existing=True,
+        )
+
+        try:
+            logger.info("Starting scheduler")
+            scheduler.start()
+        except KeyboardInterrupt:
+            logger.info("Stopping scheduler")
+            scheduler.shutdown()
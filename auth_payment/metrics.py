@@ -0,0 +1,320 @@
+"""
+Request, database and provider-call metrics in Prometheus text format.
+
+Each worker process keeps its own counters and histograms in memory and, when METRICS_DIR
+is set, periodically writes a snapshot file there. The /metrics view merges every snapshot
+in the directory, so a scrape returns totals for all gunicorn workers no matter which worker
+serves it. Clear METRICS_DIR on deploy; files from exited workers are kept so counters never
+go backwards. Gauges report the maximum across workers whose snapshot is recent.
+"""
+import os
+import json
+import time
+import atexit
+import bisect
+import logging
+import tempfile
+import threading
+import contextvars
+from pathlib import Path
+
+from django.conf import settings
+
+from . import logging_utils
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', 'HTTP responses by route, method and status code', None),
+    'http_request_duration_seconds': (
+        'histogram', 'Request latency by route and method', LATENCY_BUCKETS),
+    'http_request_db_queries': (
+        'histogram', 'Database queries executed per request, by route', QUERY_COUNT_BUCKETS),
+    'http_request_db_duration_seconds': (
+        'histogram', 'Time spent in database queries per request, by route', LATENCY_BUCKETS),
+    'auth_token_validation_seconds': (
+        'histogram', 'Access token validation time by route and result', FAST_BUCKETS),
+    'outbound_requests_total': (
+        'counter', 'Provider API calls by provider, operation and status code', None),
+    'outbound_request_duration_seconds': (
+        'histogram', 'Provider API call latency by provider and operation', LATENCY_BUCKETS),
+    'outbound_retries_total': (
+        'counter', 'Provider API calls retried, by provider and operation', None),
+    'outbound_retry_budget_exhausted_total': (
+        'counter', 'Retries skipped because the retry budget was spent, by provider', None),
+    'outbound_pool_connections_opened_total': (
+        'counter', 'Connections opened by the sync provider client pool, by host', None),
+    'outbound_pool_idle_connections': (
+        'gauge', 'Idle keep-alive connections in the sync provider client pool, by host; largest of any worker', None),
+    'outbound_short_circuited_total': (
+        'counter', 'Provider API calls rejected by an open circuit breaker', None),
+    'circuit_breaker_state': (
+        'gauge', 'Circuit breaker state per provider (0 closed, 1 half-open, 2 open); worst worker wins', None),
+    'circuit_breaker_transitions_total': (
+        'counter', 'Circuit breaker state changes by provider and new state', None),
+    'status_streams_total': (
+        'counter', 'Transaction status streams closed, by outcome (settled, timeout, disconnected)', None),
+    'status_notifications_total': (
+        'counter', 'Status changes delivered to waiting streams, by source (listen, local, poll)', None),
+    'throttled_total': (
+        'counter', 'Requests and provider calls rejected by a rate limit, by bucket and scope', None),
+    'log_records_dropped_total': (
+        'counter', 'INFO/DEBUG log records dropped because the log queue was full', None),
+}
+
+
+class Registry:
+    """Thread-safe counters and histograms for one process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        # Per-bucket (non-cumulative) counts with a trailing +Inf slot, followed by the sum
+        index = bisect.bisect_left(buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0] * (len(buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                [name, list(labels), list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self._values.items()
+            ]
+
+
+_registry = None
+_registry_pid = None
+_collectors = []
+_registry_lock = threading.Lock()
+_snapshot_path = None
+
+
+def get_registry():
+    """Return this process's registry, starting fresh (and flushing to a new file) after a fork"""
+    global _registry, _registry_pid, _snapshot_path
+    pid = os.getpid()
+    if _registry is None or _registry_pid != pid:
+        with _registry_lock:
+            if _registry is None or _registry_pid != pid:
+                _registry = Registry()
+                _registry_pid = pid
+                if settings.METRICS_DIR:
+                    _snapshot_path = Path(settings.METRICS_DIR) / f"{pid}_{time.time_ns()}.json"
+                    _start_flusher(_registry, _snapshot_path)
+    return _registry
+
+
+def register_collector(collector):
+    """collector(registry) is called before every snapshot to sample live state (e.g. pool sizes)"""
+    _collectors.append(collector)
+
+
+def _sample(registry):
+    for collector in _collectors:
+        try:
+            collector(registry)
+        except Exception as e:
+            logger.warning("Metrics collector %s failed: %s", collector.__name__, e)
+    return registry.snapshot()
+
+
+def _write_snapshot(registry, path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp_')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'written_at': time.time(), 'values': _sample(registry)}, f)
+    os.replace(tmp, path)
+
+
+def _start_flusher(registry, path):
+    def flush():
+        try:
+            _write_snapshot(registry, path)
+        except OSError as e:
+            logger.warning("Could not write metrics snapshot %s: %s", path, e)
+
+    def run():
+        while True:
+            time.sleep(settings.METRICS_FLUSH_INTERVAL)
+            flush()
+
+    threading.Thread(target=run, name='metrics-flusher', daemon=True).start()
+    atexit.register(flush)
+
+
+def record_request(route, method, status_code, elapsed, db_queries, db_seconds):
+    registry = get_registry()
+    registry.inc('http_requests_total', {'route': route, 'method': method, 'status': str(status_code)})
+    registry.observe('http_request_duration_seconds', {'route': route, 'method': method}, elapsed)
+    registry.observe('http_request_db_queries', {'route': route}, db_queries)
+    registry.observe('http_request_db_duration_seconds', {'route': route}, db_seconds)
+
+
+def record_token_validation(route, result, elapsed):
+    get_registry().observe('auth_token_validation_seconds', {'route': route, 'result': result}, elapsed)
+
+
+def record_outbound(provider, operation, status_code, elapsed):
+    """status_code is the HTTP status, or 'error' when no response was received"""
+    registry = get_registry()
+    registry.inc('outbound_requests_total', {'provider': provider, 'operation': operation, 'status': str(status_code)})
+    registry.observe('outbound_request_duration_seconds', {'provider': provider, 'operation': operation}, elapsed)
+
+
+def record_retry(provider, operation):
+    get_registry().inc('outbound_retries_total', {'provider': provider, 'operation': operation})
+
+
+def record_retry_budget_exhausted(provider):
+    get_registry().inc('outbound_retry_budget_exhausted_total', {'provider': provider})
+
+
+def record_short_circuit(provider, operation):
+    get_registry().inc('outbound_short_circuited_total', {'provider': provider, 'operation': operation})
+
+
+def record_breaker_state(provider, state, value):
+    registry = get_registry()
+    registry.set('circuit_breaker_state', {'provider': provider}, value)
+    registry.inc('circuit_breaker_transitions_total', {'provider': provider, 'state': state})
+
+
+def record_status_stream(outcome):
+    get_registry().inc('status_streams_total', {'outcome': outcome})
+
+
+def record_status_notification(source):
+    get_registry().inc('status_notifications_total', {'source': source})
+
+
+def record_throttled(bucket, scope):
+    get_registry().inc('throttled_total', {'bucket': bucket, 'scope': scope})
+
+
+def _sample_logging(registry):
+    """Metrics collector: log records this worker dropped"""
+    registry.set('log_records_dropped_total', {}, logging_utils.dropped_records())
+
+
+register_collector(_sample_logging)
+
+
+# Per-request database counters: [query count, seconds]. Carried in a contextvar so queries made
+# from sync_to_async threads are attributed to the request that awaited them.
+_request_db_stats = contextvars.ContextVar('request_db_stats', default=None)
+
+
+def _db_execute_wrapper(execute, sql, params, many, context):
+    stats = _request_db_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+def install_db_instrumentation(sender, connection, **kwargs):
+    """connection_created receiver; wraps every query on the new connection"""
+    if _db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_execute_wrapper)
+
+
+def start_request_db_tracking():
+    stats = [0, 0.0]
+    return _request_db_stats.set(stats), stats
+
+
+def stop_request_db_tracking(token):
+    _request_db_stats.reset(token)
+
+
+def _collect():
+    """Merge the snapshots of every worker (or just this process without METRICS_DIR)"""
+    registry = get_registry()
+    if not settings.METRICS_DIR:
+        return _sample(registry)
+
+    _write_snapshot(registry, _snapshot_path)
+    merged = {}
+    # Gauges describe live state, so ignore them from workers that stopped flushing
+    gauge_cutoff = time.time() - 3 * settings.METRICS_FLUSH_INTERVAL
+    for path in Path(settings.METRICS_DIR).glob('*.json'):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot['values']:
+            kind = METRICS.get(name, ('counter',))[0]
+            key = (name, tuple(tuple(pair) for pair in labels))
+            if kind == 'gauge':
+                if snapshot['written_at'] >= gauge_cutoff:
+                    merged[key] = max(merged.get(key, value), value)
+            elif key not in merged:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+    return [[name, labels, value] for (name, labels), value in merged.items()]
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def render_prometheus():
+    """Prometheus text exposition format (version 0.0.4)"""
+    by_name = {}
+    for name, labels, value in _collect():
+        if name in METRICS:
+            by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(by_name.get(name, []), key=lambda item: item[0]):
+            if kind in ('counter', 'gauge'):
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], value[:-1]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bound)])} {cumulative}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value[-1]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,51 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from . import metrics
+
+
+class MetricsMiddleware:
+    """
+    Record latency, status code and database usage for every request, labelled by URL route.
+
+    Works in both WSGI and ASGI stacks; place it first in MIDDLEWARE so the timing covers
+    the rest of the middleware chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token, db_stats = metrics.start_request_db_tracking()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.stop_request_db_tracking(token)
+        self._record(request, response, time.perf_counter() - start, db_stats)
+        return response
+
+    async def __acall__(self, request):
+        token, db_stats = metrics.start_request_db_tracking()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.stop_request_db_tracking(token)
+        self._record(request, response, time.perf_counter() - start, db_stats)
+        return response
+
+    @staticmethod
+    def _record(request, response, elapsed, db_stats):
+        # Label by route pattern, not path, so per-reference URLs don't explode cardinality
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        metrics.record_request(route, request.method, response.status_code, elapsed, db_stats[0], db_stats[1])
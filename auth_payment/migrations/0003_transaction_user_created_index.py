@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-17 00:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_payment', '0002_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='transaction_user_id_6dfda9_idx'),
+        ),
+    ]
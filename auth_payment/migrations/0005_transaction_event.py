@@ -0,0 +1,77 @@
+# Generated by Django 5.0.14 on 2026-10-17 01:02
+
+import json
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+BATCH_SIZE = 500
+
+# Known Transaction.metadata keys and the event kind they become; anything else is kept
+# under a 'metadata' event so the backfill loses nothing. user_data duplicated the users row.
+METADATA_KINDS = {
+    'paystack_response': 'initialize',
+    'webhook_data': 'webhook',
+    'verified_at': 'verify',
+}
+DROPPED_KEYS = {'user_data'}
+
+
+def _event(TransactionEvent, txn, kind, data, created_at):
+    # Stored as plain JSON; the app reads both plain and compressed payloads
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8')
+    return TransactionEvent(transaction_id=txn.pk, kind=kind, encoding='json', payload=payload, created_at=created_at)
+
+
+def backfill_events(apps, schema_editor):
+    Transaction = apps.get_model('auth_payment', 'Transaction')
+    TransactionEvent = apps.get_model('auth_payment', 'TransactionEvent')
+
+    events = []
+    rows = Transaction.objects.only('id', 'metadata', 'created_at', 'updated_at').order_by('pk')
+    for txn in rows.iterator(chunk_size=BATCH_SIZE):
+        metadata = dict(txn.metadata or {})
+        for key, kind in METADATA_KINDS.items():
+            if key not in metadata:
+                continue
+            value = metadata.pop(key)
+            data = {key: value} if kind == 'verify' else value
+            created_at = txn.created_at if kind == 'initialize' else txn.updated_at
+            events.append(_event(TransactionEvent, txn, kind, data, created_at))
+        leftover = {key: value for key, value in metadata.items() if key not in DROPPED_KEYS}
+        if leftover:
+            events.append(_event(TransactionEvent, txn, 'metadata', leftover, txn.updated_at))
+
+        if len(events) >= BATCH_SIZE:
+            TransactionEvent.objects.bulk_create(events)
+            events = []
+    if events:
+        TransactionEvent.objects.bulk_create(events)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_payment', '0004_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('initialize', 'Initialize response'), ('webhook', 'Webhook'), ('verify', 'Verification'), ('metadata', 'Legacy metadata')], max_length=20)),
+                ('encoding', models.CharField(max_length=10)),
+                ('payload', models.BinaryField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='auth_payment.transaction')),
+            ],
+            options={
+                'db_table': 'transaction_events',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunPython(backfill_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-17 01:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_payment', '0005_transaction_event'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='transaction',
+            name='metadata',
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 import uuid
 import logging
+from django.utils import timezone
+
+from .events import encode_payload, decode_payload
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +25,7 @@ class User(models.Model):
         return f"{self.email} ({self.name})"
     
     def save(self, *args, **kwargs):
-        logger.info(f"Saving/Updating user: {self.email}")
+        logger.info("Saving/Updating user: %s", self.email)
         super().save(*args, **kwargs)
 
 
@@ -43,7 +46,6 @@ class Transaction(models.Model):
     authorization_url = models.URLField(max_length=500, null=True, blank=True)
     paid_at = models.DateTimeField(null=True, blank=True)
     currency = models.CharField(max_length=3, default='NGN')
-    metadata = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -54,11 +56,139 @@ class Transaction(models.Model):
             models.Index(fields=['reference']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['paystack_reference']),
+            models.Index(fields=['user', 'created_at', 'id']),
+            models.Index(fields=['user', 'status', 'created_at']),
         ]
 
     def __str__(self):
         return f"{self.reference} - {self.amount} ({self.status})"
     
     def save(self, *args, **kwargs):
-        logger.info(f"Saving transaction {self.reference} with status {self.status}")
-        super().save(*args, **kwargs)
\ No newline at end of file
+        logger.info("Saving transaction %s with status %s", self.reference, self.status)
+        super().save(*args, **kwargs)
+
+
+class TransactionEvent(models.Model):
+    """
+    Append-only log of provider payloads for a transaction (initialize response, webhook
+    data, verification), kept out of the transactions table so status and list reads stay
+    narrow. Payloads are stored encoded; see events.encode_payload.
+    """
+    KIND_CHOICES = [
+        ('initialize', 'Initialize response'),
+        ('webhook', 'Webhook'),
+        ('verify', 'Verification'),
+        ('metadata', 'Legacy metadata'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    encoding = models.CharField(max_length=10)
+    payload = models.BinaryField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'transaction_events'
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.kind} for {self.transaction_id}"
+
+    @classmethod
+    def build(cls, transaction, kind, data):
+        """Unsaved event for `data`, for create()/bulk_create()"""
+        payload, encoding = encode_payload(data)
+        return cls(transaction=transaction, kind=kind, encoding=encoding, payload=payload)
+
+    @property
+    def data(self):
+        return decode_payload(self.payload, self.encoding)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Transaction events are append-only")
+        super().save(*args, **kwargs)
+
+
+class ArchivedTransaction(models.Model):
+    """
+    Where an archived transaction's record lives: a zstd block at (offset, length) in an
+    NDJSON segment under ARCHIVE_DIR. user_id is a plain column so the index stays narrow
+    and archived references survive without joins against the hot tables.
+    """
+    id = models.BigAutoField(primary_key=True)
+    reference = models.CharField(max_length=100, unique=True)
+    user_id = models.UUIDField()
+    segment = models.CharField(max_length=255)
+    offset = models.BigIntegerField()
+    length = models.PositiveIntegerField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'archived_transactions'
+
+    def __str__(self):
+        return f"{self.reference} -> {self.segment}@{self.offset}"
+
+
+class WebhookEvent(models.Model):
+    """Inbox of verified Paystack webhook deliveries awaiting background processing"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('dead', 'Dead'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    event = models.CharField(max_length=100)
+    reference = models.CharField(max_length=100, blank=True, default='')
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    available_at = models.DateTimeField(default=timezone.now)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'webhook_events'
+        ordering = ['received_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.reference} ({self.status})"
+
+
+
+class IdempotencyKey(models.Model):
+    """First response to an Idempotency-Key, replayed to any retry carrying the same key"""
+    STATUS_CHOICES = [
+        ('in_progress', 'In progress'),
+        ('completed', 'Completed'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    request_fingerprint = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    locked_until = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status})"
@@ -0,0 +1,163 @@
+"""
+Cross-worker "transaction status changed" notifications for the status stream.
+
+Status changes are published inside the transaction that makes them:
+
+- PostgreSQL: ``pg_notify`` on the ``transaction_status`` channel. It is delivered at commit
+  to every worker (this one included), whichever process made the change (web, scheduler, ...).
+- Other databases: delivered in-process on commit. Other processes' changes are picked up by
+  the hub's poller.
+
+Each event loop that serves streams has one StatusHub. The hub keeps reference -> waiting
+futures and runs a single background task: a LISTEN connection on PostgreSQL, plus a poller
+that checks every waiting reference with one query per STATUS_STREAM_POLL_INTERVAL while it
+is not listening. A thousand waiting clients therefore cost one connection or one query per
+interval, not a query each.
+"""
+import asyncio
+import logging
+import contextvars
+import threading
+import weakref
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction as db_transaction
+
+from . import metrics
+from .models import Transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'transaction_status'
+
+_hubs = weakref.WeakKeyDictionary()  # event loop -> StatusHub
+_hubs_lock = threading.Lock()
+
+
+def publish_statuses(changes, using=DEFAULT_DB_ALIAS):
+    """Announce (reference, status) changes once the current database transaction commits"""
+    changes = [(reference, status) for reference, status in changes if reference]
+    if not changes:
+        return
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                [CHANNEL, [f"{reference}:{status}" for reference, status in changes]],
+            )
+    else:
+        db_transaction.on_commit(lambda: _deliver_local(changes, 'local'), using=using)
+
+
+def _deliver_local(changes, source):
+    with _hubs_lock:
+        hubs = list(_hubs.values())
+    for hub in hubs:
+        try:
+            hub.loop.call_soon_threadsafe(hub.deliver_many, changes, source)
+        except RuntimeError:
+            pass  # loop already closed
+
+
+def get_hub():
+    """The StatusHub of the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _hubs_lock:
+        hub = _hubs.get(loop)
+        if hub is None:
+            hub = _hubs[loop] = StatusHub(loop)
+    return hub
+
+
+class StatusHub:
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.waiters = {}
+        self.listening = False
+        self._task = None
+
+    def subscribe(self, reference):
+        """Future resolved with the next status published for reference"""
+        future = self.loop.create_future()
+        self.waiters.setdefault(reference, set()).add(future)
+        if self._task is None or self._task.done():
+            # Outlives the request that started it: don't inherit its context (metrics, DB routing)
+            self._task = contextvars.Context().run(self.loop.create_task, self._run())
+        return future
+
+    def unsubscribe(self, reference, future):
+        futures = self.waiters.get(reference)
+        if futures is not None:
+            futures.discard(future)
+            if not futures:
+                del self.waiters[reference]
+
+    def deliver_many(self, changes, source):
+        for reference, status in changes:
+            futures = self.waiters.get(reference, ())
+            for future in futures:
+                if not future.done():
+                    future.set_result(status)
+            if futures:
+                metrics.record_status_notification(source)
+
+    async def _run(self):
+        listener = None
+        if connections[DEFAULT_DB_ALIAS].vendor == 'postgresql':
+            listener = self.loop.create_task(self._listen())
+        try:
+            while self.waiters:
+                await asyncio.sleep(settings.STATUS_STREAM_POLL_INTERVAL)
+                if not self.listening and self.waiters:
+                    await self._poll()
+        finally:
+            if listener:
+                listener.cancel()
+            self.listening = False
+
+    async def _poll(self):
+        references = list(self.waiters)
+        try:
+            changes = [
+                pair async for pair in Transaction.objects.filter(reference__in=references)
+                .exclude(status='pending').values_list('reference', 'status')
+            ]
+        except Exception as e:
+            logger.warning("Status stream poll failed: %s", e)
+            return
+        self.deliver_many(changes, 'poll')
+
+    async def _listen(self):
+        import psycopg
+
+        settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+        params = {
+            'dbname': settings_dict['NAME'],
+            'user': settings_dict['USER'],
+            'password': settings_dict['PASSWORD'],
+            'host': settings_dict['HOST'],
+            'port': settings_dict['PORT'],
+            **{key: value for key, value in settings_dict['OPTIONS'].items() if isinstance(value, (str, int))},
+        }
+        params = {key: value for key, value in params.items() if value not in (None, '')}
+        delay = 1
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(autocommit=True, **params) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    self.listening = True
+                    delay = 1
+                    # Anything committed before LISTEN took effect is caught by one last poll
+                    await self._poll()
+                    async for notify in conn.notifies():
+                        reference, _, status = notify.payload.rpartition(':')
+                        self.deliver_many([(reference, status)], 'listen')
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Status LISTEN connection failed, polling until it is back: %s", e)
+            self.listening = False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
@@ -0,0 +1,67 @@
+import json
+import uuid
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+
+
+class TransactionKeysetPagination(BasePagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+
+    Each page is a single range scan on the (user, created_at, id) index, so the cost of
+    a page does not depend on how deep into the listing the client is.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, settings.TRANSACTION_LIST_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: ["A valid integer is required."]})
+        return max(1, min(page_size, settings.TRANSACTION_LIST_MAX_PAGE_SIZE))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_at, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(created_at)
+            pk = uuid.UUID(pk)
+        except (ValueError, TypeError, AttributeError, binascii.Error, UnicodeEncodeError):
+            created_at = None
+        if created_at is None:
+            raise ValidationError({self.cursor_query_param: ["Invalid cursor."]})
+        return created_at, pk
+
+    @staticmethod
+    def encode_cursor(instance):
+        position = json.dumps([instance.created_at.isoformat(), str(instance.pk)])
+        return base64.urlsafe_b64encode(position.encode('ascii')).decode('ascii')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        if cursor is not None:
+            created_at, pk = cursor
+            queryset = queryset.filter(created_at__lte=created_at).filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        rows = list(queryset.order_by('-created_at', '-id')[:page_size + 1])
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.page
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1])
@@ -0,0 +1,136 @@
+import time
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Transaction
+from .services import record_verifications
+from .throttling import BudgetExhausted
+from .utils import PaystackHelper
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_PAYSTACK_STATUSES = {'success', 'failed', 'abandoned'}
+
+
+@dataclass
+class ReconciliationReport:
+    scanned: int = 0
+    verified: int = 0
+    provider_errors: int = 0
+    # Left pending for the next run because the Paystack outbound budget was spent
+    deferred: int = 0
+    updated: int = 0
+    drift: Counter = field(default_factory=Counter)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self):
+        return self.scanned / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self):
+        return self.provider_errors / self.scanned if self.scanned else 0.0
+
+    def summary(self):
+        drift = ", ".join(f"pending->{status}: {count}" for status, count in sorted(self.drift.items())) or "none"
+        return (
+            f"Scanned {self.scanned} transactions in {self.elapsed:.1f}s ({self.throughput:.1f}/s); "
+            f"verified {self.verified}, provider errors {self.provider_errors} ({self.error_rate:.1%}); "
+            f"deferred {self.deferred}; updated {self.updated}; drift: {drift}"
+        )
+
+
+def stale_pending_transactions(stale_minutes):
+    """Pending transactions that have not been touched for stale_minutes"""
+    cutoff = timezone.now() - timedelta(minutes=stale_minutes)
+    return (
+        Transaction.objects.filter(status='pending', updated_at__lte=cutoff)
+        .only('id', 'user_id', 'reference', 'paystack_reference', 'status', 'paid_at', 'updated_at')
+        .order_by()
+    )
+
+
+def _verify(txn):
+    try:
+        return PaystackHelper.verify_transaction(txn.paystack_reference or txn.reference)
+    except BudgetExhausted as e:
+        # Not a provider error: the call was never made
+        return e
+    except Exception as e:
+        logger.error("Reconciliation verify failed for %s: %s", txn.reference, e)
+        return None
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def reconcile_pending(stale_minutes=None, concurrency=None, batch_size=None, limit=None):
+    """
+    Verify stale pending transactions against Paystack and write back any status drift.
+
+    Rows are streamed with a server-side cursor where the database supports one, verified
+    with at most ``concurrency`` calls in flight, and persisted per chunk with one conditional
+    UPDATE per status that only touches rows still pending.
+    Once the Paystack outbound budget (THROTTLE_RATES['paystack_outbound']) is spent, the run
+    stops after the current chunk and leaves the remaining rows to the next one, so the
+    budget is not drained ahead of user-facing calls.
+    """
+    stale_minutes = settings.RECONCILE_STALE_MINUTES if stale_minutes is None else stale_minutes
+    concurrency = concurrency or settings.RECONCILE_CONCURRENCY
+    batch_size = batch_size or settings.RECONCILE_BATCH_SIZE
+
+    report = ReconciliationReport()
+    start = time.monotonic()
+
+    rows = stale_pending_transactions(stale_minutes).iterator(chunk_size=batch_size)
+    if limit:
+        rows = islice(rows, limit)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for chunk in _chunks(rows, batch_size):
+            now = timezone.now()
+            verified = []
+            exhausted = None
+            for txn, data in zip(chunk, pool.map(_verify, chunk)):
+                if isinstance(data, BudgetExhausted):
+                    exhausted = data
+                    report.deferred += 1
+                    continue
+                report.scanned += 1
+                if data is None:
+                    report.provider_errors += 1
+                    continue
+
+                report.verified += 1
+                paystack_status = data.get('status')
+                if paystack_status not in TERMINAL_PAYSTACK_STATUSES:
+                    continue
+
+                txn.status = paystack_status
+                if paystack_status == 'success':
+                    txn.paid_at = parse_datetime(data.get('paid_at') or data.get('paidAt') or '') or now
+                verified.append((txn, data))
+
+            # Rows a webhook settled since they were read are skipped, not overwritten
+            for txn in record_verifications(verified):
+                report.drift[txn.status] += 1
+                report.updated += 1
+
+            if exhausted is not None:
+                logger.warning("Reconciliation backing off until the next run: %s", exhausted)
+                break
+
+    report.elapsed = time.monotonic() - start
+    logger.info("Reconciliation finished: %s", report.summary())
+    return report
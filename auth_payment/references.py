@@ -0,0 +1,78 @@
+"""
+Transaction references: ``TXN_`` followed by 26 Crockford base32 characters encoding 128 bits.
+
+    48 bits  milliseconds since the Unix epoch
+    40 bits  node: REFERENCE_NODE_ID (16 bits, random per process when unset) + process id (24 bits)
+    40 bits  sequence: random start each millisecond, incremented within it
+
+References sort by creation time, so new rows land at the right-hand edge of the ``reference``
+index instead of at random points in it. Within a process they are strictly increasing even if
+the clock steps back. Give every host (or container, since they reuse process ids) its own
+REFERENCE_NODE_ID and no two running processes share a node, so references cannot collide.
+Without it, processes on different hosts rely on 16 random bits plus the 40-bit sequence.
+"""
+import os
+import time
+import random
+import threading
+
+from django.conf import settings
+
+PREFIX = 'TXN_'
+CROCKFORD = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+
+SEQUENCE_BITS = 40
+SEQUENCE_MAX = (1 << SEQUENCE_BITS) - 1
+
+
+class ReferenceGenerator:
+    """Thread-safe, monotonic reference source for one process (re-seeded after fork)"""
+
+    def __init__(self, node_id=None):
+        self.node_id = node_id
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _reset(self):
+        host = self.node_id if self.node_id is not None else random.getrandbits(16)
+        self._pid = os.getpid()
+        self._node = ((host & 0xFFFF) << 24) | (self._pid & 0xFFFFFF)
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_value(self):
+        """The next 128-bit value"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset()
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                # Random start, leaving headroom to count up within the millisecond
+                self._sequence = random.getrandbits(SEQUENCE_BITS - 1)
+            elif self._sequence < SEQUENCE_MAX:
+                # Same millisecond, or the clock stepped back: keep counting from the last value
+                self._sequence += 1
+            else:
+                self._last_ms += 1
+                self._sequence = 0
+            return (self._last_ms << 80) | (self._node << SEQUENCE_BITS) | self._sequence
+
+    def next(self):
+        return PREFIX + encode(self.next_value())
+
+
+def encode(value):
+    """128-bit integer -> 26 Crockford base32 characters (lexicographic order = numeric order)"""
+    chars = []
+    for _ in range(26):
+        chars.append(CROCKFORD[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+_generator = ReferenceGenerator(settings.REFERENCE_NODE_ID)
+
+
+def new_reference():
+    return _generator.next()
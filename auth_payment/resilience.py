@@ -0,0 +1,217 @@
+"""
+Circuit breakers and retry policy for outbound provider calls.
+
+Breakers and the retry budget are per worker process. Each worker decides for itself
+when a provider looks unhealthy, and no shared state is needed on the hot path.
+"""
+import time
+import random
+import logging
+import threading
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+RETRY_STATUSES = {502, 503, 504}
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """The provider's circuit breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls are rejected
+    immediately. Once ``recovery_timeout`` seconds have passed, up to ``half_open_max_calls``
+    probe calls are let through: one success closes the circuit, a failure re-opens it.
+    """
+
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30.0, half_open_max_calls=1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        metrics.get_registry().set('circuit_breaker_state', {'provider': name}, STATE_VALUES[CLOSED])
+
+    def _transition(self, state):
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logger.warning("Circuit for %s opened after %s consecutive failures", self.name, self._failures)
+        elif state == CLOSED:
+            self._failures = 0
+            logger.info("Circuit for %s closed", self.name)
+        self._half_open_calls = 0
+        metrics.record_breaker_state(self.name, state, STATE_VALUES[state])
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._transition(HALF_OPEN)
+            return self._state
+
+    @property
+    def is_open(self):
+        """True while calls would be rejected without a probe being allowed"""
+        return self.state == OPEN
+
+    def allow_request(self):
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        with self._lock:
+            if self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(CLOSED)
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._transition(OPEN)
+
+
+class RetryBudget:
+    """
+    Caps retries at a fraction of overall traffic so retries cannot amplify an outage.
+
+    Every call deposits ``ratio`` tokens and every retry spends one. On top of that,
+    ``min_per_second`` retries per second are always allowed, so low-traffic workers
+    can still retry. Tokens are capped at ``ratio * max_calls`` to bound bursts.
+    """
+
+    def __init__(self, ratio=0.1, min_per_second=1.0, max_calls=100):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max(1.0, ratio * max_calls)
+        self._lock = threading.Lock()
+        self._tokens = 0.0
+        self._reserve = min_per_second
+        self._reserve_updated = time.monotonic()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        with self._lock:
+            now = time.monotonic()
+            self._reserve = min(
+                self.min_per_second, self._reserve + (now - self._reserve_updated) * self.min_per_second
+            )
+            self._reserve_updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            if self._reserve >= 1:
+                self._reserve -= 1
+                return True
+            return False
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for the given retry attempt (1-based)"""
+    ceiling = min(settings.HTTP_RETRY_BACKOFF_MAX, settings.HTTP_RETRY_BACKOFF_BASE * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+_breakers = {}
+_retry_budget = None
+_registry_lock = threading.Lock()
+
+
+def get_breaker(provider):
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.get(provider)
+            if breaker is None:
+                breaker = _breakers[provider] = CircuitBreaker(
+                    provider,
+                    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                    recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                    half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+                )
+    return breaker
+
+
+def get_retry_budget():
+    global _retry_budget
+    if _retry_budget is None:
+        with _registry_lock:
+            if _retry_budget is None:
+                _retry_budget = RetryBudget(
+                    ratio=settings.RETRY_BUDGET_RATIO,
+                    min_per_second=settings.RETRY_BUDGET_MIN_PER_SECOND,
+                )
+    return _retry_budget
+
+
+class CallPolicy:
+    """
+    Breaker and retry bookkeeping for one logical provider call, shared by the sync and
+    async HTTP clients. Only idempotent methods are retried.
+    """
+
+    def __init__(self, provider, operation, method):
+        self.provider = provider
+        self.operation = operation
+        self.breaker = get_breaker(provider) if provider else None
+        self.retryable = method in IDEMPOTENT_METHODS and settings.HTTP_MAX_RETRIES > 0
+        self.attempt = 0
+        get_retry_budget().deposit()
+
+    def before_attempt(self):
+        if self.breaker and not self.breaker.allow_request():
+            metrics.record_short_circuit(self.provider, self.operation)
+            raise CircuitOpenError(self.provider)
+
+    def after_attempt(self, status_code=None, error=False):
+        """
+        Record the outcome with the breaker. Returns the seconds to wait before retrying,
+        or None if the call should not be retried.
+        """
+        failed = error or status_code >= 500
+        if self.breaker:
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+        if not (self.retryable and (error or status_code in RETRY_STATUSES)):
+            return None
+        if self.attempt >= settings.HTTP_MAX_RETRIES:
+            return None
+        if not get_retry_budget().try_spend():
+            metrics.record_retry_budget_exhausted(self.provider or 'unknown')
+            return None
+
+        self.attempt += 1
+        metrics.record_retry(self.provider or 'unknown', self.operation)
+        return backoff_delay(self.attempt)
@@ -0,0 +1,74 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+_read_alias = ContextVar('replica_read_alias', default=None)
+
+
+def _pin_key(user_id):
+    return f"db-primary-pin:{user_id}"
+
+
+def pin_to_primary(*user_ids):
+    """
+    Send these users' replica-eligible reads to the primary for READ_REPLICA_STICKY_SECONDS,
+    so right after a write (theirs, or a webhook's on their transaction) they never read a
+    replica that has not caught up yet. Call it wherever a user's transactions change.
+    Pins live in the default cache, which must be shared by all workers (auth_payment.E001):
+    the next request may well be served by another one.
+    """
+    if not settings.DATABASE_REPLICAS or settings.READ_REPLICA_STICKY_SECONDS <= 0:
+        return
+    keys = {_pin_key(user_id): 1 for user_id in user_ids if user_id}
+    if keys:
+        cache.set_many(keys, settings.READ_REPLICA_STICKY_SECONDS)
+
+
+def read_database(user_id=None):
+    """Alias to read from: a replica, or the primary when there is none or user_id is pinned"""
+    if not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    if user_id is not None and cache.get(_pin_key(user_id)):
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """
+    Route ORM reads inside the block to read_database(user_id); yields the chosen alias.
+    Querysets must be evaluated inside the block, since routing happens at query time.
+    """
+    alias = read_database(user_id)
+    token = _read_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go to a replica only inside replica_reads(); everything else, including reads made
+    on the way to a write, stays on the primary. Writes and migrations always use the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Only this app's tables; e.g. DatabaseCache lookups made inside the block stay put
+        if model._meta.app_label != 'auth_payment':
+            return None
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
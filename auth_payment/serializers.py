@@ -1,3 +1,7 @@
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 from .models import User, Transaction
 
@@ -35,4 +39,93 @@ class TransactionStatusSerializer(serializers.Serializer):
     status = serializers.CharField(max_length=20)
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     paid_at = serializers.DateTimeField(allow_null=True)
-    authorization_url = serializers.URLField(allow_null=True)
\ No newline at end of file
+    authorization_url = serializers.URLField(allow_null=True)
+
+class TransactionListQuerySerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Transaction.STATUS_CHOICES, required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+
+class TransactionStatusBatchSerializer(serializers.Serializer):
+    references = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        min_length=1,
+        max_length=settings.TRANSACTION_STATUS_BATCH_MAX_REFERENCES
+    )
+
+    def validate_references(self, value):
+        return list(dict.fromkeys(value))
+
+
+# Hand-written equivalents of the serializers above for the hot responses (listing, status,
+# initiate). They skip DRF's per-field machinery but must return exactly what the reflective
+# versions do; benchmarks/serialization_bench.py checks the rendered bytes match.
+
+_AMOUNT_EXPONENT = decimal.Decimal('.1') ** Transaction._meta.get_field('amount').decimal_places
+_AMOUNT_CONTEXT = decimal.Context(prec=Transaction._meta.get_field('amount').max_digits)
+
+
+def _datetime(value):
+    """DateTimeField.to_representation with the default ISO 8601 format"""
+    if not value:
+        return None
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def _amount(value):
+    """DecimalField.to_representation for Transaction.amount"""
+    return '{:f}'.format(value.quantize(_AMOUNT_EXPONENT, context=_AMOUNT_CONTEXT))
+
+
+def user_data(user):
+    """UserSerializer(user).data"""
+    return {
+        'id': str(user.id),
+        'email': user.email,
+        'name': user.name,
+        'picture': user.picture,
+        'created_at': _datetime(user.created_at),
+    }
+
+
+def transaction_list_data(transactions):
+    """TransactionSerializer(transactions, many=True).data; transactions need their user loaded"""
+    users = {}
+    rows = []
+    for transaction in transactions:
+        user = users.get(transaction.user_id)
+        if user is None:
+            user = users[transaction.user_id] = user_data(transaction.user)
+        rows.append({
+            'id': str(transaction.id),
+            'reference': transaction.reference,
+            'user': user,
+            'amount': _amount(transaction.amount),
+            'status': transaction.status,
+            'authorization_url': transaction.authorization_url,
+            'paid_at': _datetime(transaction.paid_at),
+            'currency': transaction.currency,
+            'created_at': _datetime(transaction.created_at),
+        })
+    return rows
+
+
+def transaction_status_data(transaction):
+    """The status endpoints' payload: amount in kobo, paid_at as plain isoformat()"""
+    return {
+        'reference': transaction.reference,
+        'status': transaction.status,
+        'amount': int(transaction.amount * 100),
+        'paid_at': transaction.paid_at.isoformat() if transaction.paid_at else None
+    }
+
+
+def payment_initiated_data(transaction):
+    return {
+        'reference': transaction.reference,
+        'authorization_url': transaction.authorization_url
+    }
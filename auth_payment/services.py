@@ -0,0 +1,163 @@
+import logging
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .identity import user_identity_cache
+from .models import User, Transaction, TransactionEvent
+from .notifications import publish_statuses
+from .references import new_reference
+from .routers import pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ('email', 'name', 'picture')
+
+
+def _insert_google_user(google_id, profile):
+    """INSERT ... ON CONFLICT DO NOTHING; returns (stored user, created)"""
+    new_user = User(google_id=google_id, **profile)
+    User.objects.bulk_create([new_user], ignore_conflicts=True)
+    # DO NOTHING does not say whether the row was ours, so read back whichever insert won
+    user = User.objects.filter(google_id=google_id).first()
+    if user is None:
+        # The conflict was on another unique column (an email already linked to another account)
+        raise IntegrityError(f"Could not create user for Google account {google_id}")
+    return user, user.id == new_user.id
+
+
+def upsert_google_user(user_info):
+    """
+    Create or refresh the local User for a Google profile; returns (user, created).
+
+    Unchanged profiles (the common case) cost no write, and no query at all when the user is
+    in the identity cache. Changed profiles update only the changed columns. New users are
+    inserted with a single INSERT ... ON CONFLICT, so concurrent first logins for one account
+    converge on the same row without a locking SELECT.
+    """
+    google_id = user_info.get('sub')
+    profile = {field: user_info.get(field) for field in PROFILE_FIELDS}
+
+    user = user_identity_cache.get(google_id)
+    if user is None:
+        user = User.objects.filter(google_id=google_id).first()
+    if user is None:
+        user, created = _insert_google_user(google_id, profile)
+        if created:
+            logger.info("Created user: %s", user.email)
+            user_identity_cache.set(user)
+            return user, True
+
+    changed = [field for field, value in profile.items() if getattr(user, field) != value]
+    if changed:
+        for field in changed:
+            setattr(user, field, profile[field])
+        user.save(update_fields=[*changed, 'updated_at'])
+    user_identity_cache.set(user)
+    return user, False
+
+
+def generate_reference():
+    """Time-ordered, collision-free reference (see auth_payment/references.py)"""
+    return new_reference()
+
+
+def kobo_to_amount(amount):
+    """Convert an integer Kobo amount to the exact Naira Decimal stored on Transaction"""
+    return Decimal(amount) / 100
+
+
+def recent_pending_duplicates(user, amount):
+    """Pending transactions for the same user and amount (in Kobo) from the last 5 minutes"""
+    time_threshold = timezone.now() - timedelta(minutes=5)
+    return Transaction.objects.filter(
+        user_id=user.id,
+        amount=kobo_to_amount(amount),
+        status='pending',
+        created_at__gte=time_threshold
+    ).order_by('-created_at')
+
+
+def create_pending_transaction(user, amount, reference, paystack_response):
+    """Insert the pending Transaction together with its 'initialize' event"""
+    with db_transaction.atomic():
+        transaction = Transaction.objects.create(
+            reference=reference,
+            user_id=user.id,
+            amount=kobo_to_amount(amount),
+            paystack_reference=paystack_response.get('reference'),
+            authorization_url=paystack_response.get('authorization_url'),
+            status='pending',
+        )
+        TransactionEvent.build(transaction, 'initialize', paystack_response).save()
+    pin_to_primary(user.id)
+    return transaction
+
+
+def settle_verified(transactions, now, expected_status='pending'):
+    """
+    Write verified statuses with one conditional UPDATE per status, only to rows still in expected_status,
+    so a webhook that settled a row in the meantime is not overwritten. Returns the transactions that moved;
+    call inside an atomic block.
+    """
+    current = set(
+        Transaction.objects.select_for_update()
+        .filter(pk__in=[transaction.pk for transaction in transactions], status=expected_status)
+        .values_list('pk', flat=True)
+    )
+    moved = [transaction for transaction in transactions if transaction.pk in current]
+    by_status = {}
+    for transaction in moved:
+        transaction.updated_at = now
+        by_status.setdefault(transaction.status, []).append(transaction)
+    for new_status, group in by_status.items():
+        paid_at = F('paid_at')
+        if new_status == 'success':
+            paid_at = Case(*(When(pk=txn.pk, then=Value(txn.paid_at)) for txn in group), default=F('paid_at'))
+        Transaction.objects.filter(pk__in=[txn.pk for txn in group], status=expected_status).update(
+            status=new_status, paid_at=paid_at, updated_at=now
+        )
+    return moved
+
+
+def record_verification(transaction, paystack_data, expected_status='pending'):
+    """
+    Save a status change found by verifying with Paystack, with the verify response as an event.
+    Returns False, writing nothing, if the stored status is no longer expected_status.
+    """
+    with db_transaction.atomic():
+        if not settle_verified([transaction], timezone.now(), expected_status):
+            return False
+        TransactionEvent.build(transaction, 'verify', paystack_data).save()
+        publish_statuses([(transaction.reference, transaction.status)])
+    pin_to_primary(transaction.user_id)
+    return True
+
+
+def record_verifications(verified):
+    """
+    record_verification for many (transaction, paystack_data) pairs of pending transactions, in bulk writes.
+    Returns the transactions that were still pending and so were updated.
+    """
+    if not verified:
+        return []
+    with db_transaction.atomic():
+        moved = settle_verified([transaction for transaction, _ in verified], timezone.now())
+        moved_pks = {transaction.pk for transaction in moved}
+        TransactionEvent.objects.bulk_create([
+            TransactionEvent.build(transaction, 'verify', paystack_data)
+            for transaction, paystack_data in verified if transaction.pk in moved_pks
+        ])
+        publish_statuses((transaction.reference, transaction.status) for transaction in moved)
+    pin_to_primary(*{transaction.user_id for transaction in moved})
+    return moved
+
+
+def paystack_metadata(user):
+    return {
+        'user_id': str(user.id),
+        'user_name': user.name
+    }
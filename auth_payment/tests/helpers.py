@@ -0,0 +1,48 @@
+import itertools
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from auth_payment import throttling
+from auth_payment.authentication import issue_tokens
+from auth_payment.models import Transaction, User
+from auth_payment.references import new_reference
+
+_counter = itertools.count()
+
+
+def make_user(**fields):
+    n = next(_counter)
+    fields.setdefault('google_id', f'google-{n}')
+    fields.setdefault('email', f'user-{n}@example.com')
+    fields.setdefault('name', f'User {n}')
+    return User.objects.create(**fields)
+
+
+def make_transaction(user, status='pending', amount='50.00', age=None, **fields):
+    """Saved transaction; age (a timedelta) backdates created_at/updated_at past auto_now"""
+    reference = fields.pop('reference', None) or new_reference()
+    transaction = Transaction.objects.create(
+        reference=reference, user=user, amount=Decimal(amount), status=status,
+        paystack_reference=fields.pop('paystack_reference', reference), **fields
+    )
+    if age is not None:
+        backdated = timezone.now() - age
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=backdated, updated_at=backdated)
+        transaction.refresh_from_db()
+    return transaction
+
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f"Bearer {issue_tokens(user)['access_token']}"}
+
+
+class APITestCase(TestCase):
+    """Clean cache (verify results, pins, rate limit buckets) for every test"""
+
+    def setUp(self):
+        cache.clear()
+        throttling._buckets.clear()
+        self.addCleanup(throttling._buckets.clear)
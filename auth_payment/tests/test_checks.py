@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase, override_settings
+
+from auth_payment.checks import check_shared_cache, shared_cache_users
+
+LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+DATABASE_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache_table'}}
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    @override_settings(WEB_CONCURRENCY=1, CACHES=LOCMEM)
+    def test_single_worker_may_use_process_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(WEB_CONCURRENCY=4, CACHES=LOCMEM)
+    def test_several_workers_on_process_cache_is_an_error(self):
+        errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ['auth_payment.E001'])
+        self.assertIn('verify single-flight', errors[0].msg)
+
+    @override_settings(WEB_CONCURRENCY=4, CACHES=DATABASE_CACHE)
+    def test_several_workers_on_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(WEB_CONCURRENCY=4, CACHES=LOCMEM, DATABASE_REPLICAS=['replica_1'], READ_REPLICA_STICKY_SECONDS=15)
+    def test_replica_pins_are_named(self):
+        errors = check_shared_cache(None)
+
+        self.assertIn('pins to the primary', errors[0].msg)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_pins_not_named_without_replicas(self):
+        self.assertNotIn('pins', ' '.join(shared_cache_users()))
+
+    @override_settings(WEB_CONCURRENCY=4, CACHES=LOCMEM, THROTTLE_RATES={'initiate_user': '10/min'})
+    def test_rate_limits_are_named(self):
+        errors = check_shared_cache(None)
+
+        self.assertIn('rate limits', errors[0].msg)
+
+    @override_settings(THROTTLE_RATES={'initiate_user': ''})
+    def test_rate_limits_not_named_when_disabled(self):
+        self.assertNotIn('rate limits', ' '.join(shared_cache_users()))
@@ -0,0 +1,94 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from auth_payment import http_client
+from auth_payment.http_client import HTTPClient, get_http_client
+from auth_payment.metrics import Registry
+
+
+class ProviderStub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{"status": true}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'session=abc; Path=/')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HTTPClientTests(SimpleTestCase):
+
+    def setUp(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), ProviderStub)
+        threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.host = f'127.0.0.1:{server.server_port}'
+        self.url = f'http://{self.host}/transaction/verify/TXN_1'
+        self.client = HTTPClient(pool_connections=2, pool_maxsize=2)
+        self.addCleanup(self.client.session.close)
+
+    def test_connection_is_kept_alive(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get(self.url).json(), {'status': True})
+
+        stats = self.client.pool_stats()[self.host]
+
+        self.assertEqual((stats['requests'], stats['errors']), (3, 0))
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['idle_connections'], 1)
+
+    def test_provider_cookies_are_not_kept(self):
+        self.client.get(self.url)
+
+        self.assertEqual(len(self.client.session.cookies), 0)
+
+    def test_pool_state_is_sampled_into_metrics(self):
+        self.client.get(self.url)
+        registry = Registry()
+
+        with mock.patch.object(http_client, '_client', self.client), \
+                mock.patch.object(http_client, '_client_pid', os.getpid()):
+            http_client._sample_pools(registry)
+
+        self.assertEqual(sorted(registry.snapshot()), [
+            ['outbound_pool_connections_opened_total', [('host', self.host)], 1],
+            ['outbound_pool_idle_connections', [('host', self.host)], 1],
+        ])
+
+
+class SharedClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.enterContext(mock.patch.object(http_client, '_client', None))
+        self.enterContext(mock.patch.object(http_client, '_client_pid', None))
+
+    def test_one_client_per_process(self):
+        self.assertIs(get_http_client(), get_http_client())
+
+    def test_rebuilt_after_fork(self):
+        parent = get_http_client()
+
+        with mock.patch('auth_payment.http_client.os.getpid', return_value=os.getpid() + 1):
+            child = get_http_client()
+
+        self.assertIsNot(child, parent)
+
+    def test_pool_metrics_skip_a_client_inherited_from_the_parent(self):
+        get_http_client()
+        registry = Registry()
+
+        with mock.patch('auth_payment.http_client.os.getpid', return_value=os.getpid() + 1):
+            http_client._sample_pools(registry)
+
+        self.assertEqual(registry.snapshot(), [])
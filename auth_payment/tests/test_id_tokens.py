@@ -0,0 +1,142 @@
+import time
+from unittest import mock
+
+import jwt
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import SimpleTestCase, override_settings
+
+from auth_payment.jwks import JWKSCache
+from auth_payment.utils import GoogleAuthHelper
+
+CLIENT_ID = 'client-id.apps.googleusercontent.com'
+
+
+def signing_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return private_key, {**jwk, 'kid': kid, 'alg': 'RS256', 'use': 'sig'}
+
+
+KEY, JWK = signing_key('key-1')
+NEW_KEY, NEW_JWK = signing_key('key-2')
+
+
+def id_token(key=KEY, kid='key-1', **claims):
+    now = int(time.time())
+    claims = {
+        'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': '1234', 'email': 'a@example.com',
+        'name': 'A', 'iat': now, 'exp': now + 3600, **claims,
+    }
+    return jwt.encode(claims, key, algorithm='RS256', headers={'kid': kid})
+
+
+def certs_response(*jwks, cache_control='public, max-age=600'):
+    response = mock.Mock(headers={'Cache-Control': cache_control})
+    response.json.return_value = {'keys': list(jwks)}
+    return response
+
+
+@override_settings(GOOGLE_CLIENT_ID=CLIENT_ID)
+class VerifyIdTokenTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.enterContext(mock.patch('auth_payment.jwks.time.monotonic', side_effect=lambda: self.now[0]))
+        self.enterContext(mock.patch.object(GoogleAuthHelper, 'signing_keys', JWKSCache(min_refresh_interval=30)))
+        self.get = self.enterContext(mock.patch('auth_payment.utils.get_http_client')).return_value.get
+        self.get.return_value = certs_response(JWK)
+
+    def test_valid_token(self):
+        profile = GoogleAuthHelper.verify_id_token(id_token())
+
+        self.assertEqual(profile, {'sub': '1234', 'email': 'a@example.com', 'name': 'A', 'picture': None})
+        self.assertEqual(self.get.call_count, 1)
+
+    def test_keys_are_cached_for_max_age(self):
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.now[0] += 599
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.assertEqual(self.get.call_count, 1)
+
+        self.now[0] += 1
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_wrong_audience(self):
+        self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token(aud='someone-else')))
+
+    def test_wrong_issuer(self):
+        self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token(iss='https://evil.example.com')))
+
+    def test_expired(self):
+        past = int(time.time()) - 7200
+        self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token(iat=past, exp=past + 3600)))
+
+    def test_bad_signature(self):
+        # Signed by another key under a known kid
+        self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token(key=NEW_KEY)))
+
+    def test_unknown_kid_refetches_rotated_keys(self):
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.get.return_value = certs_response(JWK, NEW_JWK)
+        self.now[0] += 30
+
+        profile = GoogleAuthHelper.verify_id_token(id_token(key=NEW_KEY, kid='key-2'))
+
+        self.assertEqual(profile['sub'], '1234')
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_unknown_kid_refetches_at_most_once_per_interval(self):
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.now[0] += 10
+
+        for _ in range(3):
+            self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token(kid='bogus')))
+
+        self.assertEqual(self.get.call_count, 1)
+        self.now[0] += 20
+        GoogleAuthHelper.verify_id_token(id_token(kid='bogus'))
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_stale_keys_are_used_when_fetching_fails(self):
+        GoogleAuthHelper.verify_id_token(id_token())
+        self.now[0] += 3600
+        self.get.side_effect = requests.exceptions.ConnectionError('unreachable')
+
+        profile = GoogleAuthHelper.verify_id_token(id_token())
+
+        self.assertEqual(profile['sub'], '1234')
+        self.assertEqual(self.get.call_count, 2)
+
+    def test_no_keys_at_all(self):
+        self.get.side_effect = requests.exceptions.ConnectionError('unreachable')
+
+        self.assertIsNone(GoogleAuthHelper.verify_id_token(id_token()))
+
+
+class JWKSCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.enterContext(mock.patch('auth_payment.jwks.time.monotonic', side_effect=lambda: self.now[0]))
+        self.cache = JWKSCache(default_ttl=100, min_refresh_interval=30)
+
+    def test_empty_cache_needs_fetch(self):
+        self.assertTrue(self.cache.needs_fetch('key-1'))
+        self.assertIsNone(self.cache.get('key-1'))
+
+    def test_default_ttl_without_max_age(self):
+        self.cache.store({'keys': [JWK]})
+
+        self.assertFalse(self.cache.needs_fetch('key-1'))
+        self.now[0] += 100
+        self.assertTrue(self.cache.needs_fetch('key-1'))
+        self.assertIsNone(self.cache.get('key-1'))
+        self.assertEqual(self.cache.get('key-1', allow_stale=True).key_id, 'key-1')
+
+    def test_unusable_keys_are_skipped(self):
+        self.cache.store({'keys': [{'kid': 'broken', 'kty': 'RSA'}, JWK]}, 'max-age=60')
+
+        self.assertIsNone(self.cache.get('broken'))
+        self.assertEqual(self.cache.get('key-1').key_id, 'key-1')
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from auth_payment import services
+from auth_payment.async_views import AsyncGoogleAuthCallbackView
+from auth_payment.identity import user_identity_cache
+from auth_payment.models import User
+from auth_payment.utils import GoogleAuthHelper
+
+from .helpers import APITestCase, make_user
+
+
+class GoogleCallbackTests(APITestCase):
+    url = '/auth/google/callback'
+
+    def setUp(self):
+        super().setUp()
+        user_identity_cache.clear()
+        self.user = make_user()
+        self.profile = {'sub': self.user.google_id, 'email': self.user.email, 'name': self.user.name, 'picture': None}
+        self.enterContext(mock.patch.object(GoogleAuthHelper, 'exchange_code_for_token', return_value={'id_token': 'x'}))
+        self.enterContext(mock.patch.object(GoogleAuthHelper, 'user_info_from_tokens', return_value=self.profile))
+
+    def test_active_user_gets_tokens(self):
+        response = self.client.get(self.url, {'code': 'abc'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.json()['data'])
+
+    def test_inactive_user_gets_no_tokens(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+
+        response = self.client.get(self.url, {'code': 'abc'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertNotIn('access_token', response.json().get('data') or {})
+
+    def test_async_callback_rejects_inactive_user(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        request = RequestFactory().get(self.url, {'code': 'abc'})
+
+        with mock.patch.object(GoogleAuthHelper, 'aexchange_code_for_token', return_value={'id_token': 'x'}), \
+                mock.patch.object(GoogleAuthHelper, 'auser_info_from_tokens', return_value=self.profile):
+            response = async_to_sync(AsyncGoogleAuthCallbackView.as_view())(request)
+
+        self.assertEqual(response.status_code, 403)
+
+
+class IdentityCacheInvalidationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        user_identity_cache.clear()
+        self.user = make_user()
+        services.upsert_google_user({'sub': self.user.google_id, 'email': self.user.email, 'name': self.user.name})
+
+    def test_save_drops_the_entry(self):
+        self.assertIsNotNone(user_identity_cache.get(self.user.google_id))
+        self.user.is_active = False
+
+        self.user.save()
+
+        self.assertIsNone(user_identity_cache.get(self.user.google_id))
+
+    def test_queryset_delete_drops_the_entry(self):
+        User.objects.filter(pk=self.user.pk).delete()
+
+        self.assertIsNone(user_identity_cache.get(self.user.google_id))
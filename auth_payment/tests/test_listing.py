@@ -0,0 +1,58 @@
+import json
+import base64
+from datetime import timedelta
+
+from .helpers import APITestCase, auth_headers, make_transaction, make_user
+
+
+class TransactionListTests(APITestCase):
+    url = '/payments'
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.transactions = [make_transaction(self.user, age=timedelta(minutes=i)) for i in range(5)]
+
+    def get(self, **params):
+        return self.client.get(self.url, params, **auth_headers(self.user))
+
+    def test_pages_newest_first_without_gaps(self):
+        seen = []
+        params = {'page_size': 2}
+        while True:
+            data = self.get(**params).json()['data']
+            seen.extend(item['reference'] for item in data['transactions'])
+            if not data['next_cursor']:
+                break
+            params['cursor'] = data['next_cursor']
+
+        self.assertEqual(seen, [txn.reference for txn in self.transactions])
+
+    def test_only_own_transactions(self):
+        make_transaction(make_user())
+
+        data = self.get().json()['data']
+
+        self.assertEqual(len(data['transactions']), 5)
+
+    def test_status_filter(self):
+        make_transaction(self.user, status='success')
+
+        data = self.get(status='success').json()['data']
+
+        self.assertEqual([item['status'] for item in data['transactions']], ['success'])
+
+    def test_malformed_cursor_is_rejected(self):
+        response = self.get(cursor='not-a-cursor')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_with_invalid_id_is_rejected(self):
+        created_at = self.transactions[0].created_at.isoformat()
+        for pk in ('not-a-uuid', 42, None):
+            cursor = base64.urlsafe_b64encode(json.dumps([created_at, pk]).encode()).decode()
+
+            response = self.get(cursor=cursor)
+
+            self.assertEqual(response.status_code, 400, pk)
+            self.assertEqual(response.json()['errors'], {'cursor': ['Invalid cursor.']})
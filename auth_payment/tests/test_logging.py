@@ -0,0 +1,50 @@
+import os
+import logging
+import tempfile
+from pathlib import Path
+from logging.handlers import RotatingFileHandler, WatchedFileHandler
+
+from django.test import SimpleTestCase
+
+from auth_payment import metrics
+from auth_payment.logging_utils import AsyncLogHandler, dropped_records, file_handler
+
+
+class LogFileModeTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.filename = str(Path(self.directory) / 'app.log')
+
+    def test_per_process_file_carries_the_pid(self):
+        handler = file_handler(self.filename, 'per_process')
+
+        self.assertIsInstance(handler, RotatingFileHandler)
+        self.assertEqual(handler.baseFilename, str(Path(self.directory) / f'app.{os.getpid()}.log'))
+
+    def test_watched_file_is_shared_and_not_rotated_in_process(self):
+        handler = file_handler(self.filename, 'watched')
+
+        self.assertIsInstance(handler, WatchedFileHandler)
+        self.assertNotIsInstance(handler, RotatingFileHandler)
+        self.assertEqual(handler.baseFilename, self.filename)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            file_handler(self.filename, 'daily')
+
+
+class DroppedRecordsTests(SimpleTestCase):
+    def test_full_queue_drops_info_and_is_exported(self):
+        handler = AsyncLogHandler(console=False, queue_size=1)
+        # Hold the listener so the queue stays full; restarted for its atexit stop
+        handler.listener.stop()
+        self.addCleanup(handler.listener.start)
+        before = dropped_records()
+
+        for _ in range(3):
+            handler.enqueue(logging.makeLogRecord({'levelno': logging.INFO, 'msg': 'x'}))
+
+        self.assertEqual(handler.dropped, 2)
+        self.assertEqual(dropped_records(), before + 2)
+        self.assertIn(f'log_records_dropped_total {before + 2}', metrics.render_prometheus())
+
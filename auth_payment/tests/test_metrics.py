@@ -0,0 +1,115 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_payment import metrics
+from auth_payment.metrics import Registry, render_prometheus
+
+
+class MetricsTestCase(SimpleTestCase):
+    """A fresh registry for this process, with no snapshot directory"""
+
+    def setUp(self):
+        self.registry = Registry()
+        self.enterContext(mock.patch.object(metrics, '_registry', self.registry))
+        self.enterContext(mock.patch.object(metrics, '_registry_pid', os.getpid()))
+        self.enterContext(mock.patch.object(metrics, '_collectors', []))
+        self.enterContext(override_settings(METRICS_DIR=None))
+
+
+class RenderPrometheusTests(MetricsTestCase):
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics.record_outbound('paystack', 'verify', 200, 0.03)
+        metrics.record_outbound('paystack', 'verify', 200, 0.3)
+        metrics.record_outbound('paystack', 'verify', 'error', 20)
+
+        lines = render_prometheus().splitlines()
+
+        labels = 'operation="verify",provider="paystack"'
+        self.assertIn(f'outbound_requests_total{{{labels},status="200"}} 2', lines)
+        self.assertIn(f'outbound_requests_total{{{labels},status="error"}} 1', lines)
+        self.assertIn(f'outbound_request_duration_seconds_bucket{{{labels},le="0.025"}} 0', lines)
+        self.assertIn(f'outbound_request_duration_seconds_bucket{{{labels},le="0.05"}} 1', lines)
+        self.assertIn(f'outbound_request_duration_seconds_bucket{{{labels},le="0.5"}} 2', lines)
+        self.assertIn(f'outbound_request_duration_seconds_bucket{{{labels},le="10.0"}} 2', lines)
+        self.assertIn(f'outbound_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3', lines)
+        self.assertIn(f'outbound_request_duration_seconds_count{{{labels}}} 3', lines)
+        self.assertIn('# TYPE outbound_request_duration_seconds histogram', lines)
+
+    def test_label_values_are_escaped(self):
+        metrics.record_throttled('initiate"user', 'a\\b')
+
+        self.assertIn('throttled_total{bucket="initiate\\"user",scope="a\\\\b"} 1', render_prometheus())
+
+    def test_collectors_sample_live_state(self):
+        metrics.register_collector(lambda registry: registry.set('outbound_pool_idle_connections', {'host': 'h'}, 4))
+
+        self.assertIn('outbound_pool_idle_connections{host="h"} 4', render_prometheus())
+
+    def test_failing_collector_does_not_break_the_scrape(self):
+        def broken(registry):
+            raise RuntimeError('boom')
+
+        metrics.register_collector(broken)
+        metrics.record_status_stream('settled')
+
+        self.assertIn('status_streams_total{outcome="settled"} 1', render_prometheus())
+
+
+class WorkerSnapshotTests(MetricsTestCase):
+
+    def setUp(self):
+        super().setUp()
+        metrics_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(metrics_dir.cleanup)
+        self.dir = Path(metrics_dir.name)
+        self.enterContext(override_settings(METRICS_DIR=metrics_dir.name, METRICS_FLUSH_INTERVAL=10))
+        self.enterContext(mock.patch.object(metrics, '_snapshot_path', self.dir / 'this_worker.json'))
+
+    def other_worker(self, name, values, written_at=None):
+        snapshot = {'written_at': written_at or time.time(), 'values': values}
+        (self.dir / f'{name}.json').write_text(json.dumps(snapshot))
+
+    def test_counters_are_summed_across_workers(self):
+        metrics.record_retry('paystack', 'verify')
+        self.other_worker('a', [['outbound_retries_total', [['operation', 'verify'], ['provider', 'paystack']], 2]])
+
+        self.assertIn('outbound_retries_total{operation="verify",provider="paystack"} 3', render_prometheus())
+
+    def test_gauges_take_the_largest_recent_value(self):
+        metrics.get_registry().set('circuit_breaker_state', {'provider': 'paystack'}, 0)
+        self.other_worker('a', [['circuit_breaker_state', [['provider', 'paystack']], 2]])
+        self.other_worker('b', [['circuit_breaker_state', [['provider', 'google']], 2]], written_at=time.time() - 60)
+
+        output = render_prometheus()
+
+        self.assertIn('circuit_breaker_state{provider="paystack"} 2', output)
+        self.assertNotIn('provider="google"', output)
+
+    def test_unreadable_snapshots_are_skipped(self):
+        (self.dir / 'partial.json').write_text('{"written_at": ')
+        metrics.record_status_stream('timeout')
+
+        self.assertIn('status_streams_total{outcome="timeout"} 1', render_prometheus())
+
+
+class MetricsViewTests(MetricsTestCase):
+
+    def test_open_without_token(self):
+        response = self.client.get('/metrics')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        self.assertIn(b'# TYPE http_requests_total counter', response.content)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret').status_code, 200)
@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+
+from auth_payment import views
+
+
+class GenerateOpenAPITests(SimpleTestCase):
+
+    def setUp(self):
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        self.dir = Path(schema_dir.name)
+
+    def generate(self, *args):
+        call_command('generate_openapi', '--output-dir', str(self.dir), *args, stdout=StringIO())
+
+    def test_writes_json_and_yaml(self):
+        self.generate()
+
+        schema = json.loads((self.dir / 'openapi.json').read_bytes())
+        self.assertIn('/payments/status/batch', schema['paths'])
+        self.assertTrue((self.dir / 'openapi.yaml').read_text().startswith('swagger:'))
+
+    def test_check_passes_when_up_to_date(self):
+        self.generate()
+
+        self.generate('--check')
+
+    def test_check_fails_when_missing_or_stale(self):
+        with self.assertRaises(CommandError):
+            self.generate('--check')
+
+        self.generate()
+        (self.dir / 'openapi.json').write_text('{}')
+        with self.assertRaisesMessage(CommandError, 'openapi.json'):
+            self.generate('--check')
+
+
+class OpenAPISchemaViewTests(SimpleTestCase):
+
+    def setUp(self):
+        schema_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(schema_dir.cleanup)
+        self.dir = Path(schema_dir.name)
+        self.enterContext(override_settings(OPENAPI_SCHEMA_DIR=schema_dir.name))
+        self.enterContext(mock.patch.dict(views._openapi_schemas, clear=True))
+
+    def test_serves_the_generated_file(self):
+        (self.dir / 'openapi.json').write_bytes(b'{"swagger": "2.0"}')
+
+        response = self.client.get('/swagger.json/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'{"swagger": "2.0"}')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(
+            self.client.get('/swagger.json/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+
+    def test_file_is_read_once_per_process(self):
+        (self.dir / 'openapi.json').write_bytes(b'{"swagger": "2.0"}')
+        first = self.client.get('/swagger.json/')
+        (self.dir / 'openapi.json').write_bytes(b'{}')
+
+        self.assertEqual(self.client.get('/swagger.json/').content, first.content)
+
+    def test_generated_in_process_when_missing(self):
+        response = self.client.get('/swagger.yaml/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'/payments/status/batch', response.content)
+
+    def test_unknown_format(self):
+        self.assertEqual(self.client.get('/swagger.xml/').status_code, 404)
+
+    @override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+    def test_docs_pages_point_at_the_schema(self):
+        for url in ('/swagger/', '/redoc/'):
+            with self.subTest(url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '/swagger.json/')
+
+
+class LazySchemaImportTests(SimpleTestCase):
+
+    def test_serving_requests_does_not_import_schema_generation(self):
+        code = (
+            "import sys, django; django.setup(); "
+            "from django.urls import resolve; resolve('/payments/status/batch'); resolve('/swagger/'); "
+            "print(sorted(m for m in ('auth_payment.api_docs', 'drf_yasg.generators') if m in sys.modules))"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'payment_auth_project.settings', 'SECRET_KEY': 'x'}
+
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), '[]')
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+
+from auth_payment.async_views import AsyncPaystackInitiatePaymentView
+from auth_payment.models import IdempotencyKey, Transaction
+from auth_payment.utils import PaystackHelper
+
+from .helpers import APITestCase, auth_headers, make_user
+
+
+def paystack_initialized(amount, email, reference=None, metadata=None):
+    return {'reference': reference, 'authorization_url': f'https://checkout.paystack.com/{reference}'}
+
+
+@mock.patch.object(PaystackHelper, 'initialize_transaction', side_effect=paystack_initialized)
+class InitiatePaymentTests(APITestCase):
+    url = '/payments/paystack/initiate'
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def initiate(self, amount, **headers):
+        return self.client.post(
+            self.url, {'amount': amount}, content_type='application/json', **auth_headers(self.user), **headers
+        )
+
+    def test_creates_pending_transaction(self, initialize):
+        response = self.initiate(5000)
+
+        self.assertEqual(response.status_code, 201)
+        reference = response.json()['data']['reference']
+        transaction = Transaction.objects.get(reference=reference)
+        self.assertEqual(transaction.status, 'pending')
+        self.assertEqual(transaction.amount, 50)
+        self.assertEqual(transaction.events.get().kind, 'initialize')
+
+    def test_requires_authentication(self, initialize):
+        response = self.client.post(self.url, {'amount': 5000}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 401)
+        initialize.assert_not_called()
+
+    def test_idempotency_key_replays_first_response(self, initialize):
+        first = self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+        Transaction.objects.all().delete()
+        second = self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(initialize.call_count, 1)
+        self.assertEqual(IdempotencyKey.objects.get().status, 'completed')
+
+    def test_idempotency_key_reused_with_different_body(self, initialize):
+        self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+        response = self.initiate(7000, HTTP_IDEMPOTENCY_KEY='order-1')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(initialize.call_count, 1)
+
+    def test_idempotency_keys_are_per_user(self, initialize):
+        self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+        other = make_user()
+        response = self.client.post(
+            self.url, {'amount': 7000}, content_type='application/json',
+            HTTP_IDEMPOTENCY_KEY='order-1', **auth_headers(other)
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(initialize.call_count, 2)
+
+    def test_provider_failure_is_not_replayed(self, initialize):
+        initialize.side_effect = [None, paystack_initialized(5000, self.user.email, 'TXN_retry')]
+
+        failed = self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+        self.assertFalse(IdempotencyKey.objects.exists())
+        retried = self.initiate(5000, HTTP_IDEMPOTENCY_KEY='order-1')
+
+        self.assertEqual(failed.status_code, 402)
+        self.assertEqual(retried.status_code, 201)
+        self.assertEqual(initialize.call_count, 2)
+        self.assertEqual(IdempotencyKey.objects.get().status, 'completed')
+
+    def test_async_provider_failure_is_not_replayed(self, initialize):
+        def initiate():
+            request = RequestFactory().post(
+                self.url, {'amount': 5000}, content_type='application/json',
+                HTTP_IDEMPOTENCY_KEY='order-1', **auth_headers(self.user)
+            )
+            return async_to_sync(AsyncPaystackInitiatePaymentView.as_view())(request)
+
+        with mock.patch.object(PaystackHelper, 'ainitialize_transaction', side_effect=[
+            None, paystack_initialized(5000, self.user.email, 'TXN_retry')
+        ]) as ainitialize:
+            failed = initiate()
+            retried = initiate()
+
+        self.assertEqual((failed.status_code, retried.status_code), (402, 201))
+        self.assertEqual(ainitialize.call_count, 2)
+        self.assertEqual(IdempotencyKey.objects.get().status, 'completed')
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+from auth_payment import services
+from auth_payment.reconciliation import reconcile_pending
+from auth_payment.utils import PaystackHelper
+from auth_payment.webhooks import drain_inbox, enqueue_event
+
+from .helpers import APITestCase, make_transaction, make_user
+
+
+class ReconcilePendingTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def reconcile(self, statuses):
+        def verify(reference):
+            return {'status': statuses[reference], 'paid_at': '2026-01-02T03:04:05Z'}
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', side_effect=verify):
+            return reconcile_pending(stale_minutes=5, concurrency=2, batch_size=10)
+
+    def test_drift_is_written_back(self):
+        paid = make_transaction(self.user, age=timedelta(minutes=10))
+        abandoned = make_transaction(self.user, age=timedelta(minutes=10))
+        ongoing = make_transaction(self.user, age=timedelta(minutes=10))
+        fresh = make_transaction(self.user)
+
+        report = self.reconcile({
+            paid.paystack_reference: 'success',
+            abandoned.paystack_reference: 'abandoned',
+            ongoing.paystack_reference: 'ongoing',
+        })
+
+        self.assertEqual((report.scanned, report.updated), (3, 2))
+        self.assertEqual(dict(report.drift), {'success': 1, 'abandoned': 1})
+        for transaction in (paid, abandoned, ongoing, fresh):
+            transaction.refresh_from_db()
+        self.assertEqual(
+            [paid.status, abandoned.status, ongoing.status, fresh.status],
+            ['success', 'abandoned', 'pending', 'pending']
+        )
+        self.assertEqual(paid.paid_at.isoformat(), '2026-01-02T03:04:05+00:00')
+        self.assertEqual(paid.events.get().kind, 'verify')
+
+    def test_webhook_settling_during_verify_is_not_overwritten(self):
+        transaction = make_transaction(self.user, age=timedelta(minutes=10))
+
+        def webhook_first(verified):
+            # charge.success is applied between the verify call and the write back
+            enqueue_event({'event': 'charge.success', 'data': {'reference': transaction.paystack_reference}})
+            drain_inbox()
+            return services.record_verifications(verified)
+
+        with mock.patch('auth_payment.reconciliation.record_verifications', side_effect=webhook_first):
+            report = self.reconcile({transaction.paystack_reference: 'abandoned'})
+
+        self.assertEqual((report.verified, report.updated), (1, 0))
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+        self.assertIsNotNone(transaction.paid_at)
+        self.assertEqual([event.kind for event in transaction.events.all()], ['webhook'])
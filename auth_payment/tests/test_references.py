@@ -0,0 +1,56 @@
+import os
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from auth_payment import references
+from auth_payment.references import ReferenceGenerator
+
+
+class ReferenceGeneratorTests(SimpleTestCase):
+
+    def test_format(self):
+        reference = references.new_reference()
+
+        self.assertRegex(reference, r'^TXN_[0-9A-HJKMNP-TV-Z]{26}$')
+
+    def test_strictly_increasing(self):
+        generator = ReferenceGenerator(node_id=7)
+        generated = [generator.next() for _ in range(20000)]
+
+        self.assertEqual(generated, sorted(generated))
+        self.assertEqual(len(set(generated)), len(generated))
+
+    def test_monotonic_when_clock_steps_back(self):
+        generator = ReferenceGenerator(node_id=7)
+        now_ns = 1_800_000_000_000_000_000
+        with mock.patch.object(references.time, 'time_ns', side_effect=[now_ns, now_ns - 5_000_000_000]):
+            first = generator.next()
+            second = generator.next()
+
+        self.assertLess(first, second)
+
+    def test_unique_across_threads(self):
+        generator = ReferenceGenerator(node_id=7)
+        results = [[] for _ in range(4)]
+
+        def generate(out):
+            out.extend(generator.next() for _ in range(5000))
+
+        threads = [threading.Thread(target=generate, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        generated = [reference for out in results for reference in out]
+        self.assertEqual(len(set(generated)), len(generated))
+
+    def test_node_id_and_pid_are_encoded(self):
+        value = ReferenceGenerator(node_id=0xABCD).next_value()
+
+        node = (value >> references.SEQUENCE_BITS) & ((1 << 40) - 1)
+        self.assertEqual(node >> 24, 0xABCD)
+        self.assertEqual(node & 0xFFFFFF, os.getpid() & 0xFFFFFF)
+
@@ -0,0 +1,75 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from auth_payment.models import Transaction
+from auth_payment.renderers import ORJSONRenderer
+from auth_payment.serializers import TransactionSerializer, UserSerializer, transaction_list_data, user_data
+
+from .helpers import APITestCase, make_transaction, make_user
+
+PAYLOADS = {
+    'envelope': {'success': True, 'message': 'Status retrieved', 'data': {'status': 'success', 'amount': 5000}},
+    'empty': {},
+    'nested': {'a': [1, 2.5, None, False, {'b': []}], 'c': 'ŋaira ₦'},
+    'line separators': {'message': 'one\u2028two\u2029three'},
+    'decimal': {'amount': Decimal('50.00')},
+    'datetime': {'paid_at': datetime.datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc)},
+    'naive datetime': {'at': datetime.datetime(2026, 1, 2, 3, 4, 5)},
+    'date and time': {'day': datetime.date(2026, 1, 2), 'time': datetime.time(3, 4, 5)},
+    'uuid': {'id': uuid.UUID('12345678-1234-5678-1234-567812345678')},
+    'lazy string': {'message': gettext_lazy('Invalid input')},
+    'big integer': {'n': 2 ** 70},
+    'non-string keys': {1: 'a', 2.5: 'b'},
+    'list': [{'id': 1}, {'id': 2}],
+}
+
+
+class ORJSONRendererTests(SimpleTestCase):
+
+    def assertSameBytes(self, data, accepted_media_type=None, renderer_context=None):
+        self.assertEqual(
+            ORJSONRenderer().render(data, accepted_media_type, renderer_context),
+            JSONRenderer().render(data, accepted_media_type, renderer_context),
+        )
+
+    def test_byte_identical_to_json_renderer(self):
+        for name, data in PAYLOADS.items():
+            with self.subTest(name):
+                self.assertSameBytes(data)
+
+    def test_indented_output(self):
+        self.assertSameBytes(PAYLOADS['nested'], 'application/json; indent=4')
+        self.assertSameBytes(PAYLOADS['nested'], None, {'indent': 2})
+
+    def test_none_renders_empty(self):
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class FastSerializerTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user(picture='https://example.com/a.png')
+        make_transaction(self.user, status='success', amount='1234.5', paid_at=datetime.datetime(
+            2026, 1, 2, 3, 4, 5, 6, tzinfo=datetime.timezone.utc
+        ), authorization_url='https://checkout.paystack.com/x')
+        make_transaction(self.user, amount='0.10')
+        make_transaction(make_user(), status='failed', amount='99999999.99')
+
+    def test_user_data_matches_user_serializer(self):
+        self.assertEqual(
+            ORJSONRenderer().render(user_data(self.user)), JSONRenderer().render(UserSerializer(self.user).data)
+        )
+
+    def test_transaction_list_data_matches_transaction_serializer(self):
+        transactions = list(Transaction.objects.select_related('user').order_by('created_at'))
+
+        self.assertEqual(
+            ORJSONRenderer().render(transaction_list_data(transactions)),
+            JSONRenderer().render(TransactionSerializer(transactions, many=True).data),
+        )
@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from auth_payment import resilience
+from auth_payment.resilience import CLOSED, HALF_OPEN, OPEN, CallPolicy, CircuitBreaker, CircuitOpenError, RetryBudget
+
+
+class ClockTestCase(SimpleTestCase):
+    """resilience's monotonic clock under test control: advance it with self.now[0] += seconds"""
+
+    def setUp(self):
+        self.now = [1000.0]
+        self.enterContext(mock.patch('auth_payment.resilience.time.monotonic', side_effect=lambda: self.now[0]))
+
+
+class CircuitBreakerTests(ClockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, recovery_timeout=30, half_open_max_calls=1)
+
+    def trip(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertTrue(self.breaker.is_open)
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_after_recovery_timeout(self):
+        self.trip()
+        self.now[0] += 29.9
+        self.assertEqual(self.breaker.state, OPEN)
+
+        self.now[0] += 0.1
+
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.is_open)
+        self.assertTrue(self.breaker.allow_request())
+        # Only half_open_max_calls probes at a time
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_probe_success_closes(self):
+        self.trip()
+        self.now[0] += 30
+        self.breaker.allow_request()
+
+        self.breaker.record_success()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_probe_failure_reopens_for_another_timeout(self):
+        self.trip()
+        self.now[0] += 30
+        self.breaker.allow_request()
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now[0] += 29
+        self.assertFalse(self.breaker.allow_request())
+        self.now[0] += 1
+        self.assertTrue(self.breaker.allow_request())
+
+
+class RetryBudgetTests(ClockTestCase):
+
+    def test_reserve_allows_min_per_second(self):
+        budget = RetryBudget(ratio=0.1, min_per_second=1.0)
+
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        self.now[0] += 0.5
+        self.assertFalse(budget.try_spend())
+        self.now[0] += 0.5
+        self.assertTrue(budget.try_spend())
+
+    def test_deposits_fund_retries(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=0)
+        self.assertFalse(budget.try_spend())
+
+        budget.deposit()
+        budget.deposit()
+
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+    def test_tokens_are_capped(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_calls=4)
+        for _ in range(100):
+            budget.deposit()
+
+        self.assertEqual(sum(budget.try_spend() for _ in range(10)), 2)
+
+
+@override_settings(HTTP_MAX_RETRIES=3, HTTP_RETRY_BACKOFF_BASE=0.1, HTTP_RETRY_BACKOFF_MAX=0.3)
+class CallPolicyTests(ClockTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.dict(resilience._breakers, {
+            'test': CircuitBreaker('test', failure_threshold=2, recovery_timeout=30)
+        }))
+        self.enterContext(mock.patch.object(resilience, '_retry_budget', RetryBudget(ratio=0, min_per_second=100)))
+        # Full jitter draws from [0, ceiling]; take the ceiling
+        self.enterContext(mock.patch('auth_payment.resilience.random.uniform', side_effect=lambda low, high: high))
+
+    def test_exponential_backoff_up_to_the_cap(self):
+        policy = CallPolicy('test', 'verify', 'GET')
+
+        delays = [policy.after_attempt(503) for _ in range(4)]
+
+        self.assertEqual(delays, [0.1, 0.2, 0.3, None])
+
+    def test_only_idempotent_methods_and_retryable_outcomes(self):
+        self.assertIsNone(CallPolicy('test', 'initialize', 'POST').after_attempt(503))
+        self.assertIsNone(CallPolicy('test', 'verify', 'GET').after_attempt(500))
+        self.assertIsNone(CallPolicy('test', 'verify', 'GET').after_attempt(404))
+        self.assertEqual(CallPolicy('test', 'verify', 'GET').after_attempt(error=True), 0.1)
+
+    def test_exhausted_budget_stops_retries(self):
+        resilience._retry_budget = RetryBudget(ratio=0, min_per_second=1)
+        policy = CallPolicy('test', 'verify', 'GET')
+
+        self.assertEqual(policy.after_attempt(503), 0.1)
+        self.assertIsNone(policy.after_attempt(503))
+
+    def test_open_breaker_short_circuits(self):
+        policy = CallPolicy('test', 'verify', 'GET')
+        policy.before_attempt()
+        policy.after_attempt(502)
+        policy.after_attempt(error=True)
+
+        with self.assertRaises(CircuitOpenError):
+            CallPolicy('test', 'verify', 'GET').before_attempt()
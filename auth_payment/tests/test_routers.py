@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.test import override_settings
+
+from auth_payment.models import Transaction
+from auth_payment.routers import ReplicaRouter, pin_to_primary, read_database, replica_reads
+from auth_payment.webhooks import drain_inbox, enqueue_event
+
+from .helpers import APITestCase, auth_headers, make_transaction, make_user
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'], READ_REPLICA_STICKY_SECONDS=15)
+class ReadDatabaseTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def test_reads_go_to_a_replica(self):
+        self.assertEqual(read_database(self.user.id), 'replica_1')
+        self.assertEqual(read_database(), 'replica_1')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_primary_without_replicas(self):
+        self.assertEqual(read_database(self.user.id), 'default')
+
+    def test_pinned_user_reads_the_primary(self):
+        pin_to_primary(self.user.id)
+
+        self.assertEqual(read_database(self.user.id), 'default')
+        self.assertEqual(read_database(make_user().id), 'replica_1')
+
+    def test_pin_expires(self):
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1000):
+            pin_to_primary(self.user.id)
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=1015):
+            self.assertEqual(read_database(self.user.id), 'replica_1')
+
+    @override_settings(READ_REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_can_be_disabled(self):
+        pin_to_primary(self.user.id)
+
+        self.assertEqual(read_database(self.user.id), 'replica_1')
+
+    def test_webhook_pins_the_transaction_owner(self):
+        transaction = make_transaction(self.user)
+        enqueue_event({'event': 'charge.success', 'data': {'reference': transaction.paystack_reference}})
+
+        drain_inbox()
+
+        self.assertEqual(read_database(self.user.id), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRouterTests(APITestCase):
+    router = ReplicaRouter()
+
+    def test_only_reads_inside_the_block_use_the_replica(self):
+        self.assertIsNone(self.router.db_for_read(Transaction))
+        with replica_reads() as alias:
+            self.assertEqual(alias, 'replica_1')
+            self.assertEqual(self.router.db_for_read(Transaction), 'replica_1')
+            self.assertEqual(self.router.db_for_write(Transaction), 'default')
+            # Other apps' tables (sessions, the database cache) stay on the primary
+            self.assertIsNone(self.router.db_for_read(Session))
+        self.assertIsNone(self.router.db_for_read(Transaction))
+
+    def test_migrations_only_run_on_the_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'auth_payment'))
+        self.assertFalse(self.router.allow_migrate('replica_1', 'auth_payment'))
+
+
+@contextmanager
+def lagging_replica(user_id=None):
+    """A replica that has not caught up yet: reads inside the block find nothing"""
+    with mock.patch('django.db.models.query.QuerySet.first', return_value=None):
+        yield 'replica_1'
+
+
+class ReplicaFallbackTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.transaction = make_transaction(self.user, status='success')
+
+    def test_status_falls_back_to_the_primary(self):
+        with mock.patch('auth_payment.views.replica_reads', lagging_replica):
+            response = self.client.get(f'/payments/{self.transaction.reference}/status', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['status'], 'success')
@@ -0,0 +1,213 @@
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.test import override_settings
+
+from auth_payment.archive import archive_transactions
+from auth_payment.models import ArchivedTransaction, Transaction
+from auth_payment.utils import PaystackHelper
+
+from .helpers import APITestCase, auth_headers, make_transaction, make_user
+
+
+class TransactionStatusTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def get(self, reference, **params):
+        return self.client.get(f'/payments/{reference}/status', params, **auth_headers(self.user))
+
+    def test_settled_transaction_is_not_verified(self):
+        transaction = make_transaction(self.user, status='success', amount='12.34')
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction') as verify:
+            response = self.get(transaction.reference)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['status'], 'success')
+        self.assertEqual(response.json()['data']['amount'], 1234)
+        verify.assert_not_called()
+
+    def test_pending_transaction_is_verified(self):
+        transaction = make_transaction(self.user)
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', return_value={'status': 'success'}):
+            response = self.get(transaction.reference)
+
+        self.assertEqual(response.json()['data']['status'], 'success')
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+        self.assertEqual(transaction.events.get().kind, 'verify')
+
+    def test_webhook_settling_during_verify_is_not_overwritten(self):
+        transaction = make_transaction(self.user)
+
+        def webhook_first(reference):
+            Transaction.objects.filter(pk=transaction.pk).update(status='success')
+            return {'status': 'abandoned'}
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', side_effect=webhook_first):
+            response = self.get(transaction.reference)
+
+        self.assertEqual(response.json()['data']['status'], 'success')
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+        self.assertFalse(transaction.events.exists())
+
+    def test_other_users_reference_is_not_found(self):
+        transaction = make_transaction(make_user(), status='success')
+
+        self.assertEqual(self.get(transaction.reference).status_code, 404)
+
+
+class TransactionStatusBatchTests(APITestCase):
+    url = '/payments/status/batch'
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def post(self, references):
+        return self.client.post(
+            self.url, {'references': references}, content_type='application/json', **auth_headers(self.user)
+        )
+
+    def test_statuses_and_not_found(self):
+        paid = make_transaction(self.user, status='success')
+        pending = make_transaction(self.user)
+        foreign = make_transaction(make_user(), status='success')
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction') as verify:
+            response = self.post([paid.reference, pending.reference, foreign.reference, 'TXN_missing', paid.reference])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data'], {
+            'statuses': {paid.reference: 'success', pending.reference: 'pending'},
+            'not_found': [foreign.reference, 'TXN_missing'],
+        })
+        # Fresh pending transactions are answered from the database
+        verify.assert_not_called()
+
+    def test_stale_pending_transactions_are_verified(self):
+        stale = make_transaction(self.user, age=timedelta(minutes=10))
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', return_value={'status': 'failed'}):
+            response = self.post([stale.reference])
+
+        self.assertEqual(response.json()['data']['statuses'], {stale.reference: 'failed'})
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, 'failed')
+
+    def test_empty_and_oversized_batches_are_rejected(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        self.assertEqual(self.post([f'TXN_{i}' for i in range(501)]).status_code, 400)
+
+
+class ArchiveLookupTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        archive_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(archive_dir.cleanup)
+        self.enterContext(override_settings(ARCHIVE_DIR=archive_dir.name, ARCHIVE_BLOCK_ROWS=2))
+        self.user = make_user()
+        self.old = [
+            make_transaction(self.user, status='success', amount=f'{i}.50', age=timedelta(days=400))
+            for i in range(1, 6)
+        ]
+        self.recent = make_transaction(self.user, status='success', age=timedelta(days=1))
+
+    def test_archives_only_old_settled_transactions(self):
+        report = archive_transactions(older_than_days=180)
+
+        self.assertEqual(report.archived, 5)
+        self.assertEqual(list(Transaction.objects.all()), [self.recent])
+        self.assertEqual(ArchivedTransaction.objects.count(), 5)
+
+    def test_status_of_archived_transaction(self):
+        archive_transactions(older_than_days=180)
+
+        response = self.client.get(f'/payments/{self.old[2].reference}/status', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['status'], 'success')
+        self.assertEqual(response.json()['data']['amount'], 350)
+
+    def test_archived_transactions_stay_private(self):
+        archive_transactions(older_than_days=180)
+
+        response = self.client.get(f'/payments/{self.old[0].reference}/status', **auth_headers(make_user()))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_batch_includes_archived_transactions(self):
+        archive_transactions(older_than_days=180)
+        references = [txn.reference for txn in self.old] + [self.recent.reference]
+
+        response = self.client.post(
+            '/payments/status/batch', {'references': references}, content_type='application/json',
+            **auth_headers(self.user)
+        )
+
+        self.assertEqual(response.json()['data']['statuses'], dict.fromkeys(references, 'success'))
+
+    def bearer(self):
+        return {'Authorization': auth_headers(self.user)['HTTP_AUTHORIZATION']}
+
+    def _damage_segments(self, damage):
+        archive_transactions(older_than_days=180)
+        for segment in set(ArchivedTransaction.objects.values_list('segment', flat=True)):
+            damage(Path(settings.ARCHIVE_DIR) / segment)
+
+    def test_missing_segment_is_unavailable_not_an_error(self):
+        self._damage_segments(Path.unlink)
+
+        response = self.client.get(f'/payments/{self.old[0].reference}/status', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_corrupt_segment_is_unavailable(self):
+        self._damage_segments(lambda path: path.write_bytes(b'\0' * path.stat().st_size))
+
+        response = self.client.get(f'/payments/{self.old[0].reference}/status', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_batch_with_unreadable_segment_is_unavailable(self):
+        self._damage_segments(Path.unlink)
+
+        response = self.client.post(
+            '/payments/status/batch', {'references': [self.old[0].reference, self.recent.reference]},
+            content_type='application/json', **auth_headers(self.user)
+        )
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_stream_with_unreadable_segment_is_unavailable(self):
+        self._damage_segments(Path.unlink)
+
+        response = async_to_sync(self.async_client.get)(
+            f'/payments/{self.old[0].reference}/status/stream', headers=self.bearer()
+        )
+
+        self.assertEqual(response.status_code, 503)
+
+    def test_stream_of_archived_transaction(self):
+        archive_transactions(older_than_days=180)
+
+        response = async_to_sync(self.async_client.get)(
+            f'/payments/{self.old[1].reference}/status/stream', headers=self.bearer()
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"status":"success"', async_to_sync(_read_stream)(response))
+
+
+async def _read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
@@ -0,0 +1,79 @@
+import time
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.utils.asyncio import async_unsafe
+
+from auth_payment import routers
+from auth_payment.authentication import stream_token_for
+
+from .helpers import APITestCase, auth_headers, make_transaction, make_user
+
+
+class StatusStreamTokenTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+        self.transaction = make_transaction(self.user, status='success')
+        self.url = f'/payments/{self.transaction.reference}/status/stream'
+
+    def stream(self, **params):
+        return async_to_sync(self.async_client.get)(self.url, params)
+
+    def test_token_is_issued_to_bearer(self):
+        response = self.client.post(f'{self.url}-token', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['expires_in'], 60)
+
+        response = self.stream(stream_token=response.json()['data']['stream_token'])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'"status":"success"', async_to_sync(_read_stream)(response))
+
+    def test_token_requires_authentication(self):
+        self.assertEqual(self.client.post(f'{self.url}-token').status_code, 401)
+
+    def test_access_token_in_query_is_not_accepted(self):
+        access_token = auth_headers(self.user)['HTTP_AUTHORIZATION'].split()[1]
+
+        self.assertEqual(self.stream(access_token=access_token).status_code, 401)
+
+    def test_token_for_another_reference_is_rejected(self):
+        other = make_transaction(self.user, status='success')
+
+        self.assertEqual(self.stream(stream_token=stream_token_for(self.user.id, other.reference)).status_code, 401)
+
+    def test_expired_token_is_rejected(self):
+        with mock.patch('django.core.signing.time.time', return_value=time.time() - 61):
+            token = stream_token_for(self.user.id, self.transaction.reference)
+
+        self.assertEqual(self.stream(stream_token=token).status_code, 401)
+
+    def test_token_only_reads_its_users_transactions(self):
+        token = stream_token_for(make_user().id, self.transaction.reference)
+
+        self.assertEqual(self.stream(stream_token=token).status_code, 404)
+
+    def test_replica_pin_is_read_off_the_event_loop(self):
+        # What a synchronous cache backend does when called on the loop
+        read_database = async_unsafe('read_database')(routers.read_database)
+
+        with mock.patch('auth_payment.async_views.read_database', side_effect=read_database) as pinned:
+            response = self.stream(stream_token=stream_token_for(self.user.id, self.transaction.reference))
+
+        self.assertEqual(response.status_code, 200)
+        pinned.assert_called_once()
+
+    def test_not_served_under_wsgi(self):
+        token = stream_token_for(self.user.id, self.transaction.reference)
+
+        response = self.client.get(self.url, {'stream_token': token})
+
+        self.assertEqual(response.status_code, 501)
+
+
+async def _read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
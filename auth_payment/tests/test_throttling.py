@@ -0,0 +1,181 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import override_settings
+from django.utils.asyncio import async_unsafe
+
+from auth_payment import throttling
+from auth_payment.models import Transaction
+from auth_payment.reconciliation import reconcile_pending
+from auth_payment.throttling import BudgetExhausted, TokenBucket, parse_rate
+from auth_payment.utils import PaystackHelper
+
+from .helpers import APITestCase, auth_headers, make_transaction, make_user
+
+
+class TokenBucketTests(APITestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('10/min'), (10, 60))
+        self.assertEqual(parse_rate('50/s'), (50, 1))
+        self.assertEqual(parse_rate('1000/day'), (1000, 86400))
+        self.assertIsNone(parse_rate(''))
+
+    def test_burst_then_refill(self):
+        bucket = TokenBucket('test', capacity=3, period=3)
+        now = [1_000_000.0]
+        with mock.patch.object(throttling.time, 'time', side_effect=lambda: now[0]):
+            self.assertEqual([bucket.take('k') for _ in range(3)], [0, 0, 0])
+            self.assertAlmostEqual(bucket.take('k'), 1.0)
+            now[0] += 1
+            self.assertEqual(bucket.take('k'), 0)
+            self.assertGreater(bucket.take('k'), 0)
+
+    def test_rejections_do_not_spend_tokens(self):
+        bucket = TokenBucket('test', capacity=1, period=10)
+        now = [1_000_000.0]
+        with mock.patch.object(throttling.time, 'time', side_effect=lambda: now[0]):
+            bucket.take('k')
+            for _ in range(5):
+                bucket.take('k')
+            now[0] += 10
+            self.assertEqual(bucket.take('k'), 0)
+
+    def test_keys_are_independent(self):
+        bucket = TokenBucket('test', capacity=1, period=60)
+
+        self.assertEqual(bucket.take('a'), 0)
+        self.assertEqual(bucket.take('b'), 0)
+        self.assertGreater(bucket.take('a'), 0)
+
+
+def paystack_initialized(amount, email, reference=None, metadata=None):
+    return {'reference': reference, 'authorization_url': f'https://checkout.paystack.com/{reference}'}
+
+
+@mock.patch.object(PaystackHelper, 'initialize_transaction', side_effect=paystack_initialized)
+class EndpointThrottlingTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def initiate(self, user, amount):
+        return self.client.post(
+            '/payments/paystack/initiate', {'amount': amount}, content_type='application/json', **auth_headers(user)
+        )
+
+    @override_settings(THROTTLE_RATES={'initiate_user': '2/min'})
+    def test_initiate_per_user(self, initialize):
+        codes = [self.initiate(self.user, 1000 + i).status_code for i in range(3)]
+        other = self.initiate(make_user(), 1000)
+
+        self.assertEqual(codes, [201, 201, 429])
+        self.assertEqual(other.status_code, 201)
+        self.assertEqual(initialize.call_count, 3)
+
+    @override_settings(THROTTLE_RATES={'initiate_ip': '2/min'})
+    def test_initiate_per_ip(self, initialize):
+        codes = [self.initiate(make_user(), 1000).status_code for _ in range(3)]
+
+        self.assertEqual(codes, [201, 201, 429])
+
+    @override_settings(THROTTLE_RATES={'initiate_user': '1/min'})
+    def test_rejection_carries_retry_after(self, initialize):
+        self.initiate(self.user, 1000)
+        response = self.initiate(self.user, 2000)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        self.assertFalse(response.json()['success'])
+
+    @override_settings(THROTTLE_RATES={'status_refresh_user': '1/min'})
+    def test_only_refreshes_are_limited(self, initialize):
+        transaction = make_transaction(self.user, status='success')
+        url = f'/payments/{transaction.reference}/status'
+        headers = auth_headers(self.user)
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', return_value=None):
+            refreshes = [self.client.get(url, {'refresh': 'true'}, **headers).status_code for _ in range(2)]
+        plain = self.client.get(url, **headers).status_code
+
+        self.assertEqual(refreshes, [200, 429])
+        self.assertEqual(plain, 200)
+
+    def test_paystack_busy_initiation(self, initialize):
+        initialize.side_effect = BudgetExhausted('paystack', 2.5)
+
+        response = self.initiate(self.user, 1000)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3')
+
+
+@override_settings(THROTTLE_RATES={'paystack_outbound': '1/min'})
+@mock.patch('auth_payment.utils.get_http_client')
+class PaystackBudgetTests(APITestCase):
+
+    def test_initialize_raises_once_spent(self, get_client):
+        get_client.return_value.post.return_value.json.return_value = {
+            'status': True, 'data': {'reference': 'r', 'authorization_url': 'https://checkout.paystack.com/r'}
+        }
+
+        self.assertEqual(PaystackHelper.initialize_transaction(1000, 'a@example.com', 'r')['reference'], 'r')
+        with self.assertRaises(BudgetExhausted):
+            PaystackHelper.initialize_transaction(1000, 'a@example.com', 'r2')
+        self.assertEqual(get_client.return_value.post.call_count, 1)
+
+    def test_verify_raises_once_spent(self, get_client):
+        get_client.return_value.get.return_value.json.return_value = {'status': True, 'data': {'status': 'success'}}
+
+        self.assertEqual(PaystackHelper.verify_transaction('r'), {'status': 'success'})
+        with self.assertRaises(BudgetExhausted):
+            PaystackHelper.verify_transaction('r')
+        self.assertEqual(get_client.return_value.get.call_count, 1)
+
+    @mock.patch('auth_payment.utils.get_async_http_client')
+    def test_async_initialize_spends_off_the_event_loop(self, get_async_client, get_client):
+        response = mock.Mock()
+        response.json.return_value = {
+            'status': True, 'data': {'reference': 'r', 'authorization_url': 'https://checkout.paystack.com/r'}
+        }
+        get_async_client.return_value.post = mock.AsyncMock(return_value=response)
+        # What DatabaseCache and the other synchronous cache backends do when called on the loop
+        spend = async_unsafe('spend_outbound')(throttling.spend_outbound)
+
+        with mock.patch('auth_payment.utils.spend_outbound', spend):
+            result = async_to_sync(PaystackHelper.ainitialize_transaction)(1000, 'a@example.com', 'r')
+            with self.assertRaises(BudgetExhausted):
+                async_to_sync(PaystackHelper.ainitialize_transaction)(1000, 'a@example.com', 'r2')
+
+        self.assertEqual(result['reference'], 'r')
+
+
+class BudgetExhaustedTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def test_status_serves_stored_status(self):
+        transaction = make_transaction(self.user)
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', side_effect=BudgetExhausted('paystack', 1)):
+            response = self.client.get(f'/payments/{transaction.reference}/status', **auth_headers(self.user))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['data']['status'], 'pending')
+
+    def test_reconciliation_defers_the_rest_to_the_next_run(self):
+        transactions = [make_transaction(self.user, age=timedelta(hours=2)) for _ in range(5)]
+        results = [{'status': 'success'}, BudgetExhausted('paystack', 1)]
+
+        with mock.patch.object(PaystackHelper, 'verify_transaction', side_effect=results) as verify:
+            report = reconcile_pending(stale_minutes=30, concurrency=1, batch_size=2)
+
+        self.assertEqual(verify.call_count, 2)
+        self.assertEqual((report.updated, report.deferred, report.provider_errors), (1, 1, 0))
+        self.assertEqual(
+            Transaction.objects.filter(pk__in=[txn.pk for txn in transactions], status='pending').count(), 4
+        )
@@ -0,0 +1,130 @@
+import hashlib
+import hmac
+import json
+
+from django.test import override_settings
+
+from auth_payment.models import WebhookEvent
+from auth_payment.webhooks import drain_inbox, enqueue_event
+
+from .helpers import APITestCase, make_transaction, make_user
+
+SECRET = 'whsec_test'
+
+
+def charge(event, reference):
+    return {'event': event, 'data': {'reference': reference, 'status': event.split('.')[1]}}
+
+
+@override_settings(PAYSTACK_WEBHOOK_SECRET=SECRET)
+class WebhookViewTests(APITestCase):
+    url = '/payments/paystack/webhook'
+
+    def post(self, body, signature=None):
+        if signature is None:
+            signature = hmac.new(SECRET.encode(), body, hashlib.sha512).hexdigest()
+        return self.client.post(self.url, body, content_type='application/json', HTTP_X_PAYSTACK_SIGNATURE=signature)
+
+    def test_signed_delivery_is_queued(self):
+        response = self.post(json.dumps(charge('charge.success', 'TXN_1')).encode())
+
+        self.assertEqual(response.status_code, 200)
+        event = WebhookEvent.objects.get()
+        self.assertEqual((event.event, event.reference, event.status), ('charge.success', 'TXN_1', 'pending'))
+
+    def test_bad_signature_is_rejected(self):
+        response = self.post(json.dumps(charge('charge.success', 'TXN_1')).encode(), signature='0' * 128)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_non_ascii_signature_is_rejected(self):
+        response = self.post(json.dumps(charge('charge.success', 'TXN_1')).encode(), signature='é' * 128)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_signature_covers_raw_bytes(self):
+        body = json.dumps(charge('charge.success', 'TXN_1')).encode()
+        signature = hmac.new(SECRET.encode(), body, hashlib.sha512).hexdigest()
+        response = self.post(json.dumps(json.loads(body), indent=2).encode(), signature=signature)
+
+        self.assertEqual(response.status_code, 400)
+
+
+class InboxTests(APITestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = make_user()
+
+    def test_drain_applies_events(self):
+        paid = make_transaction(self.user)
+        failed = make_transaction(self.user)
+        enqueue_event(charge('charge.success', paid.paystack_reference))
+        enqueue_event(charge('charge.failed', failed.paystack_reference))
+        enqueue_event({'event': 'transfer.success', 'data': {}})
+
+        self.assertEqual(drain_inbox(), 3)
+
+        paid.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual(paid.status, 'success')
+        self.assertIsNotNone(paid.paid_at)
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(paid.events.get().kind, 'webhook')
+        self.assertFalse(WebhookEvent.objects.exclude(status='processed').exists())
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_unknown_reference_is_retried_then_dead_lettered(self):
+        event = enqueue_event(charge('charge.success', 'TXN_unknown'))
+
+        drain_inbox()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('pending', 1))
+
+        WebhookEvent.objects.filter(pk=event.pk).update(available_at=event.received_at)
+        drain_inbox()
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('dead', 2))
+
+    def test_late_failure_does_not_undo_success(self):
+        transaction = make_transaction(self.user)
+        enqueue_event(charge('charge.success', transaction.paystack_reference))
+        drain_inbox()
+        enqueue_event(charge('charge.failed', transaction.paystack_reference))
+        drain_inbox()
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+        self.assertEqual(transaction.events.count(), 2)
+        self.assertFalse(WebhookEvent.objects.exclude(status='processed').exists())
+
+    def test_out_of_order_events_in_one_batch(self):
+        transaction = make_transaction(self.user)
+        enqueue_event(charge('charge.success', transaction.paystack_reference))
+        enqueue_event(charge('charge.failed', transaction.paystack_reference))
+
+        drain_inbox()
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+
+    def test_success_settles_an_abandoned_transaction(self):
+        transaction = make_transaction(self.user, status='abandoned')
+        enqueue_event(charge('charge.success', transaction.paystack_reference))
+
+        drain_inbox()
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'success')
+        self.assertIsNotNone(transaction.paid_at)
+
+    def test_failure_after_abandonment_is_applied(self):
+        transaction = make_transaction(self.user, status='abandoned')
+        enqueue_event(charge('charge.failed', transaction.paystack_reference))
+
+        drain_inbox()
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.status, 'failed')
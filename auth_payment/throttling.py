@@ -0,0 +1,132 @@
+"""
+Rate limits in front of the endpoints that call Paystack, and a global budget for the calls.
+
+Buckets live in the default cache so every worker shares them. With a per-process cache each
+worker would allow the full rate, so several workers require a shared CACHE_BACKEND (Redis,
+the database cache), enforced by the auth_payment.E001 system check. Each bucket is one integer, the time (ms) at which
+it will be full again (GCRA), so taking a token is a single atomic ``cache.incr`` on the
+happy path. Cache backends without an atomic incr (the database cache) may let a few extra
+requests through under contention.
+"""
+import math
+import time
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+KEY_PREFIX = 'throttle'
+
+
+class BudgetExhausted(Exception):
+    """A provider's outbound budget is spent; the call was not attempted"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} outbound budget exhausted, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): the bucket holds 10 tokens and refills 10 per 60 seconds. Empty -> None"""
+    if not rate:
+        return None
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period.strip()[0]]
+
+
+class TokenBucket:
+    """Shared token bucket holding ``capacity`` tokens, refilled at capacity per ``period`` seconds"""
+
+    def __init__(self, name, capacity, period):
+        self.name = name
+        self.capacity = capacity
+        self.interval_ms = max(1, round(period * 1000 / capacity))
+        self.window_ms = self.interval_ms * capacity
+        # A key that is never idle long enough to be reset expires after this and starts full again
+        self.timeout = max(60, math.ceil(self.window_ms / 1000) * 10)
+
+    @classmethod
+    def from_rate(cls, name, rate):
+        parsed = parse_rate(rate)
+        return cls(name, *parsed) if parsed else None
+
+    def take(self, key='', cost=1):
+        """Spend ``cost`` tokens. Returns 0 if they were available, else the seconds until they will be"""
+        key = f"{KEY_PREFIX}:{self.name}:{key}"
+        now = int(time.time() * 1000)
+        step = self.interval_ms * cost
+        try:
+            full_at = cache.incr(key, step)
+        except ValueError:
+            if cache.add(key, now + step, self.timeout):
+                return 0
+            full_at = cache.incr(key, step)
+
+        if full_at - step < now:
+            # Idle long enough to refill completely; restart from now
+            cache.set(key, now + step, self.timeout)
+            return 0
+        wait = full_at - now - self.window_ms
+        if wait > 0:
+            # Rejected requests don't spend tokens
+            try:
+                cache.decr(key, step)
+            except ValueError:
+                pass
+            return wait / 1000
+        return 0
+
+
+_buckets = {}
+
+
+def get_bucket(name):
+    """The bucket configured for ``name`` in THROTTLE_RATES, or None when that limit is disabled"""
+    if name not in _buckets:
+        _buckets[name] = TokenBucket.from_rate(name, settings.THROTTLE_RATES.get(name))
+    return _buckets[name]
+
+
+def client_ip(request):
+    """Client address, honouring X-Forwarded-For from REST_FRAMEWORK['NUM_PROXIES'] trusted proxies"""
+    return BaseThrottle().get_ident(request)
+
+
+def check(request, endpoint, user_id):
+    """
+    Take a token from the caller's per-user and per-IP buckets for ``endpoint``.
+    Returns 0 if the request may proceed, else the seconds to wait.
+    """
+    for scope, ident in (('user', user_id), ('ip', client_ip(request))):
+        bucket = get_bucket(f'{endpoint}_{scope}')
+        if bucket is None:
+            continue
+        wait = bucket.take(ident)
+        if wait:
+            metrics.record_throttled(endpoint, scope)
+            logger.info("Throttled %s for %s %s; retry in %.1fs", endpoint, scope, ident, wait)
+            return wait
+    return 0
+
+
+def spend_outbound(provider):
+    """Take one token from the provider's global outbound budget or raise BudgetExhausted"""
+    bucket = get_bucket(f'{provider}_outbound')
+    if bucket is None:
+        return
+    wait = bucket.take()
+    if wait:
+        metrics.record_throttled(f'{provider}_outbound', 'global')
+        raise BudgetExhausted(provider, wait)
+
+
+def retry_after(wait):
+    """Retry-After header value (whole seconds, at least 1)"""
+    return str(max(1, math.ceil(wait)))
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     GoogleAuthInitiateView,
@@ -5,17 +6,44 @@ from .views import (
     PaystackInitiatePaymentView,
     PaystackWebhookView,
     TransactionStatusView,
+    TransactionStatusBatchView,
+    TransactionStatusStreamTokenView,
+    TransactionListView,
+    TokenRefreshView,
+    MetricsView,
 )
+from .async_views import (
+    AsyncGoogleAuthCallbackView,
+    AsyncPaystackInitiatePaymentView,
+    AsyncTransactionStatusStreamView,
+)
+
+# ASYNC_VIEWS switches the provider-bound endpoints to their async versions when served via ASGI;
+# the sync views stay the fallback for WSGI deployments.
+if settings.ASYNC_VIEWS:
+    google_callback_view = AsyncGoogleAuthCallbackView
+    paystack_initiate_view = AsyncPaystackInitiatePaymentView
+else:
+    google_callback_view = GoogleAuthCallbackView
+    paystack_initiate_view = PaystackInitiatePaymentView
 
 urlpatterns = [
     
     path('auth/google', GoogleAuthInitiateView.as_view(), name='google-auth-initiate'),
-    path('auth/google/callback', GoogleAuthCallbackView.as_view(), name='google-auth-callback'),
+    path('auth/google/callback', google_callback_view.as_view(), name='google-auth-callback'),
+    path('auth/token/refresh', TokenRefreshView.as_view(), name='token-refresh'),
     
    
-    path('payments/paystack/initiate', PaystackInitiatePaymentView.as_view(), name='paystack-initiate'),
+    path('payments/paystack/initiate', paystack_initiate_view.as_view(), name='paystack-initiate'),
     path('payments/paystack/webhook', PaystackWebhookView.as_view(), name='paystack-webhook'),
     
     
+    path('payments', TransactionListView.as_view(), name='transaction-list'),
+    path('payments/status/batch', TransactionStatusBatchView.as_view(), name='transaction-status-batch'),
     path('payments/<str:reference>/status', TransactionStatusView.as_view(), name='transaction-status'),
+    path('payments/<str:reference>/status/stream', AsyncTransactionStatusStreamView.as_view(), name='transaction-status-stream'),
+    path('payments/<str:reference>/status/stream-token', TransactionStatusStreamTokenView.as_view(), name='transaction-status-stream-token'),
+    
+    
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
\ No newline at end of file
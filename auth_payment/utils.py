@@ -1,14 +1,30 @@
+import jwt
+import httpx
 import requests
 import hashlib
 import hmac
-import json
 import logging
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from urllib.parse import urlencode
 
+from .http_client import get_http_client, get_async_http_client
+from .resilience import CircuitOpenError
+from .throttling import spend_outbound
+from .jwks import JWKSCache
+
 logger = logging.getLogger(__name__)
+# Envelope logging is high-volume; kept on its own logger so it can be sampled separately
+response_logger = logging.getLogger(f"{__name__}.responses")
 
 class GoogleAuthHelper:
+    TOKEN_URL = settings.GOOGLE_TOKEN_URL
+    USERINFO_URL = settings.GOOGLE_USERINFO_URL
+    CERTS_URL = settings.GOOGLE_CERTS_URL
+    ID_TOKEN_ISSUERS = ('https://accounts.google.com', 'accounts.google.com')
+    ID_TOKEN_LEEWAY = 30
+    signing_keys = JWKSCache(min_refresh_interval=settings.GOOGLE_JWKS_MIN_REFRESH_INTERVAL)
+
     @staticmethod
     def get_auth_url():
         """Generate Google OAuth URL"""
@@ -28,15 +44,11 @@ class GoogleAuthHelper:
         }
         
         auth_url = f"https://accounts.google.com/o/oauth2/v2/auth?{urlencode(params)}"
-        logger.info(f"Generated Google auth URL with redirect_uri: {redirect_uri}")
+        logger.info("Generated Google auth URL with redirect_uri: %s", redirect_uri)
         return auth_url
 
     @staticmethod
-    def exchange_code_for_token(code):
-        """Exchange authorization code for access token"""
-        token_url = 'https://oauth2.googleapis.com/token'
-        
-       
+    def _token_request_data(code):
         redirect_uri = settings.GOOGLE_REDIRECT_URI
         if not redirect_uri and hasattr(settings, 'BASE_URL'):
             base_url = settings.BASE_URL
@@ -50,11 +62,33 @@ class GoogleAuthHelper:
             'grant_type': 'authorization_code',
         }
         
-        logger.info(f"Exchanging code for token with redirect_uri: {redirect_uri}")
-        response = requests.post(token_url, data=data)
+        logger.info("Exchanging code for token with redirect_uri: %s", redirect_uri)
+        return data
+
+    @staticmethod
+    def exchange_code_for_token(code):
+        """Exchange authorization code for access token"""
+        data = GoogleAuthHelper._token_request_data(code)
+        response = get_http_client().post(
+            GoogleAuthHelper.TOKEN_URL, data=data, provider='google', operation='token_exchange'
+        )
         
         if response.status_code != 200:
-            logger.error(f"Google token exchange failed: {response.status_code} - {response.text}")
+            logger.error("Google token exchange failed: %s - %s", response.status_code, response.text)
+            return None
+        
+        return response.json()
+
+    @staticmethod
+    async def aexchange_code_for_token(code):
+        """Async variant of exchange_code_for_token"""
+        data = GoogleAuthHelper._token_request_data(code)
+        response = await get_async_http_client().post(
+            GoogleAuthHelper.TOKEN_URL, data=data, provider='google', operation='token_exchange'
+        )
+        
+        if response.status_code != 200:
+            logger.error("Google token exchange failed: %s - %s", response.status_code, response.text)
             return None
         
         return response.json()
@@ -62,23 +96,130 @@ class GoogleAuthHelper:
     @staticmethod
     def get_user_info(access_token):
         """Fetch user info from Google using access token"""
-        userinfo_url = 'https://www.googleapis.com/oauth2/v3/userinfo'
         headers = {
             'Authorization': f'Bearer {access_token}',
         }
         
         logger.info("Fetching user info from Google")
-        response = requests.get(userinfo_url, headers=headers)
+        response = get_http_client().get(
+            GoogleAuthHelper.USERINFO_URL, headers=headers, provider='google', operation='userinfo'
+        )
         
         if response.status_code != 200:
-            logger.error(f"Google userinfo failed: {response.status_code} - {response.text}")
+            logger.error("Google userinfo failed: %s - %s", response.status_code, response.text)
             return None
         
         return response.json()
 
+    @staticmethod
+    async def aget_user_info(access_token):
+        """Async variant of get_user_info"""
+        headers = {
+            'Authorization': f'Bearer {access_token}',
+        }
+        
+        logger.info("Fetching user info from Google")
+        response = await get_async_http_client().get(
+            GoogleAuthHelper.USERINFO_URL, headers=headers, provider='google', operation='userinfo'
+        )
+        
+        if response.status_code != 200:
+            logger.error("Google userinfo failed: %s - %s", response.status_code, response.text)
+            return None
+        
+        return response.json()
+
+
+    @staticmethod
+    def _id_token_kid(id_token):
+        try:
+            return jwt.get_unverified_header(id_token).get('kid')
+        except jwt.PyJWTError:
+            return None
+
+    @staticmethod
+    def _store_signing_keys(response):
+        response.raise_for_status()
+        GoogleAuthHelper.signing_keys.store(response.json(), response.headers.get('Cache-Control'))
+
+    @staticmethod
+    def _decode_id_token(id_token, kid):
+        """Verify signature, audience, issuer and expiry; return the profile claims or None"""
+        key = GoogleAuthHelper.signing_keys.get(kid, allow_stale=True)
+        if key is None:
+            logger.error("No Google signing key matches id_token kid %s", kid)
+            return None
+        
+        try:
+            claims = jwt.decode(
+                id_token,
+                key.key,
+                algorithms=['RS256'],
+                audience=settings.GOOGLE_CLIENT_ID,
+                issuer=GoogleAuthHelper.ID_TOKEN_ISSUERS,
+                leeway=GoogleAuthHelper.ID_TOKEN_LEEWAY,
+                options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+            )
+        except jwt.PyJWTError as e:
+            logger.error("Google id_token rejected: %s", e)
+            return None
+        
+        return {
+            'sub': claims['sub'],
+            'email': claims.get('email'),
+            'name': claims.get('name'),
+            'picture': claims.get('picture'),
+        }
+
+    @staticmethod
+    def verify_id_token(id_token):
+        """Verify a Google ID token locally against Google's cached signing keys"""
+        kid = GoogleAuthHelper._id_token_kid(id_token)
+        if GoogleAuthHelper.signing_keys.needs_fetch(kid):
+            try:
+                response = get_http_client().get(GoogleAuthHelper.CERTS_URL, provider='google', operation='jwks')
+                GoogleAuthHelper._store_signing_keys(response)
+            except (requests.exceptions.RequestException, CircuitOpenError, ValueError) as e:
+                logger.error("Fetching Google signing keys failed: %s", e)
+        
+        return GoogleAuthHelper._decode_id_token(id_token, kid)
+
+    @staticmethod
+    async def averify_id_token(id_token):
+        """Async variant of verify_id_token"""
+        kid = GoogleAuthHelper._id_token_kid(id_token)
+        if GoogleAuthHelper.signing_keys.needs_fetch(kid):
+            try:
+                response = await get_async_http_client().get(
+                    GoogleAuthHelper.CERTS_URL, provider='google', operation='jwks'
+                )
+                GoogleAuthHelper._store_signing_keys(response)
+            except (httpx.HTTPError, CircuitOpenError, ValueError) as e:
+                logger.error("Fetching Google signing keys failed: %s", e)
+        
+        return GoogleAuthHelper._decode_id_token(id_token, kid)
+
+    @staticmethod
+    def user_info_from_tokens(token_data):
+        """Profile for the token response: from the id_token, or the userinfo endpoint if there is none"""
+        if token_data.get('id_token'):
+            return GoogleAuthHelper.verify_id_token(token_data['id_token'])
+        
+        logger.warning("Token response has no id_token; falling back to the userinfo endpoint")
+        return GoogleAuthHelper.get_user_info(token_data['access_token'])
+
+    @staticmethod
+    async def auser_info_from_tokens(token_data):
+        """Async variant of user_info_from_tokens"""
+        if token_data.get('id_token'):
+            return await GoogleAuthHelper.averify_id_token(token_data['id_token'])
+        
+        logger.warning("Token response has no id_token; falling back to the userinfo endpoint")
+        return await GoogleAuthHelper.aget_user_info(token_data['access_token'])
+
 
 class PaystackHelper:
-    BASE_URL = 'https://api.paystack.co'
+    BASE_URL = settings.PAYSTACK_BASE_URL
     
     @staticmethod
     def get_headers():
@@ -88,33 +229,72 @@ class PaystackHelper:
         }
     
     @staticmethod
-    def initialize_transaction(amount, email, reference=None, metadata=None):
-        """Initialize Paystack transaction"""
-        url = f"{PaystackHelper.BASE_URL}/transaction/initialize"
-        data = {
+    def _initialize_payload(amount, email, reference=None, metadata=None):
+        return {
             'amount': amount,
             'email': email,
             'reference': reference,
             'metadata': metadata or {},
             'callback_url': f"{settings.BASE_URL}/payments/callback",  # Update with your actual callback URL
         }
+
+    @staticmethod
+    def _initialize_result(result):
+        if result['status']:
+            logger.info("Paystack transaction initialized successfully: %s", result['data']['reference'])
+            return result['data']
+        logger.error("Paystack initialization failed: %s", result.get('message', 'Unknown error'))
+        return None
+
+    @staticmethod
+    def _verify_result(reference, result):
+        if result['status']:
+            logger.info("Transaction %s verified: %s", reference, result['data']['status'])
+            return result['data']
+        logger.error("Transaction verification failed: %s", result.get('message', 'Unknown error'))
+        return None
+    
+    @staticmethod
+    def initialize_transaction(amount, email, reference=None, metadata=None):
+        """Initialize Paystack transaction"""
+        url = f"{PaystackHelper.BASE_URL}/transaction/initialize"
+        data = PaystackHelper._initialize_payload(amount, email, reference, metadata)
+        
+        logger.info("Initializing Paystack transaction for %s, amount: %s", email, amount)
+        # Raises BudgetExhausted for the view to turn into a 429
+        spend_outbound('paystack')
+        
+        try:
+            response = get_http_client().post(
+                url, json=data, headers=PaystackHelper.get_headers(), provider='paystack', operation='initialize'
+            )
+            response.raise_for_status()
+            return PaystackHelper._initialize_result(response.json())
+                
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            logger.error("Paystack API error: %s", e)
+            return None
+
+    @staticmethod
+    async def ainitialize_transaction(amount, email, reference=None, metadata=None):
+        """Async variant of initialize_transaction"""
+        url = f"{PaystackHelper.BASE_URL}/transaction/initialize"
+        data = PaystackHelper._initialize_payload(amount, email, reference, metadata)
         
-        logger.info(f"Initializing Paystack transaction for {email}, amount: {amount}")
+        logger.info("Initializing Paystack transaction for %s, amount: %s", email, amount)
+        # Raises BudgetExhausted for the view to turn into a 429. The budget lives in the cache,
+        # which may be a database or a blocking Redis client, so it is spent off the event loop
+        await sync_to_async(spend_outbound)('paystack')
         
         try:
-            response = requests.post(url, json=data, headers=PaystackHelper.get_headers())
+            response = await get_async_http_client().post(
+                url, json=data, headers=PaystackHelper.get_headers(), provider='paystack', operation='initialize'
+            )
             response.raise_for_status()
-            result = response.json()
-            
-            if result['status']:
-                logger.info(f"Paystack transaction initialized successfully: {result['data']['reference']}")
-                return result['data']
-            else:
-                logger.error(f"Paystack initialization failed: {result.get('message', 'Unknown error')}")
-                return None
+            return PaystackHelper._initialize_result(response.json())
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Paystack API error: {str(e)}")
+        except (httpx.HTTPError, CircuitOpenError) as e:
+            logger.error("Paystack API error: %s", e)
             return None
     
     @staticmethod
@@ -122,34 +302,36 @@ class PaystackHelper:
         """Verify transaction status with Paystack"""
         url = f"{PaystackHelper.BASE_URL}/transaction/verify/{reference}"
         
-        logger.info(f"Verifying Paystack transaction: {reference}")
+        logger.info("Verifying Paystack transaction: %s", reference)
+        # Raises BudgetExhausted: status reads then serve the stored status, reconciliation backs off
+        spend_outbound('paystack')
         
         try:
-            response = requests.get(url, headers=PaystackHelper.get_headers())
+            response = get_http_client().get(
+                url, headers=PaystackHelper.get_headers(), provider='paystack', operation='verify'
+            )
             response.raise_for_status()
-            result = response.json()
-            
-            if result['status']:
-                logger.info(f"Transaction {reference} verified: {result['data']['status']}")
-                return result['data']
-            else:
-                logger.error(f"Transaction verification failed: {result.get('message', 'Unknown error')}")
-                return None
+            return PaystackHelper._verify_result(reference, response.json())
                 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Paystack verification API error: {str(e)}")
+        except (requests.exceptions.RequestException, CircuitOpenError) as e:
+            logger.error("Paystack verification API error: %s", e)
             return None
-    
+
     @staticmethod
-    def validate_webhook_signature(payload, signature):
-        """Validate Paystack webhook signature"""
+    def validate_webhook_signature(raw_body, signature):
+        """Validate Paystack webhook signature against the raw request body bytes"""
+        if not settings.PAYSTACK_WEBHOOK_SECRET:
+            logger.error("PAYSTACK_WEBHOOK_SECRET is not configured; rejecting webhook")
+            return False
+        
         computed_signature = hmac.new(
             settings.PAYSTACK_WEBHOOK_SECRET.encode('utf-8'),
-            json.dumps(payload, separators=(',', ':')).encode('utf-8'),
+            raw_body,
             hashlib.sha512
-        ).hexdigest()
+        ).hexdigest().encode('ascii')
         
-        is_valid = hmac.compare_digest(computed_signature, signature)
+        # Compare bytes: compare_digest raises TypeError for str holding non-ASCII characters
+        is_valid = hmac.compare_digest(computed_signature, signature.encode('utf-8', 'surrogateescape'))
         
         if not is_valid:
             logger.warning("Invalid webhook signature detected")
@@ -165,7 +347,7 @@ class ResponseHelper:
             'message': message,
             'data': data or {}
         }
-        logger.info(f"Success response: {message}")
+        response_logger.info("Success response: %s", message)
         return response
     
     @staticmethod
@@ -175,5 +357,5 @@ class ResponseHelper:
             'message': message,
             'errors': errors or {}
         }
-        logger.error(f"Error response ({status_code}): {message}")
+        response_logger.error("Error response (%s): %s", status_code, message)
         return response
\ No newline at end of file
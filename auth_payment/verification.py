@@ -0,0 +1,103 @@
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from .throttling import BudgetExhausted
+from .utils import PaystackHelper
+
+logger = logging.getLogger(__name__)
+
+
+class PaystackVerifyCache:
+    """
+    Short-lived, cross-worker cache of Paystack verify results.
+
+    At most one verify call per reference is in flight at a time: the caller that wins
+    the lock (``cache.add``) calls Paystack, everyone else waits for its result. The
+    cache backend must be shared (database, Memcached or Redis) for this to hold across
+    worker processes.
+    """
+
+    @staticmethod
+    def result_key(reference):
+        return f"paystack:verify:{reference}"
+
+    @staticmethod
+    def lock_key(reference):
+        return f"paystack:verify:lock:{reference}"
+
+    @staticmethod
+    def refresh_key(reference):
+        return f"paystack:verify:refresh:{reference}"
+
+    @staticmethod
+    def get_or_verify(reference, refresh=False):
+        """Return Paystack verify data for reference, or None if it could not be obtained"""
+        result_key = PaystackVerifyCache.result_key(reference)
+
+        if refresh:
+            if cache.add(PaystackVerifyCache.refresh_key(reference), 1, settings.PAYSTACK_VERIFY_REFRESH_INTERVAL):
+                cache.delete(result_key)
+            else:
+                logger.info("Refresh for %s rate-limited; using cached verify result", reference)
+
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        lock_key = PaystackVerifyCache.lock_key(reference)
+        token = uuid.uuid4().hex
+        lock_timeout = settings.HTTP_CONNECT_TIMEOUT + settings.HTTP_READ_TIMEOUT + 1
+
+        if cache.add(lock_key, token, lock_timeout):
+            try:
+                data = PaystackHelper.verify_transaction(reference)
+                if data is not None:
+                    cache.set(result_key, data, settings.PAYSTACK_VERIFY_CACHE_TTL)
+                return data
+            except BudgetExhausted as e:
+                logger.info("Not verifying %s: %s; serving stored status", reference, e)
+                return None
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        return PaystackVerifyCache._wait_for_result(reference, result_key, lock_key)
+
+    @staticmethod
+    def _wait_for_result(reference, result_key, lock_key):
+        deadline = time.monotonic() + settings.PAYSTACK_VERIFY_WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(settings.PAYSTACK_VERIFY_POLL_INTERVAL)
+            cached = cache.get(result_key)
+            if cached is not None:
+                return cached
+            if cache.get(lock_key) is None:
+                break
+
+        cached = cache.get(result_key)
+        if cached is not None:
+            return cached
+
+        logger.info("No verify result for %s from the in-flight call; serving stored status", reference)
+        return None
+
+    @staticmethod
+    def get_or_verify_many(references, concurrency):
+        """{reference: verify data or None}, with at most concurrency verify calls in flight"""
+        def verify(reference):
+            try:
+                return PaystackVerifyCache.get_or_verify(reference)
+            finally:
+                # A database cache opens a connection in each pool thread
+                connections.close_all()
+
+        if not references:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(references))) as pool:
+            return dict(zip(references, pool.map(verify, references)))
@@ -1,28 +1,79 @@
+import hmac
+import json
 import uuid
+import hashlib
 import logging
+from datetime import timedelta
+from pathlib import Path
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny
-from django.shortcuts import redirect
-from django.db import transaction as db_transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
+from django.http import Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
-from drf_yasg.utils import swagger_auto_schema
-from drf_yasg import openapi
-from datetime import timedelta
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
 
-from .models import User, Transaction
+from .models import Transaction
 from .serializers import (
     UserSerializer, PaymentInitiateSerializer, 
-    TransactionStatusSerializer, TransactionSerializer
+    TransactionStatusSerializer,
+    TransactionListQuerySerializer, TransactionStatusBatchSerializer,
+    payment_initiated_data, transaction_list_data, transaction_status_data
 )
 from .utils import GoogleAuthHelper, PaystackHelper, ResponseHelper
+from . import idempotency, throttling
+from .authentication import issue_tokens, stream_token_for, UserTokenRefreshSerializer
+from .pagination import TransactionKeysetPagination
+from .resilience import CircuitOpenError, get_breaker
+from .routers import replica_reads
+from .verification import PaystackVerifyCache
+from .webhooks import enqueue_event
+from . import services
+from . import metrics
+from . import archive
 
 logger = logging.getLogger(__name__)
 
 
+def authentication_required_response():
+    return Response(
+        ResponseHelper.error_response(
+            message="Authentication required. Sign in via Google OAuth and send the access token as a Bearer token.",
+            status_code=status.HTTP_401_UNAUTHORIZED
+        ),
+        status=status.HTTP_401_UNAUTHORIZED
+    )
+
+
+def throttled_response(wait, message="Too many requests, please retry later"):
+    response = Response(
+        ResponseHelper.error_response(message=message, status_code=status.HTTP_429_TOO_MANY_REQUESTS),
+        status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
+    response['Retry-After'] = throttling.retry_after(wait)
+    return response
+
+
+def archive_unavailable_response():
+    return Response(
+        ResponseHelper.error_response(
+            message="Archived transaction data is temporarily unavailable",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+
+
 class GoogleAuthInitiateView(APIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     
     def get(self, request):
@@ -55,7 +106,7 @@ class GoogleAuthInitiateView(APIView):
                 return redirect(auth_url)
                 
         except Exception as e:
-            logger.error(f"Error generating Google auth URL: {str(e)}")
+            logger.error("Error generating Google auth URL: %s", e)
             return Response(
                 ResponseHelper.error_response(
                     message="Failed to generate authentication URL",
@@ -66,89 +117,16 @@ class GoogleAuthInitiateView(APIView):
 
 
 class GoogleAuthCallbackView(APIView):
+    authentication_classes = []
     permission_classes = [AllowAny]
     
-    @swagger_auto_schema(
-        operation_description="Handle Google OAuth callback",
-        manual_parameters=[
-            openapi.Parameter(
-                'code',
-                openapi.IN_QUERY,
-                description="Authorization code from Google",
-                type=openapi.TYPE_STRING,
-                required=True,
-                example="4/0ATX87lM_6Ah8I3HEywy75v2j_GIHrKnrVzToIv1x1tOzLM4dxh1m9OO3lpZ-mBCLyPxSyQ"
-            ),
-            openapi.Parameter(
-                'error',
-                openapi.IN_QUERY,
-                description="Error from Google (if any)",
-                type=openapi.TYPE_STRING,
-                required=False,
-                example="access_denied"
-            )
-        ],
-        responses={
-            200: openapi.Response(
-                description='User authentication successful',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'data': openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                'user_id': openapi.Schema(type=openapi.TYPE_STRING),
-                                'email': openapi.Schema(type=openapi.TYPE_STRING),
-                                'name': openapi.Schema(type=openapi.TYPE_STRING)
-                            }
-                        )
-                    }
-                )
-            ),
-            400: openapi.Response(
-                description='Missing code or Google error',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
-                    }
-                )
-            ),
-            401: openapi.Response(
-                description='Invalid or expired authorization code',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
-                    }
-                )
-            ),
-            500: openapi.Response(
-                description='Provider error or internal server error',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'errors': openapi.Schema(type=openapi.TYPE_OBJECT)
-                    }
-                )
-            )
-        }
-    )
     def get(self, request):
         """Handle Google OAuth callback"""
         code = request.GET.get('code')
         error = request.GET.get('error')
         
         if error:
-            logger.error(f"Google OAuth error: {error}")
+            logger.error("Google OAuth error: %s", error)
             return Response(
                 ResponseHelper.error_response(
                     message=f"Authentication failed: {error}"
@@ -178,7 +156,7 @@ class GoogleAuthCallbackView(APIView):
                 )
             
            
-            user_info = GoogleAuthHelper.get_user_info(token_data['access_token'])
+            user_info = GoogleAuthHelper.user_info_from_tokens(token_data)
             if not user_info:
                 logger.error("Failed to fetch user info from Google")
                 return Response(
@@ -189,18 +167,19 @@ class GoogleAuthCallbackView(APIView):
                 )
             
            
-            with db_transaction.atomic():
-                user, created = User.objects.update_or_create(
-                    google_id=user_info.get('sub'),
-                    defaults={
-                        'email': user_info.get('email'),
-                        'name': user_info.get('name'),
-                        'picture': user_info.get('picture'),
-                    }
+            user, created = services.upsert_google_user(user_info)
+            if not user.is_active:
+                logger.warning("Rejected sign-in for inactive user %s", user.id)
+                return Response(
+                    ResponseHelper.error_response(
+                        message="This account has been deactivated",
+                        status_code=status.HTTP_403_FORBIDDEN
+                    ),
+                    status=status.HTTP_403_FORBIDDEN
                 )
             
             action = "created" if created else "updated"
-            logger.info(f"User {action}: {user.email}")
+            logger.info("User %s: %s", action, user.email)
             
             
             return Response(
@@ -208,15 +187,25 @@ class GoogleAuthCallbackView(APIView):
                     data={
                         'user_id': str(user.id),
                         'email': user.email,
-                        'name': user.name
+                        'name': user.name,
+                        **issue_tokens(user)
                     },
                     message=f"User authentication successful"
                 ),
                 status=status.HTTP_200_OK
             )
             
+        except CircuitOpenError:
+            logger.warning("Google circuit open; rejecting callback")
+            return Response(
+                ResponseHelper.error_response(
+                    message="Google sign-in is temporarily unavailable, please try again shortly",
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+                ),
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         except Exception as e:
-            logger.error(f"Google authentication error: {str(e)}")
+            logger.error("Google authentication error: %s", e)
             return Response(
                 ResponseHelper.error_response(
                     message="Authentication failed",
@@ -228,46 +217,16 @@ class GoogleAuthCallbackView(APIView):
 
 class PaystackInitiatePaymentView(APIView):
     
-    @swagger_auto_schema(
-        operation_description="Initiate Paystack payment",
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            required=['amount'],
-            properties={
-                'amount': openapi.Schema(
-                    type=openapi.TYPE_INTEGER,
-                    description='Amount in Kobo (minimum 100 Kobo = 1 NGN)',
-                    minimum=100,
-                    example=5000
-                )
-            }
-        ),
-        responses={
-            201: openapi.Response(
-                description='Payment initialized successfully',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'data': openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                'reference': openapi.Schema(type=openapi.TYPE_STRING),
-                                'authorization_url': openapi.Schema(type=openapi.TYPE_STRING),
-                            }
-                        )
-                    }
-                )
-            ),
-            400: openapi.Response(description='Invalid input'),
-            402: openapi.Response(description='Payment initialization failed by Paystack'),
-            500: openapi.Response(description='Internal server error')
-        }
-    )
     def post(self, request):
         """Initiate Paystack payment"""
         
+        if not request.user.is_authenticated:
+            return authentication_required_response()
+        
+        wait = throttling.check(request, 'initiate', request.user.id)
+        if wait:
+            return throttled_response(wait)
+        
         serializer = PaymentInitiateSerializer(data=request.data)
         
         if not serializer.is_valid():
@@ -280,108 +239,56 @@ class PaystackInitiatePaymentView(APIView):
             )
         
         amount = serializer.validated_data['amount']
+        idempotency_record = None
         
         try:
             
-            user = None
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                user = request.user
+            user = request.user
             
-            if not user:
-                try:
-                    user = User.objects.first()
-                    if not user:
-                        return Response(
-                            ResponseHelper.error_response(
-                                message="No users found. Please authenticate first via Google OAuth."
-                            ),
-                            status=status.HTTP_401_UNAUTHORIZED
-                        )
-                except User.DoesNotExist:
+            idempotency_key = request.headers.get('Idempotency-Key')
+            if idempotency_key:
+                if len(idempotency_key) > 255:
                     return Response(
-                        ResponseHelper.error_response(
-                            message="User authentication required. Please authenticate first via Google OAuth."
-                        ),
-                        status=status.HTTP_401_UNAUTHORIZED
+                        ResponseHelper.error_response(message="Idempotency-Key must be at most 255 characters"),
+                        status=status.HTTP_400_BAD_REQUEST
                     )
-            
-            
-            reference = f"TXN_{user.id}_{int(timezone.now().timestamp())}"
-            
-            time_threshold = timezone.now() - timedelta(minutes=5)
-            existing_transaction = Transaction.objects.filter(
-                user=user,
-                amount=amount / 100,
-                status='pending',
-                created_at__gte=time_threshold
-            ).order_by('-created_at').first()
-
-            if existing_transaction:
-                logger.info(f"Duplicate transaction detected, returning existing: {existing_transaction.reference}")
-                return Response(
-                    ResponseHelper.success_response(
-                        data={
-                            'reference': existing_transaction.reference,
-                            'authorization_url': existing_transaction.authorization_url
-                        },
-                        message="Transaction already initiated"
-                    ),
-                    status=status.HTTP_200_OK
+                idempotency_record, replay = idempotency.begin(
+                    user.id, idempotency_key, idempotency.request_fingerprint(serializer.validated_data)
                 )
+                if replay:
+                    logger.info("Replaying stored response for Idempotency-Key %s", idempotency_key)
+                    return Response(replay.response_body, status=replay.response_status)
             
+            payload, status_code = self._initiate(user, amount)
             
-            paystack_response = PaystackHelper.initialize_transaction(
-                amount=amount,
-                email=user.email,
-                reference=reference,
-                metadata={
-                    'user_id': str(user.id),
-                    'user_name': user.name
-                }
-            )
+            if idempotency_record:
+                idempotency.finish(idempotency_record, status_code, payload)
             
-            if not paystack_response:
-                logger.error(f"Paystack initialization failed for user: {user.email}")
-                return Response(
-                    ResponseHelper.error_response(
-                        message="Payment initialization failed"
-                    ),
-                    status=status.HTTP_402_PAYMENT_REQUIRED
-                )
+            return Response(payload, status=status_code)
             
-            
-            transaction = Transaction.objects.create(
-                reference=reference,
-                user=user,
-                amount=amount / 100,  
-                paystack_reference=paystack_response.get('reference'),
-                authorization_url=paystack_response.get('authorization_url'),
-                status='pending',
-                metadata={
-                    'paystack_response': paystack_response,
-                    'user_data': {
-                        'email': user.email,
-                        'name': user.name
-                    }
-                }
+        except idempotency.IdempotencyKeyMismatch:
+            return Response(
+                ResponseHelper.error_response(
+                    message="Idempotency-Key was already used with a different request"
+                ),
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
             )
-            
-            logger.info(f"Payment initiated successfully: {reference}")
-            
-            
+        except idempotency.IdempotencyKeyInProgress:
             return Response(
-                ResponseHelper.success_response(
-                    data={
-                        'reference': transaction.reference,
-                        'authorization_url': transaction.authorization_url
-                    },
-                    message="Payment initialized successfully"
+                ResponseHelper.error_response(
+                    message="A request with this Idempotency-Key is still being processed"
                 ),
-                status=status.HTTP_201_CREATED
+                status=status.HTTP_409_CONFLICT
             )
-            
+        except throttling.BudgetExhausted as e:
+            if idempotency_record:
+                idempotency.release(idempotency_record)
+            logger.warning("Paystack outbound budget exhausted; rejecting initiation")
+            return throttled_response(e.retry_after, "Payment provider is busy, please retry shortly")
         except Exception as e:
-            logger.error(f"Payment initiation error: {str(e)}")
+            if idempotency_record:
+                idempotency.release(idempotency_record)
+            logger.error("Payment initiation error: %s", e)
             return Response(
                 ResponseHelper.error_response(
                     message="Payment initiation failed",
@@ -390,9 +297,48 @@ class PaystackInitiatePaymentView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _initiate(self, user, amount):
+        """Run the initiation itself; returns the response payload and status code"""
+        reference = services.generate_reference()
+        
+        existing_transaction = services.recent_pending_duplicates(user, amount).first()
 
-class PaystackWebhookView(APIView):
-    permission_classes = [AllowAny]
+        if existing_transaction:
+            logger.info("Duplicate transaction detected, returning existing: %s", existing_transaction.reference)
+            return ResponseHelper.success_response(
+                data=payment_initiated_data(existing_transaction),
+                message="Transaction already initiated"
+            ), status.HTTP_200_OK
+        
+        paystack_response = PaystackHelper.initialize_transaction(
+            amount=amount,
+            email=user.email,
+            reference=reference,
+            metadata=services.paystack_metadata(user)
+        )
+        
+        if not paystack_response:
+            logger.error("Paystack initialization failed for user: %s", user.email)
+            return ResponseHelper.error_response(
+                message="Payment initialization failed"
+            ), status.HTTP_402_PAYMENT_REQUIRED
+        
+        transaction = services.create_pending_transaction(user, amount, reference, paystack_response)
+        
+        logger.info("Payment initiated successfully: %s", reference)
+        
+        return ResponseHelper.success_response(
+            data=payment_initiated_data(transaction),
+            message="Payment initialized successfully"
+        ), status.HTTP_201_CREATED
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class PaystackWebhookView(View):
+    """
+    Plain Django view rather than an APIView: the signature is checked against the raw
+    body before anything is parsed, and valid bodies are decoded exactly once.
+    """
     
     def post(self, request):
         """Handle Paystack webhook notifications"""
@@ -401,67 +347,40 @@ class PaystackWebhookView(APIView):
         
         if not signature:
             logger.warning("Webhook received without signature")
-            return Response(
+            return JsonResponse(
                 ResponseHelper.error_response(message="Missing signature"),
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         
-        if not PaystackHelper.validate_webhook_signature(request.data, signature):
+        if not PaystackHelper.validate_webhook_signature(request.body, signature):
             logger.warning("Invalid webhook signature")
-            return Response(
+            return JsonResponse(
                 ResponseHelper.error_response(message="Invalid signature"),
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         try:
-            event = request.data.get('event')
-            data = request.data.get('data', {})
-            
-            logger.info(f"Webhook received: {event}")
-            
-            if event == 'charge.success':
-                reference = data.get('reference')
-                
-                
-                try:
-                    transaction = Transaction.objects.get(paystack_reference=reference)
-                    
-                    
-                    transaction.status = 'success'
-                    transaction.paid_at = timezone.now()
-                    transaction.metadata['webhook_data'] = data
-                    transaction.save()
-                    
-                    logger.info(f"Transaction {reference} marked as successful")
-                    
-                except Transaction.DoesNotExist:
-                    logger.warning(f"Transaction not found for webhook reference: {reference}")
-                    
-                    pass
-                    
-            elif event in ['charge.failed', 'charge.abandoned']:
-                reference = data.get('reference')
-                
-                try:
-                    transaction = Transaction.objects.get(paystack_reference=reference)
-                    transaction.status = 'failed' if event == 'charge.failed' else 'abandoned'
-                    transaction.metadata['webhook_data'] = data
-                    transaction.save()
-                    
-                    logger.info(f"Transaction {reference} marked as {transaction.status}")
-                    
-                except Transaction.DoesNotExist:
-                    logger.warning(f"Transaction not found for failed webhook: {reference}")
+            payload = json.loads(request.body)
+        except ValueError:
+            logger.warning("Webhook body is not valid JSON")
+            return JsonResponse(
+                ResponseHelper.error_response(message="Invalid payload"),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            inbox_event = enqueue_event(payload)
+            logger.info("Webhook queued: %s (%s)", inbox_event.event, inbox_event.reference)
             
-            return Response(
+            return JsonResponse(
                 {"status": True}, 
                 status=status.HTTP_200_OK
             )
             
         except Exception as e:
-            logger.error(f"Webhook processing error: {str(e)}")
-            return Response(
+            logger.error("Webhook processing error: %s", e)
+            return JsonResponse(
                 ResponseHelper.error_response(
                     message="Webhook processing failed",
                     errors={'detail': str(e)}
@@ -472,167 +391,374 @@ class PaystackWebhookView(APIView):
 
 class TransactionStatusView(APIView):
     
-    @swagger_auto_schema(
-        operation_description="Check transaction status",
-        manual_parameters=[
-            openapi.Parameter(
-                'reference',
-                openapi.IN_PATH,
-                description="Transaction reference",
-                type=openapi.TYPE_STRING,
-                required=True,
-                example="TXN_68c4808d-a9a1-4708-b8a2-cbfa7911c0e3_1733650123"
-            ),
-            openapi.Parameter(
-                'refresh',
-                openapi.IN_QUERY,
-                description="Force refresh from Paystack (true/false)",
-                type=openapi.TYPE_BOOLEAN,
-                required=False,
-                default=False
-            )
-        ],
-        responses={
-            200: openapi.Response(
-                description='Transaction status retrieved',
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        'success': openapi.Schema(type=openapi.TYPE_BOOLEAN),
-                        'message': openapi.Schema(type=openapi.TYPE_STRING),
-                        'data': openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                'reference': openapi.Schema(type=openapi.TYPE_STRING),
-                                'status': openapi.Schema(
-                                    type=openapi.TYPE_STRING,
-                                    enum=['pending', 'success', 'failed', 'abandoned']
-                                ),
-                                'amount': openapi.Schema(type=openapi.TYPE_INTEGER),
-                                'paid_at': openapi.Schema(
-                                    type=openapi.TYPE_STRING,
-                                    format='date-time',
-                                    nullable=True
-                                )
-                            }
-                        )
-                    }
-                )
-            ),
-            404: openapi.Response(description='Transaction not found'),
-            500: openapi.Response(description='Internal server error')
-        }
-    )
     def get(self, request, reference):
         """Check transaction status"""
+        if not request.user.is_authenticated:
+            return authentication_required_response()
+        
         refresh = request.GET.get('refresh', 'false').lower() == 'true'
+        if refresh:
+            wait = throttling.check(request, 'status_refresh', request.user.id)
+            if wait:
+                return throttled_response(wait)
         
         try:
            
-            transaction = Transaction.objects.get(reference=reference)
-            
-            if refresh or transaction.status == 'pending':
+            # Scoped to the caller: other users' references look exactly like unknown ones
+            lookup = Transaction.objects.filter(reference=reference, user_id=request.user.id)
+            with replica_reads(request.user.id) as alias:
+                transaction = lookup.first()
+            if transaction is None and alias != DEFAULT_DB_ALIAS:
+                # The replica may not have caught up with a transaction created moments ago
+                transaction = lookup.first()
+            if transaction is None:
+                return self._archived_status(reference, request.user.id)
+            
+            needs_verify = refresh or transaction.status == 'pending'
+            if needs_verify and get_breaker('paystack').is_open:
+                # Paystack is failing; answer from the database rather than queue behind doomed calls
+                logger.info("Paystack circuit open; serving stored status for %s", reference)
+                needs_verify = False
+            
+            if needs_verify:
+                if transaction._state.db != DEFAULT_DB_ALIAS:
+                    # Decide and write against the primary's row, not a possibly lagging copy
+                    transaction = lookup.get()
                
-                paystack_data = PaystackHelper.verify_transaction(
-                    transaction.paystack_reference or transaction.reference
+                paystack_data = PaystackVerifyCache.get_or_verify(
+                    transaction.paystack_reference or transaction.reference,
+                    refresh=refresh
                 )
                 
                 if paystack_data:
                    
                     paystack_status = paystack_data.get('status')
+                    stored_status = transaction.status
                     
                     if paystack_status == 'success' and transaction.status != 'success':
                         transaction.status = 'success'
                         transaction.paid_at = timezone.now()
-                        transaction.metadata['verified_at'] = timezone.now().isoformat()
-                        transaction.save()
-                        logger.info(f"Transaction {reference} verified as successful")
                     
                     elif paystack_status in ['failed', 'abandoned'] and transaction.status not in ['failed', 'abandoned']:
                         transaction.status = 'failed' if paystack_status == 'failed' else 'abandoned'
-                        transaction.save()
-                        logger.info(f"Transaction {reference} verified as {transaction.status}")
+                    
+                    if transaction.status != stored_status:
+                        if services.record_verification(transaction, paystack_data, expected_status=stored_status):
+                            logger.info("Transaction %s verified as %s", reference, transaction.status)
+                        else:
+                            # A webhook settled it while we were asking Paystack; report what it wrote
+                            transaction.refresh_from_db()
             
             
             return Response(
                 ResponseHelper.success_response(
-                    data={
-                        'reference': transaction.reference,
-                        'status': transaction.status,
-                        'amount': int(transaction.amount * 100), 
-                        'paid_at': transaction.paid_at.isoformat() if transaction.paid_at else None
-                    },
+                    data=transaction_status_data(transaction),
                     message="Transaction status retrieved"
                 ),
                 status=status.HTTP_200_OK
             )
             
-        except Transaction.DoesNotExist:
-            logger.warning(f"Transaction not found: {reference}")
+        except Exception as e:
+            logger.error("Transaction status check error: %s", e)
+            return Response(
+                ResponseHelper.error_response(
+                    message="Failed to retrieve transaction status",
+                    errors={'detail': str(e)}
+                ),
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    @staticmethod
+    def _archived_status(reference, user_id):
+        """Settled transactions past ARCHIVE_AFTER_DAYS live in the archive, never changing again"""
+        try:
+            record = archive.find_archived(reference, user_id)
+        except archive.ArchiveReadError as e:
+            logger.error("Archived transaction %s unreadable: %s", reference, e)
+            return archive_unavailable_response()
+        
+        if record is None:
+            logger.warning("Transaction not found: %s", reference)
             return Response(
                 ResponseHelper.error_response(
                     message="Transaction not found"
                 ),
                 status=status.HTTP_404_NOT_FOUND
             )
+        return Response(
+            ResponseHelper.success_response(
+                data={
+                    'reference': record['reference'],
+                    'status': record['status'],
+                    'amount': archive.amount_in_kobo(record),
+                    'paid_at': record['paid_at']
+                },
+                message="Transaction status retrieved"
+            ),
+            status=status.HTTP_200_OK
+        )
+
+
+class TransactionStatusBatchView(APIView):
+    """Statuses of many of the authenticated user's transactions in one request"""
+    
+    def post(self, request):
+        if not request.user.is_authenticated:
+            return authentication_required_response()
+        
+        serializer = TransactionStatusBatchSerializer(data=request.data)
+        
+        if not serializer.is_valid():
+            return Response(
+                ResponseHelper.error_response(message="Invalid input", errors=serializer.errors),
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        references = serializer.validated_data['references']
+        
+        try:
+            # One IN query, scoped to the caller
+            lookup = (
+                Transaction.objects.filter(reference__in=references, user_id=request.user.id)
+                .only('id', 'user_id', 'reference', 'paystack_reference', 'status', 'paid_at', 'updated_at')
+            )
+            with replica_reads(request.user.id) as alias:
+                transactions = {txn.reference: txn for txn in lookup}
+            if len(transactions) < len(references) and alias != DEFAULT_DB_ALIAS:
+                # The replica may not have caught up with transactions created moments ago
+                transactions.update(
+                    (txn.reference, txn) for txn in lookup.exclude(reference__in=list(transactions))
+                )
+            
+            self._verify_stale(lookup, transactions)
+            
+            statuses = {reference: txn.status for reference, txn in transactions.items()}
+            missing = [reference for reference in references if reference not in statuses]
+            if missing:
+                # Settled transactions past ARCHIVE_AFTER_DAYS live in the archive
+                try:
+                    archived = archive.find_archived_many(missing, request.user.id)
+                except archive.ArchiveReadError as e:
+                    logger.error("Archived transactions unreadable: %s", e)
+                    return archive_unavailable_response()
+                statuses.update((reference, record['status']) for reference, record in archived.items())
+            
+            return Response(
+                ResponseHelper.success_response(
+                    data={
+                        'statuses': {reference: statuses[reference] for reference in references if reference in statuses},
+                        'not_found': [reference for reference in references if reference not in statuses]
+                    },
+                    message="Transaction statuses retrieved"
+                ),
+                status=status.HTTP_200_OK
+            )
+            
         except Exception as e:
-            logger.error(f"Transaction status check error: {str(e)}")
+            logger.error("Batch transaction status error: %s", e)
             return Response(
                 ResponseHelper.error_response(
-                    message="Failed to retrieve transaction status",
+                    message="Failed to retrieve transaction statuses",
                     errors={'detail': str(e)}
                 ),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def _verify_stale(lookup, transactions):
+        """Verify the oldest stale pending transactions with Paystack and record their changes"""
+        cutoff = timezone.now() - timedelta(seconds=settings.TRANSACTION_STATUS_BATCH_STALE_SECONDS)
+        stale = sorted(
+            (txn for txn in transactions.values() if txn.status == 'pending' and txn.updated_at <= cutoff),
+            key=lambda txn: txn.updated_at
+        )[:settings.TRANSACTION_STATUS_BATCH_MAX_VERIFY]
+        if not stale:
+            return
+        if get_breaker('paystack').is_open:
+            logger.info("Paystack circuit open; serving stored statuses for %s transactions", len(stale))
+            return
+        
+        if any(txn._state.db != DEFAULT_DB_ALIAS for txn in stale):
+            # Decide and write against the primary's rows, not possibly lagging copies
+            primary = lookup.using(DEFAULT_DB_ALIAS).in_bulk([txn.pk for txn in stale])
+            stale = [primary[txn.pk] for txn in stale if txn.pk in primary and primary[txn.pk].status == 'pending']
+        
+        results = PaystackVerifyCache.get_or_verify_many(
+            [txn.paystack_reference or txn.reference for txn in stale],
+            settings.TRANSACTION_STATUS_BATCH_VERIFY_CONCURRENCY
+        )
+        
+        verified = []
+        for txn in stale:
+            paystack_data = results.get(txn.paystack_reference or txn.reference)
+            paystack_status = paystack_data.get('status') if paystack_data else None
+            if paystack_status == 'success':
+                txn.status = 'success'
+                txn.paid_at = timezone.now()
+            elif paystack_status in ['failed', 'abandoned']:
+                txn.status = paystack_status
+            else:
+                continue
+            verified.append((txn, paystack_data))
+        
+        moved = services.record_verifications(verified)
+        for txn in moved:
+            transactions[txn.reference] = txn
+        lost = [txn.pk for txn, _ in verified if txn not in moved]
+        if lost:
+            # Settled by a webhook while we were asking Paystack; report what it wrote
+            for txn in lookup.using(DEFAULT_DB_ALIAS).filter(pk__in=lost):
+                transactions[txn.reference] = txn
+        if moved:
+            logger.info("Batch status verified %s of %s stale transactions", len(moved), len(stale))
+
+
+class TransactionStatusStreamTokenView(APIView):
+    """Short-lived token for opening a status stream from EventSource, which cannot send headers"""
+    
+    def post(self, request, reference):
+        if not request.user.is_authenticated:
+            return authentication_required_response()
+        
+        return Response(
+            ResponseHelper.success_response(
+                data={
+                    'stream_token': stream_token_for(request.user.id, reference),
+                    'expires_in': settings.STATUS_STREAM_TOKEN_TTL
+                },
+                message="Stream token issued"
+            ),
+            status=status.HTTP_200_OK
+        )
 
 
 class TransactionListView(APIView):
-    """List transactions for a user (bonus endpoint)"""
+    """List the authenticated user's transactions, newest first, with keyset pagination"""
     
-    @swagger_auto_schema(
-        operation_description="List transactions for a user",
-        manual_parameters=[
-            openapi.Parameter(
-                'user_id',
-                openapi.IN_QUERY,
-                description="User ID",
-                type=openapi.TYPE_STRING,
-                required=True,
-                example="68c4808d-a9a1-4708-b8a2-cbfa7911c0e3"
-            )
-        ],
-        responses={
-            200: openapi.Response(description='Transactions retrieved successfully'),
-            400: openapi.Response(description='user_id is required'),
-            500: openapi.Response(description='Internal server error')
-        }
-    )
     def get(self, request):
-        user_id = request.GET.get('user_id')
+        if not request.user.is_authenticated:
+            return authentication_required_response()
+        
+        query = TransactionListQuerySerializer(data=request.GET)
         
-        if not user_id:
+        if not query.is_valid():
             return Response(
-                ResponseHelper.error_response(message="user_id is required"),
+                ResponseHelper.error_response(message="Invalid query parameters", errors=query.errors),
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        filters = query.validated_data
+        
         try:
-            transactions = Transaction.objects.filter(user_id=user_id).order_by('-created_at')
-            serializer = TransactionSerializer(transactions, many=True)
+            transactions = (
+                Transaction.objects.filter(user_id=request.user.id)
+                .select_related('user')
+            )
+            if 'status' in filters:
+                transactions = transactions.filter(status=filters['status'])
+            if 'created_after' in filters:
+                transactions = transactions.filter(created_at__gte=filters['created_after'])
+            if 'created_before' in filters:
+                transactions = transactions.filter(created_at__lt=filters['created_before'])
+            
+            paginator = TransactionKeysetPagination()
+            with replica_reads(request.user.id):
+                page = paginator.paginate_queryset(transactions, request, view=self)
             
             return Response(
                 ResponseHelper.success_response(
-                    data={'transactions': serializer.data},
+                    data={
+                        'transactions': transaction_list_data(page),
+                        'next_cursor': paginator.get_next_cursor()
+                    },
                     message="Transactions retrieved successfully"
                 ),
                 status=status.HTTP_200_OK
             )
             
+        except ValidationError as e:
+            return Response(
+                ResponseHelper.error_response(message="Invalid query parameters", errors=e.detail),
+                status=status.HTTP_400_BAD_REQUEST
+            )
         except Exception as e:
-            logger.error(f"Error listing transactions: {str(e)}")
+            logger.error("Error listing transactions: %s", e)
             return Response(
                 ResponseHelper.error_response(
                     message="Failed to retrieve transactions"
                 ),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+
+class TokenRefreshView(BaseTokenRefreshView):
+    """Exchange a refresh token for a new access token"""
+    authentication_classes = []
+    serializer_class = UserTokenRefreshSerializer
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint aggregating every worker's metrics"""
+
+    def get(self, request):
+        token = settings.METRICS_TOKEN
+        if token:
+            supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+            if not hmac.compare_digest(supplied, token):
+                return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+
+        return HttpResponse(
+            metrics.render_prometheus(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
+# format -> (body, ETag); filled on first use in each process
+_openapi_schemas = {}
+
+OPENAPI_CONTENT_TYPES = {
+    'json': 'application/json',
+    'yaml': 'application/yaml; charset=utf-8',
+}
+
+
+def load_openapi_schema(fmt):
+    """The generated schema file's bytes, generating it in-process (importing drf_yasg) if it is missing"""
+    cached = _openapi_schemas.get(fmt)
+    if cached is None:
+        path = Path(settings.OPENAPI_SCHEMA_DIR) / f'openapi.{fmt}'
+        try:
+            body = path.read_bytes()
+        except FileNotFoundError:
+            logger.warning("%s not found, generating the schema in-process; run generate_openapi at build time", path)
+            from .api_docs import render_schema
+            body = render_schema(fmt)
+        cached = _openapi_schemas[fmt] = (body, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+    return cached
+
+
+class OpenAPISchemaView(View):
+    """Serves the pre-generated OpenAPI schema (swagger.json / swagger.yaml)"""
+
+    def get(self, request, format):
+        fmt = format.lstrip('.')
+        if fmt not in OPENAPI_CONTENT_TYPES:
+            raise Http404
+        body, etag = load_openapi_schema(fmt)
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=OPENAPI_CONTENT_TYPES[fmt])
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
+
+
+class APIDocsView(View):
+    """Swagger UI or ReDoc page for the pre-generated schema; the UI assets are drf_yasg's static files"""
+    template_name = None
+
+    def get(self, request):
+        return render(request, self.template_name, {
+            'schema_url': reverse('schema-json', kwargs={'format': '.json'}),
+        })
@@ -0,0 +1,152 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Transaction, TransactionEvent, WebhookEvent
+from .notifications import publish_statuses
+from .routers import pin_to_primary
+
+logger = logging.getLogger(__name__)
+
+EVENT_STATUSES = {
+    'charge.success': 'success',
+    'charge.failed': 'failed',
+    'charge.abandoned': 'abandoned',
+}
+
+
+def enqueue_event(payload):
+    """Append a verified webhook payload to the inbox"""
+    data = payload.get('data') or {}
+    return WebhookEvent.objects.create(
+        event=payload.get('event') or '',
+        reference=data.get('reference') or '',
+        payload=payload,
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.WEBHOOK_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+
+
+def _schedule_retry(event, error, now):
+    event.attempts += 1
+    event.last_error = error
+    if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        event.status = 'dead'
+        logger.error("Webhook event %s (%s %s) dead-lettered: %s", event.id, event.event, event.reference, error)
+    else:
+        event.available_at = now + retry_delay(event.attempts)
+        logger.warning("Webhook event %s will be retried (attempt %s): %s", event.id, event.attempts, error)
+
+
+def _settle(transactions, now):
+    """One conditional UPDATE per new status; rows that have already succeeded are left alone"""
+    by_status = {}
+    for txn in transactions:
+        by_status.setdefault(txn.status, []).append(txn)
+    for new_status, group in by_status.items():
+        paid_at = F('paid_at')
+        if new_status == 'success':
+            paid_at = Case(*(When(pk=txn.pk, then=Value(txn.paid_at)) for txn in group), default=F('paid_at'))
+        Transaction.objects.filter(pk__in=[txn.pk for txn in group]).exclude(status='success').update(
+            status=new_status, paid_at=paid_at, updated_at=now
+        )
+
+
+def process_inbox_batch(batch_size=None):
+    """Apply one batch of pending inbox events to their transactions; returns the number of events handled"""
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    now = timezone.now()
+    events = []
+
+    try:
+        with db_transaction.atomic():
+            events = list(
+                WebhookEvent.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', available_at__lte=now)
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                return 0
+
+            references = {event.reference for event in events if event.event in EVENT_STATUSES}
+            # Locked until commit, so the status/reconcile paths cannot settle them under us
+            transactions = {
+                txn.paystack_reference: txn
+                for txn in Transaction.objects.select_for_update().filter(paystack_reference__in=references)
+            }
+
+            changed = {}
+            transaction_events = []
+            for event in events:
+                new_status = EVENT_STATUSES.get(event.event)
+                if new_status is None:
+                    event.status = 'processed'
+                    event.processed_at = now
+                    continue
+
+                txn = transactions.get(event.reference)
+                if txn is None:
+                    _schedule_retry(event, f"Transaction not found for reference {event.reference}", now)
+                    continue
+
+                transaction_events.append(TransactionEvent.build(txn, 'webhook', event.payload.get('data') or {}))
+                # Retries and dead-letter replays arrive out of order. Success is final, so a late
+                # charge.failed cannot undo it, but a charge.success still settles an abandoned or
+                # failed transaction (the customer retried and paid)
+                if txn.status != 'success' and txn.status != new_status:
+                    txn.status = new_status
+                    if new_status == 'success':
+                        txn.paid_at = event.received_at
+                    txn.updated_at = now
+                    changed[txn.pk] = txn
+                elif txn.status != new_status:
+                    logger.warning(
+                        "Ignoring %s for %s: transaction is already %s", event.event, event.reference, txn.status
+                    )
+
+                event.attempts += 1
+                event.status = 'processed'
+                event.processed_at = now
+
+            if changed:
+                _settle(changed.values(), now)
+                publish_statuses((txn.reference, txn.status) for txn in changed.values())
+            if transaction_events:
+                TransactionEvent.objects.bulk_create(transaction_events)
+            WebhookEvent.objects.bulk_update(
+                events, ['status', 'attempts', 'last_error', 'available_at', 'processed_at']
+            )
+
+    except Exception as e:
+        logger.error("Webhook batch failed, rescheduling: %s", e)
+        if not events:
+            return 0
+        with db_transaction.atomic():
+            events = list(WebhookEvent.objects.filter(pk__in=[event.pk for event in events]))
+            for event in events:
+                _schedule_retry(event, str(e), now)
+            WebhookEvent.objects.bulk_update(events, ['status', 'attempts', 'last_error', 'available_at'])
+        return len(events)
+
+    pin_to_primary(*{txn.user_id for txn in changed.values()})
+    logger.info("Processed %s webhook events, updated %s transactions", len(events), len(changed))
+    return len(events)
+
+
+def drain_inbox(batch_size=None, max_batches=None):
+    """Process batches until the inbox has nothing due; returns the number of events handled"""
+    batch_size = batch_size or settings.WEBHOOK_BATCH_SIZE
+    max_batches = max_batches or settings.WEBHOOK_MAX_BATCHES_PER_RUN
+    total = 0
+    for _ in range(max_batches):
+        handled = process_inbox_batch(batch_size)
+        total += handled
+        if handled < batch_size:
+            break
+    return total
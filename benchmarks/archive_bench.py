@@ -0,0 +1,159 @@
+"""
+Hot-table query latency before and after archiving settled transactions.
+
+Seeds a throwaway SQLite database with a mix of recent and old transactions, times the queries
+the API and jobs run against `transactions`, archives everything settled past the cutoff and
+times them again (plus status lookups served from the archive):
+
+    python benchmarks/archive_bench.py --users 100 --transactions 100000 --recent 0.1 --output archive.json
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payment_auth_project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('LOG_FILE', '')
+
+import django
+from django.conf import settings
+
+from common import summarize, print_report, save_results
+
+SEED_BATCH = 5000
+ARCHIVE_AFTER_DAYS = 180
+
+
+def configure(workdir):
+    settings.DATABASES['default']['NAME'] = str(workdir / 'bench.sqlite3')
+    settings.ARCHIVE_DIR = str(workdir / 'archive')
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+
+
+def seed(users, transactions, recent_fraction):
+    """Insert users and transactions (each with an initialize event); returns (recent, old) (reference, user_id) pairs"""
+    from django.utils import timezone
+    from auth_payment.models import User, Transaction, TransactionEvent
+
+    people = User.objects.bulk_create([
+        User(google_id=f'bench-{i}', email=f'bench-{i}@bench.test', name=f'Bench {i}') for i in range(users)
+    ])
+
+    # Let the seed set its own timestamps
+    for name in ('created_at', 'updated_at'):
+        field = Transaction._meta.get_field(name)
+        field.auto_now = field.auto_now_add = False
+
+    now = timezone.now()
+    recent, old = [], []
+    for start in range(0, transactions, SEED_BATCH):
+        batch = []
+        for i in range(start, min(start + SEED_BATCH, transactions)):
+            user = people[i % users]
+            is_recent = random.random() < recent_fraction
+            if is_recent:
+                created = now - timedelta(minutes=random.uniform(20, 30 * 24 * 60))
+                status = random.choice(('pending', 'success', 'success', 'failed'))
+            else:
+                created = now - timedelta(days=random.uniform(ARCHIVE_AFTER_DAYS + 1, 3 * 365))
+                status = random.choice(('success', 'success', 'success', 'failed', 'abandoned'))
+            reference = f'BENCH_{i:09d}'
+            batch.append(Transaction(
+                reference=reference, user=user, amount=random.randint(100, 500000), status=status,
+                paystack_reference=reference, authorization_url=f'https://checkout.paystack.test/{reference}',
+                paid_at=created if status == 'success' else None, created_at=created, updated_at=created,
+            ))
+            (recent if is_recent else old).append((reference, user.id))
+        Transaction.objects.bulk_create(batch)
+        TransactionEvent.objects.bulk_create([
+            TransactionEvent.build(txn, 'initialize', {
+                'authorization_url': txn.authorization_url,
+                'access_code': f'access_{txn.reference}',
+                'reference': txn.reference,
+            })
+            for txn in batch
+        ])
+    return recent, old
+
+
+def time_queries(iterations, recent):
+    from auth_payment.models import Transaction
+    from auth_payment.reconciliation import stale_pending_transactions
+
+    user_ids = list({user_id for _, user_id in recent})
+    queries = {
+        'status_lookup': lambda: Transaction.objects.filter(
+            reference=(pick := random.choice(recent))[0], user_id=pick[1]).first(),
+        'user_list': lambda: list(
+            Transaction.objects.filter(user_id=random.choice(user_ids)).order_by('-created_at', '-id')[:50]),
+        'user_list_status': lambda: list(
+            Transaction.objects.filter(user_id=random.choice(user_ids), status='success')
+            .order_by('-created_at', '-id')[:50]),
+        'pending_scan': lambda: list(stale_pending_transactions(15)[:200]),
+        'status_count': lambda: Transaction.objects.filter(status='success').count(),
+    }
+    return [run_query(name, query, iterations) for name, query in queries.items()]
+
+
+def run_query(name, query, iterations):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        query()
+        latencies.append(time.perf_counter() - t)
+    return summarize(name, latencies, [200] * iterations, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--recent', type=float, default=0.1, help='Fraction of transactions inside the archive cutoff')
+    parser.add_argument('--iterations', type=int, default=300, help='Timed runs of each query')
+    parser.add_argument('--output', help='Write before/after results as JSON to this file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure(Path(tmp))
+        from auth_payment.archive import archive_transactions, find_archived
+        from auth_payment.models import Transaction
+
+        seed_start = time.perf_counter()
+        recent, old = seed(args.users, args.transactions, args.recent)
+        print(f"Seeded {len(recent)} recent and {len(old)} old transactions in {time.perf_counter() - seed_start:.1f}s")
+        if not recent:
+            sys.exit("No recent transactions to query; raise --recent or --transactions")
+
+        before = time_queries(args.iterations, recent)
+
+        report = archive_transactions(older_than_days=ARCHIVE_AFTER_DAYS)
+        print(report.summary())
+        print(f"{Transaction.objects.count()} transactions left in the hot table")
+
+        after = time_queries(args.iterations, recent)
+        if old:
+            after.append(run_query(
+                'archived_lookup', lambda: find_archived(*random.choice(old)), args.iterations
+            ))
+
+        print("\nBefore archiving")
+        print_report(before)
+        print("\nAfter archiving (deltas against before)")
+        print_report(after, before)
+
+        if args.output:
+            save_results(args.output, {'before': before, 'after': after})
+
+
+if __name__ == '__main__':
+    main()
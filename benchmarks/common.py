@@ -0,0 +1,66 @@
+"""Shared result reporting for the benchmark scripts."""
+import json
+import math
+from collections import Counter
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(name, latencies, statuses, elapsed):
+    """latencies in seconds, statuses a list of status codes (or 'error')"""
+    ordered = sorted(latencies)
+    counts = Counter(str(s) for s in statuses)
+    ok = sum(n for code, n in counts.items() if code.isdigit() and int(code) < 400)
+    return {
+        'name': name,
+        'requests': len(ordered),
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        'success_ratio': round(ok / len(ordered), 4) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'statuses': dict(sorted(counts.items())),
+    }
+
+
+def print_report(results, baseline=None):
+    baseline = {r['name']: r for r in (baseline or [])}
+    header = f"{'scenario':<18}{'reqs':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ok':>8}  statuses"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        print(
+            f"{r['name']:<18}{r['requests']:>8}{r['throughput_rps']:>10}{r['p50_ms']:>10}"
+            f"{r['p95_ms']:>10}{r['p99_ms']:>10}{r['success_ratio']:>8.0%}  {r['statuses']}"
+        )
+        base = baseline.get(r['name'])
+        if base:
+            print(
+                f"{'  vs baseline':<26}{_delta(r['throughput_rps'], base['throughput_rps']):>10}"
+                f"{_delta(r['p50_ms'], base['p50_ms']):>10}{_delta(r['p95_ms'], base['p95_ms']):>10}"
+                f"{_delta(r['p99_ms'], base['p99_ms']):>10}"
+            )
+
+
+def _delta(current, base):
+    if not base:
+        return 'n/a'
+    return f"{(current - base) / base:+.0%}"
+
+
+def save_results(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
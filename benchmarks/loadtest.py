@@ -0,0 +1,172 @@
+"""
+Drive the API at a fixed concurrency and report throughput and latency percentiles.
+
+Start the provider stubs (benchmarks/stubs.py) and the app pointed at them, then:
+
+    python benchmarks/loadtest.py --base-url http://127.0.0.1:8001 --concurrency 32 --requests 2000 \
+        --webhook-secret whsec --output results.json
+
+Use --compare results.json on a later run to print the change against a saved baseline.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import threading
+
+import requests
+
+from common import summarize, print_report, save_results, load_results
+from stubs import sign, charge_success_event
+
+SCENARIOS = ('callback', 'initiate', 'status', 'webhook')
+
+
+class LoadTest:
+    def __init__(self, base_url, concurrency, requests_per_scenario, duration=None, users=50,
+                 webhook_secret='', timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.concurrency = concurrency
+        self.requests_per_scenario = requests_per_scenario
+        self.duration = duration
+        self.users = users
+        self.webhook_secret = webhook_secret
+        self.timeout = timeout
+        self.references = []
+        self._tokens = {}
+        self._tokens_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    # Scenario requests; each returns the response.
+
+    def callback(self, i):
+        return self.session.get(
+            f'{self.base_url}/auth/google/callback', params={'code': f'bench-{i % self.users}'}, timeout=self.timeout
+        )
+
+    def auth_headers(self, user):
+        """Bearer header for bench user number `user`, logging in on first use"""
+        token = self._tokens.get(user)
+        if token is None:
+            response = self.callback(user)
+            response.raise_for_status()
+            token = response.json()['data']['access_token']
+            with self._tokens_lock:
+                self._tokens[user] = token
+        return {'Authorization': f'Bearer {token}'}
+
+    def initiate(self, i):
+        # Vary the amount so requests are not short-circuited by duplicate detection
+        return self.session.post(
+            f'{self.base_url}/payments/paystack/initiate',
+            json={'amount': 10000 + i},
+            headers=self.auth_headers(i % self.users),
+            timeout=self.timeout,
+        )
+
+    def status(self, i):
+        reference, user = random.choice(self.references)
+        return self.session.get(
+            f'{self.base_url}/payments/{reference}/status', headers=self.auth_headers(user), timeout=self.timeout
+        )
+
+    def webhook(self, i):
+        reference, _ = random.choice(self.references)
+        body = json.dumps(charge_success_event(reference, 10000)).encode('utf-8')
+        return self.session.post(
+            f'{self.base_url}/payments/paystack/webhook',
+            data=body,
+            headers={'Content-Type': 'application/json', 'X-Paystack-Signature': sign(self.webhook_secret, body)},
+            timeout=self.timeout,
+        )
+
+    def seed(self, count):
+        """Create transactions, spread over the bench users, for the status and webhook scenarios"""
+        for i in range(count):
+            user = i % self.users
+            response = self.session.post(
+                f'{self.base_url}/payments/paystack/initiate',
+                json={'amount': 500000 + i},
+                headers=self.auth_headers(user),
+                timeout=self.timeout,
+            )
+            if response.status_code < 300:
+                self.references.append((response.json()['data']['reference'], user))
+        return len(self.references)
+
+    def run(self, name):
+        send = getattr(self, name)
+        counter = itertools.count()
+        lock = threading.Lock()
+        latencies, statuses = [], []
+        deadline = time.monotonic() + self.duration if self.duration else None
+
+        def worker():
+            while True:
+                i = next(counter)
+                if i >= self.requests_per_scenario or (deadline and time.monotonic() >= deadline):
+                    return
+                start = time.perf_counter()
+                try:
+                    status = send(i).status_code
+                except requests.RequestException:
+                    status = 'error'
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    statuses.append(status)
+
+        threads = [threading.Thread(target=worker) for _ in range(self.concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return summarize(name, latencies, statuses, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://127.0.0.1:8001')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='Scenario to run (repeatable); defaults to all of them in order')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=1000, help='Requests per scenario')
+    parser.add_argument('--duration', type=float, help='Stop each scenario after this many seconds')
+    parser.add_argument('--users', type=int, default=50, help='Distinct Google accounts to log in and pay as')
+    parser.add_argument('--seed', type=int, default=20, help='Transactions created for the status/webhook scenarios')
+    parser.add_argument('--webhook-secret', default='', help='PAYSTACK_WEBHOOK_SECRET configured on the app')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    args = parser.parse_args()
+
+    test = LoadTest(args.base_url, args.concurrency, args.requests, args.duration, args.users, args.webhook_secret)
+    scenarios = args.scenario or list(SCENARIOS)
+
+    if {'status', 'webhook'} & set(scenarios):
+        if not test.seed(args.seed):
+            sys.exit("Could not create any transactions to poll; is the app pointed at the stubs?")
+        print(f"Seeded {len(test.references)} transactions")
+
+    results = []
+    for name in scenarios:
+        if name == 'webhook' and not args.webhook_secret:
+            print("Skipping webhook scenario: --webhook-secret not given")
+            continue
+        results.append(test.run(name))
+
+    print_report(results, load_results(args.compare) if args.compare else None)
+    if args.output:
+        save_results(args.output, results)
+
+
+if __name__ == '__main__':
+    main()
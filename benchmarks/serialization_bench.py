@@ -0,0 +1,162 @@
+"""
+Response serialization cost: DRF's reflective serializers + JSONRenderer against the hand-written
+serializers + ORJSONRenderer, per 1k transactions.
+
+Builds in-memory transactions (no database), checks both paths render byte-identical bodies for
+the listing, status and initiate responses, then times each:
+
+    python benchmarks/serialization_bench.py --transactions 1000 --iterations 200 --output serialization.json
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payment_auth_project.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ.setdefault('LOG_FILE', '')
+
+import django
+
+django.setup()
+
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from auth_payment.models import User, Transaction
+from auth_payment.renderers import ORJSONRenderer
+from auth_payment.serializers import (
+    TransactionSerializer, payment_initiated_data, transaction_list_data, transaction_status_data
+)
+from auth_payment.utils import ResponseHelper
+
+from common import summarize, print_report, save_results, load_results
+
+# Awkward but valid values: non-ASCII, a JS line separator, control characters, odd amounts
+NAMES = ('Ada Lovelace', 'Chinụa Ọkafọ', 'Line\u2028Separator', 'Tab\tand "quotes"\x01')
+
+
+def build(count):
+    now = timezone.now()
+    users = [
+        User(
+            id=uuid.uuid4(), google_id=f'bench-{i}', email=f'bench-{i}@bench.test', name=name,
+            picture='https://lh3.googleusercontent.com/a/bench' if i % 2 else None, created_at=now - timedelta(days=90),
+        )
+        for i, name in enumerate(NAMES)
+    ]
+    transactions = []
+    for i in range(count):
+        status = random.choice(('pending', 'success', 'failed', 'abandoned'))
+        created = now - timedelta(seconds=random.randint(0, 90 * 86400), microseconds=random.randint(0, 999999))
+        reference = f'TXN_{uuid.uuid4()}_{int(created.timestamp())}'
+        transaction = Transaction(
+            id=uuid.uuid4(), reference=reference, user=users[i % len(users)],
+            amount=Decimal(random.randint(100, 50000000)) / 100, status=status, paystack_reference=reference,
+            authorization_url=f'https://checkout.paystack.com/{uuid.uuid4().hex[:15]}' if i % 7 else None,
+            paid_at=created + timedelta(minutes=2) if status == 'success' else None,
+            created_at=created, updated_at=created,
+        )
+        transactions.append(transaction)
+    return transactions
+
+
+def drf_paths(transactions):
+    renderer = JSONRenderer()
+    return {
+        'listing': lambda: renderer.render(ResponseHelper.success_response(
+            data={'transactions': TransactionSerializer(transactions, many=True).data, 'next_cursor': None},
+            message="Transactions retrieved successfully"
+        )),
+        'status': lambda: [renderer.render(ResponseHelper.success_response(
+            data={
+                'reference': txn.reference,
+                'status': txn.status,
+                'amount': int(txn.amount * 100),
+                'paid_at': txn.paid_at.isoformat() if txn.paid_at else None
+            },
+            message="Transaction status retrieved"
+        )) for txn in transactions],
+        'initiate': lambda: [renderer.render(ResponseHelper.success_response(
+            data={'reference': txn.reference, 'authorization_url': txn.authorization_url},
+            message="Payment initialized successfully"
+        )) for txn in transactions],
+    }
+
+
+def fast_paths(transactions):
+    renderer = ORJSONRenderer()
+    return {
+        'listing': lambda: renderer.render(ResponseHelper.success_response(
+            data={'transactions': transaction_list_data(transactions), 'next_cursor': None},
+            message="Transactions retrieved successfully"
+        )),
+        'status': lambda: [renderer.render(ResponseHelper.success_response(
+            data=transaction_status_data(txn), message="Transaction status retrieved"
+        )) for txn in transactions],
+        'initiate': lambda: [renderer.render(ResponseHelper.success_response(
+            data=payment_initiated_data(txn), message="Payment initialized successfully"
+        )) for txn in transactions],
+    }
+
+
+def check_identical(drf, fast):
+    for name in drf:
+        expected, actual = drf[name](), fast[name]()
+        if expected != actual:
+            sys.exit(f"{name}: fast output differs from DRF output")
+    print("Listing, status and initiate bodies are byte-identical")
+
+
+def time_path(name, path, iterations, per):
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        path()
+        latencies.append((time.perf_counter() - t) * per)
+    return summarize(name, latencies, [200] * iterations, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=1000, help='Transactions serialized per iteration')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    args = parser.parse_args()
+
+    # Silence ResponseHelper's per-response log lines
+    import logging
+    logging.disable(logging.INFO)
+
+    transactions = build(args.transactions)
+    drf, fast = drf_paths(transactions), fast_paths(transactions)
+    check_identical(drf, fast)
+
+    # Latencies are scaled to "per 1k transactions" so runs with different --transactions compare
+    per = 1000 / args.transactions
+    baseline = [time_path(name, path, args.iterations, per) for name, path in drf.items()]
+    results = [time_path(name, path, args.iterations, per) for name, path in fast.items()]
+
+    print("\nDRF serializers + JSONRenderer (ms per 1k transactions)")
+    print_report(baseline)
+    print("\nHand-written serializers + ORJSONRenderer (deltas against DRF)")
+    print_report(results, baseline)
+    if args.compare:
+        print("\nAgainst --compare")
+        print_report(results, load_results(args.compare)['fast'])
+
+    if args.output:
+        save_results(args.output, {'drf': baseline, 'fast': results})
+
+
+if __name__ == '__main__':
+    main()
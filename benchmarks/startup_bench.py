@@ -0,0 +1,112 @@
+"""
+Worker startup cost with and without the API docs tooling loaded.
+
+Each run is a fresh interpreter that boots the app the way a Gunicorn worker does (django.setup(),
+the WSGI application, the full URLconf) and reports its wall time, peak RSS and module count:
+
+- lazy: the app as shipped; the docs serve the generated schema file, drf_yasg stays unloaded.
+- eager: the same, plus what every worker used to load at startup (drf_yasg's schema view and the
+  operation schemas in auth_payment/api_docs.py).
+
+    python benchmarks/startup_bench.py --runs 20 --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+from common import summarize, print_report, save_results, load_results
+
+ROOT = Path(__file__).resolve().parent.parent
+MODES = ('eager', 'lazy')
+
+
+def boot(mode):
+    """Child process: boot the app, print one JSON line of measurements"""
+    import resource
+
+    start = time.perf_counter()
+    sys.path.insert(0, str(ROOT))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payment_auth_project.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('LOG_FILE', '')
+
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    get_wsgi_application()
+    # Resolving once imports every view module, as the first request would
+    get_resolver().resolve('/payments')
+    if mode == 'eager':
+        from drf_yasg.views import get_schema_view
+        from auth_payment.api_docs import API_INFO
+
+        get_schema_view(API_INFO, public=True)
+
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'modules': len(sys.modules),
+        'drf_yasg_modules': sum(name.startswith('drf_yasg') for name in sys.modules),
+    }))
+
+
+def measure(mode, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', mode], check=True, capture_output=True, text=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20, help='Fresh interpreters per mode')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        boot(args.child)
+        return
+
+    samples = {mode: measure(mode, args.runs) for mode in MODES}
+    results = [
+        summarize(mode, [s['seconds'] for s in runs], [200] * len(runs), sum(s['seconds'] for s in runs))
+        for mode, runs in samples.items()
+    ]
+    memory = {
+        mode: {
+            'maxrss_mib': round(statistics.median(s['maxrss_kb'] for s in runs) / 1024, 1),
+            'modules': runs[0]['modules'],
+            'drf_yasg_modules': runs[0]['drf_yasg_modules'],
+        }
+        for mode, runs in samples.items()
+    }
+
+    print("Boot time per worker (a 'request' is one boot)")
+    # Without --compare, lazy is compared against eager
+    baseline = load_results(args.compare)['boot'] if args.compare else [dict(results[0], name='lazy')]
+    print_report(results, baseline)
+    print()
+    print(f"{'mode':<10}{'peak RSS MiB':>14}{'modules':>10}{'drf_yasg':>10}")
+    for mode, values in memory.items():
+        print(f"{mode:<10}{values['maxrss_mib']:>14}{values['modules']:>10}{values['drf_yasg_modules']:>10}")
+    saved = memory['eager']['maxrss_mib'] - memory['lazy']['maxrss_mib']
+    print(f"\nLazy docs save {saved:.1f} MiB and "
+          f"{results[0]['p50_ms'] - results[1]['p50_ms']:.0f} ms (p50) per worker")
+
+    if args.output:
+        save_results(args.output, {'boot': results, 'memory': memory})
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+"""
+Local stand-ins for the Google OAuth and Paystack APIs.
+
+    python benchmarks/stubs.py --port 9100 --latency-ms 80 --jitter-ms 20 --error-rate 0.01 \
+        --webhook-url http://127.0.0.1:8001/payments/paystack/webhook --webhook-secret whsec
+
+Point the app at it with:
+
+    GOOGLE_TOKEN_URL=http://127.0.0.1:9100/google/token
+    GOOGLE_USERINFO_URL=http://127.0.0.1:9100/google/userinfo
+    GOOGLE_CERTS_URL=http://127.0.0.1:9100/google/certs
+    PAYSTACK_BASE_URL=http://127.0.0.1:9100/paystack
+    HTTP_WARMUP_URLS=http://127.0.0.1:9100
+"""
+import hmac
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import parse_qs
+from urllib.request import Request, urlopen
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+class StubConfig:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, error_status=503,
+                 verify_status='success', webhook_url=None, webhook_secret='', webhook_delay_ms=0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verify_status = verify_status
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self.webhook_delay_ms = webhook_delay_ms
+        self.webhook_pool = ThreadPoolExecutor(max_workers=8) if webhook_url else None
+
+    def delay(self):
+        latency = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def should_fail(self):
+        return self.error_rate and random.random() < self.error_rate
+
+
+class SigningKey:
+    """RSA key the stub signs Google ID tokens with, published at /google/certs"""
+
+    def __init__(self, kid='stub-key-1'):
+        self.kid = kid
+        self.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(self.private_key.public_key()))
+        jwk.update({'kid': kid, 'alg': 'RS256', 'use': 'sig'})
+        self.jwks = {'keys': [jwk]}
+
+    def id_token(self, audience, code):
+        now = int(time.time())
+        return jwt.encode({
+            'iss': 'https://accounts.google.com',
+            'aud': audience,
+            'sub': f'stub-{code}',
+            'email': f'{code}@bench.test',
+            'email_verified': True,
+            'name': f'Bench {code}',
+            'picture': 'https://example.com/avatar.png',
+            'iat': now,
+            'exp': now + 3600,
+        }, self.private_key, algorithm='RS256', headers={'kid': self.kid})
+
+
+SIGNING_KEY = SigningKey()
+
+
+def sign(secret, body):
+    return hmac.new(secret.encode('utf-8'), body, hashlib.sha512).hexdigest()
+
+
+def charge_success_event(reference, amount=0):
+    return {
+        'event': 'charge.success',
+        'data': {
+            'reference': reference,
+            'status': 'success',
+            'amount': amount,
+            'paid_at': datetime.now(timezone.utc).isoformat(),
+        },
+    }
+
+
+def send_webhook(url, secret, payload, timeout=10):
+    body = json.dumps(payload).encode('utf-8')
+    request = Request(url, data=body, method='POST', headers={
+        'Content-Type': 'application/json',
+        'X-Paystack-Signature': sign(secret, body),
+    })
+    with urlopen(request, timeout=timeout) as response:
+        return response.status
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    config = StubConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _injected_failure(self):
+        self.config.delay()
+        if self.config.should_fail():
+            self._send(self.config.error_status, {'status': False, 'message': 'Injected failure'})
+            return True
+        return False
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_POST(self):
+        body = self._read_body()
+        if self._injected_failure():
+            return
+
+        if self.path == '/google/token':
+            form = parse_qs(body.decode('utf-8'))
+            code = form.get('code', [''])[0]
+            return self._send(200, {
+                'access_token': f'stub-access-{code}',
+                'id_token': SIGNING_KEY.id_token(form.get('client_id', [''])[0], code),
+                'expires_in': 3599,
+                'token_type': 'Bearer',
+                'scope': 'openid email profile',
+            })
+
+        if self.path == '/paystack/transaction/initialize':
+            data = json.loads(body or b'{}')
+            reference = data.get('reference') or f'stub_{time.time_ns()}'
+            if self.config.webhook_pool:
+                self.config.webhook_pool.submit(self._deliver_webhook, reference, data.get('amount', 0))
+            return self._send(200, {
+                'status': True,
+                'message': 'Authorization URL created',
+                'data': {
+                    'authorization_url': f'https://checkout.paystack.test/{reference}',
+                    'access_code': f'access_{reference}',
+                    'reference': reference,
+                },
+            })
+
+        self._send(404, {'status': False, 'message': 'Not found'})
+
+    def do_GET(self):
+        if self._injected_failure():
+            return
+
+        if self.path == '/google/userinfo':
+            code = self.headers.get('Authorization', '').removeprefix('Bearer stub-access-')
+            return self._send(200, {
+                'sub': f'stub-{code}',
+                'email': f'{code}@bench.test',
+                'email_verified': True,
+                'name': f'Bench {code}',
+                'picture': 'https://example.com/avatar.png',
+            })
+
+        if self.path == '/google/certs':
+            body = json.dumps(SIGNING_KEY.jwks).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Cache-Control', 'public, max-age=21600, must-revalidate, no-transform')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if self.path.startswith('/paystack/transaction/verify/'):
+            reference = self.path.rsplit('/', 1)[-1]
+            return self._send(200, {
+                'status': True,
+                'message': 'Verification successful',
+                'data': {
+                    'reference': reference,
+                    'status': self.config.verify_status,
+                    'paid_at': datetime.now(timezone.utc).isoformat(),
+                },
+            })
+
+        self._send(404, {'status': False, 'message': 'Not found'})
+
+    def _deliver_webhook(self, reference, amount):
+        if self.config.webhook_delay_ms:
+            time.sleep(self.config.webhook_delay_ms / 1000)
+        try:
+            send_webhook(self.config.webhook_url, self.config.webhook_secret, charge_success_event(reference, amount))
+        except OSError as e:
+            print(f"webhook delivery for {reference} failed: {e}")
+
+
+def start_stub_server(host='127.0.0.1', port=0, config=None):
+    """Start the stub in a daemon thread; returns (server, base_url)"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {'config': config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9100)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added latency per provider call')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Uniform +/- jitter around --latency-ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of calls answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--verify-status', default='success', help='Status reported by transaction/verify')
+    parser.add_argument('--webhook-url', help='Send a signed charge.success webhook here after each initialize')
+    parser.add_argument('--webhook-secret', default='', help='PAYSTACK_WEBHOOK_SECRET used by the app')
+    parser.add_argument('--webhook-delay-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        verify_status=args.verify_status,
+        webhook_url=args.webhook_url,
+        webhook_secret=args.webhook_secret,
+        webhook_delay_ms=args.webhook_delay_ms,
+    )
+    server, base_url = start_stub_server(args.host, args.port, config)
+    print(f"Provider stubs listening on {base_url} (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Gunicorn configuration, picked up automatically from the project root.
+"""
+import os
+
+# Like gunicorn's default but with the path only (%(U)s), so query strings such as the status
+# stream's ?stream_token= never reach the access log
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+
+
+def on_starting(server):
+    """Refuse to fork several workers onto a per-process cache (auth_payment.E001)"""
+    import django
+    from django.conf import settings
+    from django.core import checks
+
+    # -w/--workers overrides WEB_CONCURRENCY; settings (here and in the forked workers) see the real count
+    os.environ['WEB_CONCURRENCY'] = str(server.cfg.workers)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payment_auth_project.settings')
+    django.setup()
+    settings.WEB_CONCURRENCY = server.cfg.workers
+    errors = [error for error in checks.run_checks(tags=[checks.Tags.caches]) if error.is_serious()]
+    if errors:
+        raise SystemExit('\n'.join(str(error) for error in errors))
+
+
+def post_worker_init(worker):
+    from auth_payment.http_client import warm_up_http_client
+
+    warm_up_http_client()
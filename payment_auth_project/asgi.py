@@ -13,4 +13,23 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'payment_auth_project.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from auth_payment.http_client import aclose_async_http_client  # noqa: E402  (needs the app registry)
+
+
+async def application(scope, receive, send):
+    """
+    Django's ASGI application plus the lifespan protocol, which Django itself rejects: on
+    shutdown the worker's httpx client is closed so its pooled connections are released.
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await aclose_async_http_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return